@@ -0,0 +1,169 @@
+"""Compare how many concurrent slow clients one worker sustains.
+
+Starts one worker per mode against the configured database and drives it with
+plain HTTP/1.1 over asyncio streams (no third-party client needed):
+
+    wsgi        gunicorn, one sync worker, /api/post/
+    asgi-sync   uvicorn, one worker, the sync viewset at /api/post/
+    asgi-async  uvicorn, one worker, the async view at /api/async/post/
+
+Each mode runs two phases. In the first, --slow-clients connections trickle
+their request headers over --hold seconds while a probe measures the latency
+of ordinary requests. In the second, --concurrency clients request the page
+back to back for --duration seconds. Seed the database first; gunicorn and
+uvicorn must be installed.
+
+    SECRET_DJANGO_KEY=... python benchmarks/async_concurrency.py --slow-clients 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+MODES = {
+    'wsgi': (['gunicorn', 'blog_post.wsgi:application', '--workers', '1', '--bind', '127.0.0.1:{port}'], '/api/post/'),
+    'asgi-sync': (['uvicorn', 'blog_post.asgi:application', '--workers', '1', '--port', '{port}', '--log-level', 'warning'], '/api/post/'),
+    'asgi-async': (['uvicorn', 'blog_post.asgi:application', '--workers', '1', '--port', '{port}', '--log-level', 'warning'], '/api/async/post/'),
+}
+
+
+def request_lines(path, token):
+    lines = [f'GET {path} HTTP/1.1', 'Host: 127.0.0.1', 'Connection: close']
+    if token:
+        lines.append(f'Authorization: Bearer {token}')
+    return lines
+
+
+async def fetch(port, path, token, hold=0.0, timeout=60.0):
+    # Returns (status, seconds). With hold, the header lines are spread over
+    # that many seconds, like a client on a slow link.
+    started = time.perf_counter()
+    reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+    try:
+        lines = request_lines(path, token)
+        for line in lines:
+            writer.write(line.encode() + b'\r\n')
+            await writer.drain()
+            if hold:
+                await asyncio.sleep(hold / len(lines))
+        writer.write(b'\r\n')
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+    finally:
+        writer.close()
+    status = int(response.split(b' ', 2)[1]) if response.startswith(b'HTTP/') else 0
+    return status, time.perf_counter() - started
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def summarize(results, elapsed=None):
+    latencies = [seconds for status, seconds in results if status == 200]
+    summary = {
+        'ok': len(latencies),
+        'failed': len(results) - len(latencies),
+        'p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1) if latencies else None,
+        'max_ms': round(max(latencies) * 1000, 1) if latencies else None,
+    }
+    if elapsed:
+        summary['requests_per_second'] = round(len(latencies) / elapsed, 1)
+    return summary
+
+
+async def guarded(coroutine):
+    try:
+        return await coroutine
+    except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+        return 0, 0.0
+
+
+async def slow_clients_phase(port, path, args):
+    slow = [asyncio.create_task(guarded(fetch(port, path, args.token, hold=args.hold))) for _ in range(args.slow_clients)]
+    probes = []
+    deadline = time.perf_counter() + args.hold
+    while time.perf_counter() < deadline:
+        probes.append(await guarded(fetch(port, path, args.token, timeout=args.hold + 30)))
+        await asyncio.sleep(0.1)
+    return {'slow_clients': summarize(await asyncio.gather(*slow)), 'probe': summarize(probes)}
+
+
+async def throughput_phase(port, path, args):
+    results = []
+    deadline = time.perf_counter() + args.duration
+
+    async def client():
+        while time.perf_counter() < deadline:
+            results.append(await guarded(fetch(port, path, args.token)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    return summarize(results, time.perf_counter() - started)
+
+
+async def wait_until_up(port, path, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            await fetch(port, path, None, timeout=5)
+            return
+        except OSError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f'server on port {port} did not start')
+
+
+def run_mode(mode, args):
+    command, path = MODES[mode]
+    command = [part.format(port=args.port) for part in command]
+    server = subprocess.Popen(command, cwd=BASE_DIR, env=os.environ.copy())
+    try:
+        asyncio.run(wait_until_up(args.port, path))
+        return {
+            'command': ' '.join(command),
+            'path': path,
+            'slow': asyncio.run(slow_clients_phase(args.port, path, args)),
+            'throughput': asyncio.run(throughput_phase(args.port, path, args)),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', nargs='+', choices=sorted(MODES), default=list(MODES))
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--slow-clients', type=int, default=100)
+    parser.add_argument('--hold', type=float, default=5.0, help='seconds each slow client takes to send its headers')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--token', help='access token to send as a bearer token')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args()
+
+    results = {mode: run_mode(mode, args) for mode in args.modes}
+    for mode, result in results.items():
+        slow, probe, throughput = result['slow']['slow_clients'], result['slow']['probe'], result['throughput']
+        print(
+            f"{mode:<11} slow clients served {slow['ok']}/{args.slow_clients}  "
+            f"probe p95 {probe['p95_ms']} ms  "
+            f"throughput {throughput.get('requests_per_second')} req/s (p95 {throughput['p95_ms']} ms)"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
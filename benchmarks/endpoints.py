@@ -0,0 +1,340 @@
+"""Time every named route of posts/urls.py and users/urls.py at growing sizes.
+
+Creates a throwaway test database, seeds it up through each --sizes value
+(see benchmarks/seed.py) and requests every route in-process with the test
+client, as an authenticated team member unless the route says otherwise.
+For each route and size it records latency percentiles and the number of SQL
+queries, then fails (exit status 1) when
+
+  * a route issues more queries than its budget in ROUTES, or more at the
+    largest size than at the smallest (a per-row query), or
+  * its median latency grows faster than the dataset: the exponent k in
+    latency ~ size**k between the smallest and largest size is above
+    --max-exponent.
+
+    SECRET_DJANGO_KEY=... python benchmarks/endpoints.py --sizes 1000 10000 100000 --output run.json
+    SECRET_DJANGO_KEY=... python benchmarks/endpoints.py --sizes 1000 10000 --baseline run.json
+
+The response cache is off unless --with-cache is given, so every request
+reaches the database.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blog_post.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext, setup_test_environment  # noqa: E402
+from django.urls import get_resolver, reverse  # noqa: E402
+
+from benchmarks import seed  # noqa: E402
+from posts import urls as post_urls  # noqa: E402
+from posts.models import Post, Comment, Like  # noqa: E402
+from users import urls as user_urls  # noqa: E402
+from users.authentication import ClaimsRefreshToken  # noqa: E402
+from users.models import Team, User  # noqa: E402
+
+
+@dataclass
+class Route:
+    # kwargs and data are called with the Fixture and the iteration number
+    # and return what to send; anything they create is not timed. budget is
+    # the most SQL queries one request may issue.
+    name: str
+    method: str = 'get'
+    budget: int = 0
+    user: str = 'member'  # 'member', 'admin' or None for anonymous
+    kwargs: object = None
+    data: object = None
+    params: dict = field(default_factory=dict)
+    streaming: bool = False
+    label: str = ''
+
+    @property
+    def key(self):
+        key = f'{self.method.upper()} {self.name}'
+        return f'{key} ({self.label})' if self.label else key
+
+
+class Fixture:
+    # Sample rows the routes point at, picked once per size.
+    def __init__(self):
+        self.member = User.objects.filter(username__startswith='bench').order_by('pk').first()
+        self.admin = User.objects.filter(is_superuser=True).first() or User.objects.create_superuser(
+            username='bench-admin', password=seed.PASSWORD, team=Team.objects.named('team0')
+        )
+        self.post = Post.objects.visible_to(self.member).filter(is_public=1).order_by('-created_at').first()
+
+    def token(self, user):
+        return str(ClaimsRefreshToken.for_user(user).access_token)
+
+    def fresh_post(self):
+        return Post.objects.create(
+            title='benchmark', content='benchmark content', is_public=1, team_id=self.member.team_id,
+            authenticated_permission=1, group_permission=2, author_permission=2, author=self.member,
+        )
+
+    def fresh_comment(self):
+        return Comment.objects.create(content='benchmark', author=self.member, post=self.post)
+
+    def fresh_like(self):
+        post = self.fresh_post()
+        Like.objects.create(author=self.member, post=post)
+        return post
+
+    def unique(self):
+        return next(COUNTER)
+
+
+def post_kwargs(fixture, i):
+    return {'pk': fixture.post.pk}
+
+
+def post_pk_kwargs(fixture, i):
+    return {'post_pk': fixture.post.pk}
+
+
+def user_pk_kwargs(fixture, i):
+    return {'user_pk': fixture.member.pk}
+
+
+COUNTER = itertools.count()
+
+POST_BODY = {
+    'title': 'benchmark', 'content': 'benchmark content', 'is_public': 1,
+    'authenticated_permission': 1, 'group_permission': 1, 'author_permission': 2,
+}
+
+ROUTES = [
+    Route('posts', budget=3),
+    Route('posts', budget=2, label='cursor', params={'cursor': ''}),
+    Route('posts', budget=2, label='anonymous', user=None),
+    Route('posts', method='post', budget=3, data=lambda f, i: POST_BODY),
+    Route('detailed_post', budget=2, kwargs=post_kwargs),
+    Route('detailed_post', method='put', budget=4, kwargs=lambda f, i: {'pk': f.fresh_post().pk}, data=lambda f, i: {'title': f'edited {i}'}),
+    Route('detailed_post', method='delete', budget=13, kwargs=lambda f, i: {'pk': f.fresh_post().pk}),
+    Route('search_posts', budget=3, params={'q': 'django cache'}),
+    Route('trending_posts', budget=3),
+    Route('comments', budget=3, kwargs=post_pk_kwargs),
+    Route('comments', method='post', budget=8, kwargs=post_pk_kwargs, data=lambda f, i: {'content': f'comment {i}'}),
+    Route('comment', method='put', budget=3, kwargs=lambda f, i: {'pk': f.fresh_comment().pk}, data=lambda f, i: {'content': 'edited'}),
+    Route('comment', method='delete', budget=8, kwargs=lambda f, i: {'pk': f.fresh_comment().pk}),
+    Route('all_comments', budget=2),
+    Route('specific_user_comments', budget=3, kwargs=user_pk_kwargs),
+    Route('likes', budget=3, kwargs=post_pk_kwargs),
+    Route('likes', method='post', budget=6, kwargs=lambda f, i: {'post_pk': f.fresh_post().pk}),
+    Route('unlike', method='delete', budget=6, kwargs=lambda f, i: {'post_pk': f.fresh_like().pk}),
+    Route('all_likes', budget=2),
+    Route('specific_user_likes', budget=3, kwargs=user_pk_kwargs),
+    Route('team_stats', budget=2, kwargs=lambda f, i: {'team': f.member.team.name}),
+    Route('author_stats', budget=1, kwargs=user_pk_kwargs),
+    Route('stream_posts', budget=1, streaming=True, params={'since': '2999-01-01T00:00:00'}),
+    Route('stream_comments', budget=1, streaming=True, params={'since': '2999-01-01T00:00:00'}),
+    Route('stream_likes', budget=1, streaming=True, params={'since': '2999-01-01T00:00:00'}),
+    Route('async_posts', budget=2),
+    Route('async_detailed_post', budget=1, kwargs=post_kwargs),
+    Route('async_comments', budget=3, kwargs=post_pk_kwargs),
+    Route('async_all_comments', budget=2),
+    Route('async_specific_user_comments', budget=3, kwargs=user_pk_kwargs),
+    Route('async_likes', budget=3, kwargs=post_pk_kwargs),
+    Route('async_all_likes', budget=2),
+    Route('async_specific_user_likes', budget=3, kwargs=user_pk_kwargs),
+    Route('register', method='post', budget=3, user=None, data=lambda f, i: {'username': f'bench-new-{f.unique()}', 'password': 'benchmark'}),
+    Route('token_obtain_pair', method='post', budget=3, user=None, data=lambda f, i: {'username': f.member.username, 'password': seed.PASSWORD}),
+    Route('token_refresh', method='post', budget=3, user=None, data=lambda f, i: {'refresh': str(ClaimsRefreshToken.for_user(f.member))}),
+    Route('logout', method='post', budget=7, data=lambda f, i: {'refresh': str(ClaimsRefreshToken.for_user(f.member))}),
+    Route('user', budget=2),
+    Route('database_pool', budget=1, user='admin'),
+]
+
+
+def named_routes():
+    names = set()
+    for module in (post_urls, user_urls):
+        names.update(pattern.name for pattern in module.urlpatterns if pattern.name)
+    return names
+
+
+def check_coverage():
+    missing = named_routes() - {route.name for route in ROUTES}
+    if missing:
+        raise SystemExit(f'No benchmark for routes: {", ".join(sorted(missing))}')
+
+
+def call(client, route, fixture, i):
+    # Returns (seconds, status, queries); only the request itself is timed.
+    kwargs = route.kwargs(fixture, i) if route.kwargs else {}
+    data = route.data(fixture, i) if route.data else None
+    url = reverse(route.name, kwargs=kwargs)
+    headers = {}
+    if route.user:
+        headers['HTTP_AUTHORIZATION'] = f'Bearer {fixture.token(getattr(fixture, route.user))}'
+    request = getattr(client, route.method)
+    if route.method == 'get':
+        args = (url, route.params)
+    else:
+        args = (url, json.dumps(data) if data is not None else None)
+        headers['content_type'] = 'application/json'
+
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = request(*args, **headers)
+        if route.streaming:
+            b''.join(response.streaming_content)
+        elapsed = time.perf_counter() - started
+    return elapsed, response.status_code, len(queries)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def measure(route, fixture, repeat):
+    client = Client()
+    call(client, route, fixture, -1)  # warm up imports, prepared statements and token caches
+    timings, statuses, queries = [], set(), []
+    for i in range(repeat):
+        elapsed, status, count = call(client, route, fixture, i)
+        timings.append(elapsed)
+        statuses.add(status)
+        queries.append(count)
+    return {
+        'status': sorted(statuses),
+        'queries': max(queries),
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+    }
+
+
+def growth_exponent(small, large):
+    (size_a, time_a), (size_b, time_b) = small, large
+    if time_a <= 0 or size_b == size_a:
+        return None
+    return math.log(time_b / time_a) / math.log(size_b / size_a)
+
+
+def check(results, sizes, max_exponent, min_ms):
+    # Returns (failures, growth exponent per route key).
+    failures, growth = [], {}
+    smallest, largest = str(min(sizes)), str(max(sizes))
+    for route in ROUTES:
+        by_size = results[route.key]
+        for size, result in by_size.items():
+            if result['queries'] > route.budget:
+                failures.append(f"{route.key}: {result['queries']} queries at {size} posts, budget {route.budget}")
+            if any(status >= 500 for status in result['status']):
+                failures.append(f"{route.key}: server error {result['status']} at {size} posts")
+        if len(sizes) < 2:
+            continue
+        if by_size[largest]['queries'] > by_size[smallest]['queries']:
+            failures.append(
+                f"{route.key}: queries grow with size ({by_size[smallest]['queries']} -> {by_size[largest]['queries']})"
+            )
+        # Sub-millisecond medians are mostly noise; do not judge their slope.
+        if by_size[largest]['p50_ms'] < min_ms:
+            continue
+        exponent = growth_exponent(
+            (int(smallest), by_size[smallest]['p50_ms']), (int(largest), by_size[largest]['p50_ms'])
+        )
+        growth[route.key] = round(exponent, 3) if exponent is not None else None
+        if exponent is not None and exponent > max_exponent:
+            failures.append(f'{route.key}: latency ~ size**{exponent:.2f}, above {max_exponent}')
+    return failures, growth
+
+
+def compare(results, baseline):
+    lines = []
+    for key, by_size in results.items():
+        for size, result in by_size.items():
+            before = baseline.get('results', {}).get(key, {}).get(size)
+            if not before:
+                continue
+            ratio = result['p50_ms'] / before['p50_ms'] if before['p50_ms'] else float('inf')
+            lines.append(f"{key:<42} {size:>9}  p50 {before['p50_ms']:>9.2f} -> {result['p50_ms']:>9.2f} ms  x{ratio:.2f}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--routes', nargs='+', help='only these route names')
+    parser.add_argument('--max-exponent', type=float, default=1.1)
+    parser.add_argument('--min-ms', type=float, default=2.0, help='skip the growth check below this median')
+    parser.add_argument('--with-cache', action='store_true', help='keep the response cache on')
+    parser.add_argument('--keepdb', action='store_true', help='reuse the test database between runs')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON file of an earlier run to compare against')
+    args = parser.parse_args()
+
+    check_coverage()
+    global ROUTES
+    if args.routes:
+        ROUTES = [route for route in ROUTES if route.name in args.routes]
+    sizes = sorted(args.sizes)
+
+    setup_test_environment(debug=False)
+    settings.RESPONSE_CACHE_ENABLED = args.with_cache
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=args.keepdb)
+    results = {route.key: {} for route in ROUTES}
+    try:
+        for size in sizes:
+            started = time.perf_counter()
+            counts = seed.grow_to(size)
+            print(f'seeded {counts} in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+            fixture = Fixture()
+            for route in ROUTES:
+                for cache in caches.all():
+                    cache.clear()
+                results[route.key][str(size)] = measure(route, fixture, args.repeat)
+                result = results[route.key][str(size)]
+                print(f"{route.key:<42} {size:>9}  p50 {result['p50_ms']:>9.2f} ms  p95 {result['p95_ms']:>9.2f} ms  "
+                      f"{result['queries']:>3} queries  {result['status']}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=args.keepdb)
+
+    failures, growth = check(results, sizes, args.max_exponent, args.min_ms)
+    report = {
+        'meta': {
+            'sizes': sizes,
+            'repeat': args.repeat,
+            'vendor': connection.vendor,
+            'with_cache': args.with_cache,
+            'proportions': {size: seed.proportions(size) for size in sizes},
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+        'growth_exponent': growth,
+        'failures': failures,
+    }
+    if args.baseline:
+        print('\n'.join(compare(results, json.loads(Path(args.baseline).read_text()))))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    for failure in failures:
+        print(f'FAIL {failure}', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Seed the database with a synthetic blog of a given number of posts.
+
+Users, teams, comments and likes scale with the post count. Seeding is
+incremental: grow_to(n) only adds what is missing, so a benchmark can walk up
+through its sizes on one database.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from posts.dumps import stored_timestamps
+from posts.models import Post, Comment, Like, excerpt_of, record_post_activity
+from posts.trending import COMMENT_WEIGHT, LIKE_WEIGHT, event_value
+from users.models import Team, User
+
+PASSWORD = 'benchmark-password'
+POSTS_PER_USER = 100
+USERS_PER_TEAM = 20
+COMMENTS_PER_POST = 2
+LIKES_PER_POST = 3
+BATCH_SIZE = 5000
+
+WORDS = (
+    'django query index cache cursor latency replica pool token stream search excerpt '
+    'team author public private comment like post page count budget profile signal '
+    'migration trigger vector rank json gzip worker thread async event loop'
+).split()
+
+
+def proportions(posts):
+    users = max(10, posts // POSTS_PER_USER)
+    return {
+        'posts': posts,
+        'users': users,
+        'teams': max(3, users // USERS_PER_TEAM),
+        'comments': posts * COMMENTS_PER_POST,
+        'likes': posts * min(LIKES_PER_POST, users),
+    }
+
+
+def text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def batched(rows, model):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+
+
+def grow_teams(target):
+    names = [f'team{index}' for index in range(target)]
+    Team.objects.bulk_create([Team(name=name) for name in names], ignore_conflicts=True)
+    return dict(Team.objects.filter(name__in=names).values_list('name', 'pk'))
+
+
+def grow_users(target, teams):
+    existing = User.objects.filter(username__startswith='bench').count()
+    password = make_password(PASSWORD)
+    team_ids = grow_teams(teams)
+    batched((
+        User(username=f'bench{index}', password=password, team_id=team_ids[f'team{index % teams}'])
+        for index in range(existing, target)
+    ), User)
+    return list(User.objects.filter(username__startswith='bench').order_by('pk').values_list('pk', 'team'))
+
+
+def grow_posts(target, users, rng):
+    existing = Post.objects.count()
+    start = timezone.now() - timedelta(days=365)
+    step = timedelta(days=365) / max(target, 1)
+    # Every comment and like of a post is created with it (see grow_related).
+    engagement = COMMENTS_PER_POST * COMMENT_WEIGHT + min(LIKES_PER_POST, len(users)) * LIKE_WEIGHT
+
+    def rows():
+        for index in range(existing, target):
+            author, team = rng.choice(users)
+            content = text(rng, rng.randint(20, 400))
+            post = Post(
+                title=text(rng, 6)[:100], content=content, excerpt=excerpt_of(content), author_id=author, team_id=team,
+                is_public=rng.choice([0, 1, 1]), authenticated_permission=rng.choice([0, 1, 2]),
+                group_permission=rng.choice([0, 1, 2]), author_permission=2,
+            )
+            post.created_at = post.updated_at = start + step * index
+            post.trending_score = event_value(engagement, post.created_at)
+            yield post
+
+    with stored_timestamps(Post):
+        batched(rows(), Post)
+
+
+def grow_related(first_new_post, users, rng):
+    # Comments and likes for posts added by this step; counters and activity
+    # rollups are set from what was inserted, the signals do not run for
+    # bulk_create.
+    user_ids = [pk for pk, _ in users]
+    posts = list(Post.objects.filter(pk__gt=first_new_post).values_list('pk', 'created_at'))
+
+    def comments():
+        for post, created_at in posts:
+            for _ in range(COMMENTS_PER_POST):
+                comment = Comment(post_id=post, author_id=rng.choice(user_ids), content=text(rng, rng.randint(3, 40)))
+                comment.created_at = comment.updated_at = created_at
+                yield comment
+
+    def likes():
+        for post, created_at in posts:
+            for author in rng.sample(user_ids, min(LIKES_PER_POST, len(user_ids))):
+                like = Like(post_id=post, author_id=author)
+                like.created_at = created_at
+                yield like
+
+    with stored_timestamps(Comment), stored_timestamps(Like):
+        batched(comments(), Comment)
+        batched(likes(), Like)
+    Post.objects.filter(pk__gt=first_new_post).update(
+        comment_count=COMMENTS_PER_POST, like_count=min(LIKES_PER_POST, len(user_ids)),
+    )
+    record_post_activity(Post.objects.filter(pk__gt=first_new_post))
+
+
+def grow_to(posts, seed=0):
+    target = proportions(posts)
+    rng = random.Random(seed + posts)
+    with transaction.atomic():
+        users = grow_users(target['users'], target['teams'])
+        last_post = Post.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        grow_posts(target['posts'], users, rng)
+        grow_related(last_post, users, rng)
+    return target
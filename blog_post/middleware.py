@@ -0,0 +1,59 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .queries import QueryRecorder
+
+logger = logging.getLogger('blog_post.queries')
+
+
+class QueryInspectMiddleware:
+    # Counts the SQL run while a request is handled (QUERY_INSPECT_ENABLED),
+    # reports it in X-DB-* response headers and a log line, and warns about
+    # statement templates run more than QUERY_INSPECT_REPEAT_THRESHOLD times.
+    # Queries run while a streaming response is consumed are not included.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSPECT_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        with recorder.record():
+            response = self.get_response(request)
+        return self.report(request, response, recorder)
+
+    async def __acall__(self, request):
+        # Connections belong to the thread the ORM runs queries on (the
+        # request's thread-sensitive sync_to_async thread), so the recorder is
+        # installed and removed there.
+        recorder = QueryRecorder()
+        queries = await sync_to_async(recorder.record)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(queries.close)()
+        return self.report(request, response, recorder)
+
+    def report(self, request, response, recorder):
+        repeated = recorder.repeated(settings.QUERY_INSPECT_REPEAT_THRESHOLD)
+        response['X-DB-Query-Count'] = str(recorder.count)
+        response['X-DB-Query-Time'] = f'{recorder.duration * 1000:.2f}'
+        response['X-DB-Repeated-Queries'] = str(len(repeated))
+
+        logger.info(
+            '%s %s %s queries in %.2f ms', request.method, request.path, recorder.count, recorder.duration * 1000,
+        )
+        for template, times in repeated.items():
+            logger.warning('Possible N+1 on %s %s: %s times: %s', request.method, request.path, times, template)
+        return response
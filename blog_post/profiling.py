@@ -0,0 +1,126 @@
+import random
+import secrets
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+# Sampling profiler for single requests. A background thread reads the stack
+# of the thread handling the request every PROFILER_INTERVAL seconds; the
+# samples are appended to PROFILER_DIR/<url name>.folded in the folded-stack
+# format ("outer;inner;leaf count" per line) read by flamegraph.pl,
+# speedscope and inferno. Stacks repeat across requests; those tools sum them.
+
+
+def frame_name(frame):
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+
+class StackSampler:
+    def __init__(self, thread_id, interval, anchor=None):
+        # Frames above anchor (the server and handler) are left out.
+        self.thread_id = thread_id
+        self.interval = interval
+        self.anchor = anchor
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.sample(frame)
+
+    def sample(self, frame):
+        names = []
+        while frame is not None and frame is not self.anchor:
+            names.append(frame_name(frame))
+            frame = frame.f_back
+        self.stacks[';'.join(reversed(names))] += 1
+
+
+def write_folded(path, stacks):
+    # One write per request so concurrent workers do not interleave lines.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as output:
+        output.write(''.join(f'{stack} {count}\n' for stack, count in stacks.items()))
+
+
+class ProfilerMiddleware:
+    # Profiles a request sent with the X-Profile header set to PROFILER_TOKEN
+    # (a secret handed to staff), or PROFILER_SAMPLE_RATE of all requests.
+    # Sampling starts when the view is resolved and ends with the rendered
+    # response, so it covers permissions, queries, serializers and rendering.
+    # Coroutine views are not profiled: they share the event loop thread with
+    # every other request in flight (or, under WSGI, run on a loop thread
+    # while the request's thread only waits), so no thread's samples are
+    # theirs alone.
+    header = 'HTTP_X_PROFILE'
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_TOKEN and settings.PROFILER_SAMPLE_RATE <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        request._profiler_anchor = sys._getframe()
+        response = self.get_response(request)
+        del request._profiler_anchor
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        # A sync view runs on the request's thread-sensitive sync_to_async
+        # thread, which is also where process_view is called, so that thread
+        # is sampled. None of its frames is an ancestor of the view that
+        # outlives process_view, so the executor frames stay in the stacks.
+        request._profiler_anchor = None
+        response = await self.get_response(request)
+        del request._profiler_anchor
+        return await sync_to_async(self.finish)(request, response)
+
+    def finish(self, request, response):
+        sampler = getattr(request, '_profiler', None)
+        if sampler is None:
+            return response
+
+        stacks = sampler.stop()
+        if stacks:
+            name = request.resolver_match.url_name or 'unnamed'
+            write_folded(Path(settings.PROFILER_DIR) / f'{name}.folded', stacks)
+        response['X-Profile-Samples'] = str(sum(stacks.values()))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if iscoroutinefunction(view_func):
+            return None
+        if self.requested(request) or random.random() < settings.PROFILER_SAMPLE_RATE:
+            request._profiler = StackSampler(
+                threading.get_ident(), settings.PROFILER_INTERVAL, request._profiler_anchor,
+            ).start()
+
+    def requested(self, request):
+        token = request.META.get(self.header)
+        if not token or not settings.PROFILER_TOKEN:
+            return False
+        return secrets.compare_digest(token.encode(), settings.PROFILER_TOKEN.encode())
@@ -0,0 +1,84 @@
+import re
+import time
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+# SQL statements reduced to their template: literals and IN (...) lists become
+# ?, so the same query for different rows counts as one statement executed
+# several times, the shape of an N+1.
+LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\bIN \((?:\?, )*\?\)', re.IGNORECASE), 'IN (...)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def fingerprint(sql):
+    for pattern, replacement in LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class QueryRecorder:
+    # execute_wrapper that counts statements, their total time and how often
+    # each template ran, on every connection it is installed on.
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.templates = Counter()
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+            self.templates[fingerprint(sql)] += 1
+            self.statements.append(sql)
+
+    def repeated(self, threshold):
+        return {template: times for template, times in self.templates.most_common() if times > threshold}
+
+    def record(self, using=None):
+        stack = ExitStack()
+        for alias in [using] if using else connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return stack
+
+
+class assert_max_queries(ContextDecorator):
+    # with assert_max_queries(5): ... or @assert_max_queries(5) fails when the
+    # block runs more than limit statements, or any template more than
+    # QUERY_INSPECT_REPEAT_THRESHOLD times, and lists what ran.
+    def __init__(self, limit, repeat_threshold=None, using=None):
+        self.limit = limit
+        self.repeat_threshold = settings.QUERY_INSPECT_REPEAT_THRESHOLD if repeat_threshold is None else repeat_threshold
+        self.using = using
+
+    def __enter__(self):
+        self.recorder = QueryRecorder()
+        self.stack = self.recorder.record(self.using)
+        self.stack.__enter__()
+        return self.recorder
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.stack.__exit__(exc_type, exc, traceback)
+        if exc_type is not None:
+            return False
+        recorder = self.recorder
+        problems = []
+        if recorder.count > self.limit:
+            problems.append(f'{recorder.count} queries, expected at most {self.limit}')
+        for template, times in recorder.repeated(self.repeat_threshold).items():
+            problems.append(f'{times}x {template}')
+        if problems:
+            statements = '\n'.join(f'  {index}. {sql}' for index, sql in enumerate(recorder.statements, start=1))
+            raise AssertionError('\n'.join(problems) + f'\nQueries:\n{statements}')
+        return False
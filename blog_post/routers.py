@@ -0,0 +1,80 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+# Reads go to the primary unless a request has opted into a replica through
+# read_from()/use_replica() (see posts.viewsets.ReplicaReadMixin). Writes
+# always go to the primary, also for instances that were loaded from a replica.
+_read_database = ContextVar('read_database', default=None)
+
+RECENT_WRITE_KEY = 'replica:recent-write'
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_database.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+
+def current_read_database():
+    return _read_database.get() or DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def read_from(alias):
+    token = _read_database.set(alias)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+def use_replica():
+    # Sets the read alias for the rest of the current read_from() block.
+    if settings.DATABASE_REPLICAS:
+        _read_database.set(random.choice(settings.DATABASE_REPLICAS))
+
+
+def reading_from_replica():
+    return _read_database.get() in settings.DATABASE_REPLICAS
+
+
+def pin_cache():
+    return caches[settings.REPLICA_PIN_CACHE_ALIAS]
+
+
+def _pin_key(user):
+    return f'replica:pinned:{user.pk}'
+
+
+def pin_to_primary(user):
+    # Read-your-writes: the user's reads stay on the primary until the
+    # replicas have had REPLICA_PIN_SECONDS to catch up.
+    if settings.DATABASE_REPLICAS and user.is_authenticated:
+        pin_cache().set(_pin_key(user), True, timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    return user.is_authenticated and bool(pin_cache().get(_pin_key(user)))
+
+
+def mark_write():
+    if settings.DATABASE_REPLICAS:
+        pin_cache().set(RECENT_WRITE_KEY, time.time(), timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def replica_may_lag():
+    # True while a replica read could still miss a write made in the last
+    # REPLICA_PIN_SECONDS; such results must not be shared through caches.
+    return reading_from_replica() and pin_cache().get(RECENT_WRITE_KEY) is not None
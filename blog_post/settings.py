@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path
 import os
 import environ
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'users',
     'posts',
+    'jobs',
     'rest_framework',
     'corsheaders',
     'rest_framework_simplejwt',
@@ -51,6 +53,9 @@ INSTALLED_APPS = [
     ]
 
 MIDDLEWARE = [
+    'blog_post.timing.ServerTimingMiddleware',
+    'blog_post.middleware.QueryInspectMiddleware',
+    'blog_post.profiling.ProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -86,13 +91,140 @@ WSGI_APPLICATION = 'blog_post.wsgi.application'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
 DATABASES = {
-#    'default': env.db('DATABASE_URL', default="sqlite:///db.sqlite3")
+    'default': env.db('DATABASE_URL', default=f'sqlite:///{BASE_DIR / "db.sqlite3"}'),
+}
+
+# Read replicas, e.g. DATABASE_REPLICA_URLS=postgres://...,postgres://... or a
+# copy of the SQLite file for local testing. Read-only actions of the posts
+# viewsets use a replica; writes and every other query use default, and a user
+# who just wrote reads from default for REPLICA_PIN_SECONDS.
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), start=1):
+    DATABASES[f'replica{index}'] = {**env.db_url_config(url), 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['blog_post.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=5)
+# Must be shared between workers (not locmem) when running more than one.
+REPLICA_PIN_CACHE_ALIAS = env.str('REPLICA_PIN_CACHE_ALIAS', default='default')
+
+# PostgreSQL (DATABASE_URL=postgres://...) keeps its connections open instead
+# of paying a TCP and auth handshake per request: either a psycopg pool per
+# process (DATABASE_POOL, the default) or one persistent connection per thread
+# (CONN_MAX_AGE). Django does not allow both at once. QuerySet.iterator() uses
+# server-side cursors, so the NDJSON streams and dumps read in chunks; turn
+# them off behind a transaction-mode PgBouncer.
+for database in DATABASES.values():
+    if database['ENGINE'] != 'django.db.backends.postgresql':
+        continue
+    database['DISABLE_SERVER_SIDE_CURSORS'] = env.bool('DATABASE_DISABLE_SERVER_SIDE_CURSORS', default=False)
+    if env.bool('DATABASE_POOL', default=True):
+        database['CONN_MAX_AGE'] = 0
+        database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': env.int('DATABASE_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DATABASE_POOL_MAX_SIZE', default=10),
+            # Seconds a request waits for a free connection before failing.
+            'timeout': env.float('DATABASE_POOL_TIMEOUT', default=10.0),
+            'max_idle': env.float('DATABASE_POOL_MAX_IDLE', default=300.0),
+            'max_lifetime': env.float('DATABASE_POOL_MAX_LIFETIME', default=1800.0),
+        }
+    else:
+        database['CONN_MAX_AGE'] = env.int('CONN_MAX_AGE', default=60)
+        database['CONN_HEALTH_CHECKS'] = True
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Read responses of the posts API are cached in their own alias. Local memory
+# evicts least recently used entries once MAX_ENTRIES is reached but is per
+# process; use the file backend to share entries between workers.
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_ENABLED = env.bool('RESPONSE_CACHE_ENABLED', default=True)
+RESPONSE_CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+
+RESPONSE_CACHE_BACKEND = env.str('RESPONSE_CACHE_BACKEND', default='locmem')
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    RESPONSE_CACHE_ALIAS: {
+        'BACKEND': RESPONSE_CACHE_BACKENDS[RESPONSE_CACHE_BACKEND],
+        'LOCATION': env.str('RESPONSE_CACHE_LOCATION', default=str(BASE_DIR / '.cache' / 'responses')),
+        'TIMEOUT': env.int('RESPONSE_CACHE_TTL', default=60),
+        'OPTIONS': {
+            'MAX_ENTRIES': env.int('RESPONSE_CACHE_MAX_ENTRIES', default=10000),
+        },
+    },
 }
 
+# max-age sent with anonymous (public) responses of the posts API; responses
+# for authenticated users are always private and revalidated.
+HTTP_CACHE_MAX_AGE = env.int('HTTP_CACHE_MAX_AGE', default=30)
+
+# ETag/Last-Modified and 304s (posts.conditional) are derived from the version
+# counters in the response cache, which only works when every worker sees the
+# same counters: a shared backend (file, on a single host) or a single worker.
+# WEB_CONCURRENCY is the worker count, as read by gunicorn.
+WEB_CONCURRENCY = env.int('WEB_CONCURRENCY', default=1)
+RESPONSE_CACHE_SHARED = RESPONSE_CACHE_BACKEND != 'locmem' or WEB_CONCURRENCY == 1
+CONDITIONAL_GET_ENABLED = env.bool('CONDITIONAL_GET_ENABLED', default=RESPONSE_CACHE_SHARED)
+if CONDITIONAL_GET_ENABLED and not RESPONSE_CACHE_SHARED:
+    raise ImproperlyConfigured('CONDITIONAL_GET_ENABLED needs RESPONSE_CACHE_BACKEND=file with more than one worker')
+
+# Per-request SQL instrumentation (blog_post.middleware.QueryInspectMiddleware):
+# X-DB-Query-Count, X-DB-Query-Time (ms) and X-DB-Repeated-Queries headers, a
+# log line per request and a warning for every statement template run more
+# than QUERY_INSPECT_REPEAT_THRESHOLD times. The threshold is also the default
+# of blog_post.queries.assert_max_queries in tests.
+QUERY_INSPECT_ENABLED = env.bool('QUERY_INSPECT_ENABLED', default=False)
+QUERY_INSPECT_REPEAT_THRESHOLD = env.int('QUERY_INSPECT_REPEAT_THRESHOLD', default=3)
+
+# Fraction of requests (0 to 1) timed stage by stage by
+# blog_post.timing.ServerTimingMiddleware: a Server-Timing header and a JSON
+# log line with auth, jwt, permissions, paginate, serialize, render, db and
+# total. 0 removes the middleware, leaving only a ContextVar lookup per stage.
+SERVER_TIMING_SAMPLE_RATE = env.float('SERVER_TIMING_SAMPLE_RATE', default=0.0)
+
+# Sampling profiler (blog_post.profiling.ProfilerMiddleware): requests with
+# an X-Profile: <PROFILER_TOKEN> header, plus PROFILER_SAMPLE_RATE of all
+# requests, append folded stacks to PROFILER_DIR/<url name>.folded for
+# flamegraph tools. Off unless a token or a rate is set.
+PROFILER_TOKEN = env.str('PROFILER_TOKEN', default='')
+PROFILER_SAMPLE_RATE = env.float('PROFILER_SAMPLE_RATE', default=0.0)
+PROFILER_INTERVAL = env.float('PROFILER_INTERVAL', default=0.002)
+PROFILER_DIR = env.str('PROFILER_DIR', default=str(BASE_DIR / '.profiles'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'blog_post.queries': {'handlers': ['console'], 'level': env.str('QUERY_INSPECT_LOG_LEVEL', default='INFO')},
+        'blog_post.timing': {'handlers': ['console'], 'level': env.str('SERVER_TIMING_LOG_LEVEL', default='INFO')},
+    },
+}
+
+# Likes and comments count half as much towards a post's trending score
+# (GET api/post/trending/) after this many hours; see posts.trending.
+TRENDING_HALF_LIFE_HOURS = env.float('TRENDING_HALF_LIFE_HOURS', default=24.0)
+
+# Background jobs (jobs app), run by `manage.py run_workers`. Deleting a post
+# with at least JOBS_ASYNC_DELETE_THRESHOLD comments and likes is queued and
+# answered with 202 instead of being done in the request.
+JOBS_WORKERS = env.int('JOBS_WORKERS', default=2)
+JOBS_POLL_INTERVAL = env.float('JOBS_POLL_INTERVAL', default=1.0)
+JOBS_VISIBILITY_TIMEOUT = env.int('JOBS_VISIBILITY_TIMEOUT', default=300)
+JOBS_MAX_ATTEMPTS = env.int('JOBS_MAX_ATTEMPTS', default=5)
+JOBS_BACKOFF_BASE = env.float('JOBS_BACKOFF_BASE', default=10.0)
+JOBS_BACKOFF_MAX = env.float('JOBS_BACKOFF_MAX', default=3600.0)
+JOBS_ASYNC_DELETE_THRESHOLD = env.int('JOBS_ASYNC_DELETE_THRESHOLD', default=1000)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -136,7 +268,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -146,6 +278,18 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10
 }
 
+SIMPLE_JWT = {
+    # Issue access tokens with the team_id/is_superuser/token_version claims read
+    # by users.authentication.ClaimsJWTAuthentication.
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.ClaimsTokenRefreshSerializer',
+}
+
+# Current token_version per user. Must be shared between workers (not locmem)
+# when running more than one, or a worker can accept stale claims until TTL.
+TOKEN_VERSION_CACHE_ALIAS = env.str('TOKEN_VERSION_CACHE_ALIAS', default='default')
+TOKEN_VERSION_CACHE_TTL = env.int('TOKEN_VERSION_CACHE_TTL', default=60)
+
 AUTH_USER_MODEL = 'users.User'
 
 CORS_ALLOWED_ORIGINS = [
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from blog_post.views import pool_stats
+
+
+def test_pool_stats_is_staff_only(db):
+    client = APIClient()
+    response = client.get(reverse('database_pool'))
+    assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+    client.force_authenticate(user=User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup1')))
+    response = client.get(reverse('database_pool'))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    client.force_authenticate(user=User.objects.create_superuser(username='admin', password='testpassword', team=Team.objects.named('testgroup1')))
+    response = client.get(reverse('database_pool'))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['default']['pooled'] is False
+
+
+def test_pool_saturation():
+    pool = SimpleNamespace(max_size=10, get_stats=lambda: {'pool_size': 6, 'pool_available': 1, 'requests_waiting': 0})
+    connection = SimpleNamespace(vendor='postgresql', pool=pool, settings_dict={'CONN_MAX_AGE': 0})
+    stats = pool_stats(connection)
+    assert stats['pooled'] is True
+    assert stats['saturation'] == 0.5
+    assert stats['requests_waiting'] == 0
@@ -0,0 +1,68 @@
+import threading
+import time
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from users.models import Team, User
+from posts.models import Post
+from posts.serializers import PostListSerializer
+from blog_post.profiling import StackSampler
+
+
+@pytest.fixture
+def slow_post_list(monkeypatch):
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    Post.objects.create(
+        title='post', content='content', is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+    )
+    to_representation = PostListSerializer.to_representation
+
+    def slow_to_representation(self, instance):
+        busy(0.05)
+        return to_representation(self, instance)
+    monkeypatch.setattr(PostListSerializer, 'to_representation', slow_to_representation)
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampler_folds_stacks():
+    sampler = StackSampler(threading.get_ident(), 0.001).start()
+    busy(0.05)
+    stacks = sampler.stop()
+    assert any(stack.endswith('test_profiling:test_sampler_folds_stacks;test_profiling:busy') for stack in stacks)
+    assert sum(stacks.values()) > 5
+
+
+def test_profile_requested_with_token(db, slow_post_list, tmp_path):
+    with override_settings(PROFILER_TOKEN='staff-secret', PROFILER_DIR=str(tmp_path), PROFILER_INTERVAL=0.001, RESPONSE_CACHE_ENABLED=False):
+        response = Client().get(reverse('posts'), HTTP_X_PROFILE='wrong')
+        assert 'X-Profile-Samples' not in response
+        assert not list(tmp_path.iterdir())
+
+        response = Client().get(reverse('posts'), HTTP_X_PROFILE='staff-secret')
+    assert int(response['X-Profile-Samples']) > 0
+    lines = (tmp_path / 'posts.folded').read_text().splitlines()
+    assert any('posts.viewsets:list' in line and 'test_profiling:busy' in line for line in lines)
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+
+    response = Client().get(reverse('posts'), HTTP_X_PROFILE='staff-secret')
+    assert 'X-Profile-Samples' not in response
+
+
+def test_async_requests_profile_sync_views_only(db, slow_post_list, tmp_path):
+    client = AsyncClient()
+    with override_settings(PROFILER_TOKEN='staff-secret', PROFILER_DIR=str(tmp_path), PROFILER_INTERVAL=0.001, RESPONSE_CACHE_ENABLED=False):
+        response = async_to_sync(client.get)(reverse('posts'), headers={'X-Profile': 'staff-secret'})
+        assert int(response['X-Profile-Samples']) > 0
+        lines = (tmp_path / 'posts.folded').read_text().splitlines()
+        assert any('posts.viewsets:list' in line and 'test_profiling:busy' in line for line in lines)
+
+        response = async_to_sync(client.get)(reverse('async_posts'), headers={'X-Profile': 'staff-secret'})
+    assert response.status_code == 200
+    assert 'X-Profile-Samples' not in response
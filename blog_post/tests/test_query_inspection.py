@@ -0,0 +1,67 @@
+import logging
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from users.models import Team, User
+from posts.models import Post, Comment
+from blog_post.queries import assert_max_queries, fingerprint
+
+
+@pytest.fixture
+def create_comments():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    post = Post.objects.create(
+        title='post', content='content', is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+    )
+    for index in range(5):
+        Comment.objects.create(content=f'comment {index}', author=poster, post=post)
+    return post
+
+
+def test_fingerprint_ignores_literals():
+    assert fingerprint('SELECT * FROM "users_user" WHERE "id" = %s LIMIT 21') == fingerprint(
+        'SELECT * FROM "users_user"  WHERE "id" = 7 LIMIT 1'
+    )
+    assert fingerprint('SELECT 1 FROM t WHERE "id" IN (%s, %s, %s)') == 'SELECT ? FROM t WHERE "id" IN (...)'
+    assert fingerprint("SELECT 1 FROM t WHERE name = 'it''s'") == 'SELECT ? FROM t WHERE name = ?'
+
+
+def test_headers_and_log(db, create_comments, caplog):
+    with override_settings(QUERY_INSPECT_ENABLED=True, RESPONSE_CACHE_ENABLED=False):
+        with caplog.at_level(logging.INFO, logger='blog_post.queries'):
+            response = Client().get(reverse('comments', kwargs={'post_pk': create_comments.pk}))
+
+    assert int(response['X-DB-Query-Count']) > 0
+    assert float(response['X-DB-Query-Time']) >= 0
+    assert response['X-DB-Repeated-Queries'] == '0'
+    assert f"{response['X-DB-Query-Count']} queries" in caplog.text
+    assert 'N+1' not in caplog.text
+
+    with override_settings(QUERY_INSPECT_ENABLED=True, QUERY_INSPECT_REPEAT_THRESHOLD=0):
+        with caplog.at_level(logging.WARNING, logger='blog_post.queries'):
+            response = Client().get(reverse('comments', kwargs={'post_pk': create_comments.pk}))
+    assert int(response['X-DB-Repeated-Queries']) > 0
+    assert 'Possible N+1 on GET' in caplog.text
+
+    response = Client().get(reverse('comments', kwargs={'post_pk': create_comments.pk}))
+    assert 'X-DB-Query-Count' not in response
+
+
+def test_repeated_statements_are_flagged(db, create_comments):
+    with pytest.raises(AssertionError, match='5x SELECT'):
+        with assert_max_queries(10):
+            [comment.author.username for comment in Comment.objects.all()]
+
+    with assert_max_queries(1) as recorder:
+        [comment.author.username for comment in Comment.objects.select_related('author')]
+    assert recorder.count == 1
+
+
+def test_async_views_are_inspected(db, create_comments):
+    with override_settings(QUERY_INSPECT_ENABLED=True):
+        response = async_to_sync(AsyncClient().get)(reverse('async_comments', kwargs={'post_pk': create_comments.pk}))
+
+    assert response.status_code == 200
+    assert int(response['X-DB-Query-Count']) > 0
@@ -0,0 +1,92 @@
+import pytest
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post
+from posts.cache import response_cache
+from blog_post import routers
+from blog_post.routers import ReplicaRouter
+
+@pytest.fixture
+def replicas(settings, monkeypatch):
+    # Record which alias each read was routed to; the queries themselves still
+    # run on the test database.
+    settings.DATABASE_REPLICAS = ['replica1']
+    reads = []
+
+    def db_for_read(self, model, **hints):
+        reads.append(routers.current_read_database())
+        return DEFAULT_DB_ALIAS
+
+    monkeypatch.setattr(ReplicaRouter, 'db_for_read', db_for_read)
+    return reads
+
+
+@pytest.fixture
+def create_post():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup1'))
+    post = Post.objects.create(
+        title='post', content='content', is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+    )
+    return {
+        'poster': poster,
+        'reader': reader,
+        'post': post,
+    }
+
+
+def test_router_defaults_to_primary(settings):
+    settings.DATABASE_REPLICAS = ['replica1']
+    router = ReplicaRouter()
+    assert router.db_for_read(Post) == DEFAULT_DB_ALIAS
+    with routers.read_from(None):
+        routers.use_replica()
+        assert router.db_for_read(Post) == 'replica1'
+        assert router.db_for_write(Post) == DEFAULT_DB_ALIAS
+    assert router.db_for_read(Post) == DEFAULT_DB_ALIAS
+
+
+def test_no_replicas_configured():
+    with routers.read_from(None):
+        routers.use_replica()
+        assert routers.current_read_database() == DEFAULT_DB_ALIAS
+
+
+def test_reads_stick_to_primary_after_a_write(db, create_post, replicas):
+    poster = APIClient()
+    poster.force_authenticate(user=create_post['poster'])
+    reader = APIClient()
+    reader.force_authenticate(user=create_post['reader'])
+
+    assert poster.get(reverse('posts')).status_code == status.HTTP_200_OK
+    assert set(replicas) == {'replica1'}
+
+    replicas.clear()
+    response = poster.put(reverse('detailed_post', kwargs={'pk': create_post['post'].pk}), {'title': 'edited'})
+    assert response.status_code == status.HTTP_200_OK
+    assert set(replicas) == {DEFAULT_DB_ALIAS}
+
+    replicas.clear()
+    assert poster.get(reverse('posts')).data['results'][0]['title'] == 'edited'
+    assert set(replicas) == {DEFAULT_DB_ALIAS}
+
+    replicas.clear()
+    reader.get(reverse('all_comments'))
+    assert set(replicas) == {'replica1'}
+
+
+def test_replica_reads_are_not_cached_right_after_a_write(db, create_post, replicas):
+    client = APIClient()
+    client.force_authenticate(user=create_post['reader'])
+
+    routers.mark_write()
+    client.get(reverse('all_likes'))
+    assert not any(key.startswith(':1:response:') for key in response_cache()._cache)
+
+    routers.pin_cache().delete(routers.RECENT_WRITE_KEY)
+    client.get(reverse('all_likes'))
+    assert any(key.startswith(':1:response:') for key in response_cache()._cache)
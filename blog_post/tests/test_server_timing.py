@@ -0,0 +1,64 @@
+import json
+import logging
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+from users.authentication import ClaimsRefreshToken
+from users.models import Team, User
+from posts.models import Post
+from blog_post import timing
+
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    for index in range(3):
+        Post.objects.create(
+            title=f'post {index}', content='content', is_public=1, team=Team.objects.named('testgroup1'),
+            authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+        )
+    return poster
+
+
+def stages(header):
+    return {entry.split(';')[0]: float(entry.split('dur=')[1]) for entry in header.split(', ')}
+
+
+def test_sampled_request_reports_stages(db, create_posts, caplog):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {ClaimsRefreshToken.for_user(create_posts).access_token}')
+    with override_settings(SERVER_TIMING_SAMPLE_RATE=1.0, RESPONSE_CACHE_ENABLED=False):
+        with caplog.at_level(logging.INFO, logger='blog_post.timing'):
+            response = client.get(reverse('posts'))
+
+    timings = stages(response['Server-Timing'])
+    assert {'auth', 'jwt', 'permissions', 'paginate', 'serialize', 'render', 'db', 'total'} <= set(timings)
+    assert timings['jwt'] <= timings['auth'] <= timings['total']
+
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['view'] == 'posts'
+    assert record['status'] == 200
+    assert set(record['stages']) == set(timings)
+
+
+def test_unsampled_requests_skip_timing(db, create_posts):
+    client = APIClient()
+    with override_settings(SERVER_TIMING_SAMPLE_RATE=0.0):
+        response = client.get(reverse('posts'))
+    assert 'Server-Timing' not in response
+    assert not timing.sampled()
+    with timing.stage('serialize'):
+        pass
+
+
+def test_async_views_are_timed(db, create_posts, caplog):
+    with override_settings(SERVER_TIMING_SAMPLE_RATE=1.0):
+        with caplog.at_level(logging.INFO, logger='blog_post.timing'):
+            response = async_to_sync(AsyncClient().get)(reverse('async_posts'))
+
+    assert {'serialize', 'db', 'total'} <= set(stages(response['Server-Timing']))
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['view'] == 'async_posts'
+    assert record['queries'] > 0
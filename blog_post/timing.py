@@ -0,0 +1,128 @@
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .queries import QueryRecorder
+
+logger = logging.getLogger('blog_post.timing')
+
+# Stage durations of the sampled request being handled, or None. stage() is a
+# no-op unless ServerTimingMiddleware sampled the current request, so the
+# instrumented hot paths only pay a ContextVar lookup.
+_stages = ContextVar('server_timing_stages', default=None)
+_unsampled = nullcontext()
+
+
+@contextmanager
+def _timed(stages, name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - started
+
+
+def stage(name):
+    # with stage('serialize'): ... adds the block's time to the named stage;
+    # repeated and nested stages are allowed, each is summed on its own.
+    stages = _stages.get()
+    if stages is None:
+        return _unsampled
+    return _timed(stages, name)
+
+
+def sampled():
+    return _stages.get() is not None
+
+
+def timed(name):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def server_timing(stages):
+    return ', '.join(f'{name};dur={seconds * 1000:.2f}' for name, seconds in stages.items())
+
+
+class ServerTimingMiddleware:
+    # Times SERVER_TIMING_SAMPLE_RATE of the requests: the stages recorded
+    # with stage() (auth, jwt, permissions, view, paginate, serialize, render),
+    # SQL time as db and the whole request as total. They are sent in a
+    # Server-Timing header and logged as JSON on blog_post.timing.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if settings.SERVER_TIMING_SAMPLE_RATE <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        stages = {}
+        token = _stages.set(stages)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        try:
+            with recorder.record():
+                response = self.get_response(request)
+        finally:
+            _stages.reset(token)
+        return self.report(request, response, stages, recorder, started)
+
+    async def __acall__(self, request):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return await self.get_response(request)
+
+        # sync_to_async copies the context, so stages recorded on the ORM's
+        # thread land in the same dict; the recorder goes on that thread's
+        # connections (see QueryInspectMiddleware).
+        stages = {}
+        token = _stages.set(stages)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        try:
+            queries = await sync_to_async(recorder.record)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(queries.close)()
+        finally:
+            _stages.reset(token)
+        return self.report(request, response, stages, recorder, started)
+
+    def report(self, request, response, stages, recorder, started):
+        stages['db'] = recorder.duration
+        stages['total'] = time.perf_counter() - started
+
+        response['Server-Timing'] = server_timing(stages)
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'stages': {name: round(seconds * 1000, 3) for name, seconds in stages.items()},
+        }))
+        return response
@@ -17,9 +17,13 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .views import DatabasePoolViewset
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api-auth/', include('rest_framework.urls')),
     path('api/', include('users.urls')),
     path('api/', include('posts.urls')),
+    path('api/', include('jobs.urls')),
+    path('api/db/pool/', DatabasePoolViewset.as_view({'get': 'list'}), name='database_pool'), # staff only: connection pool saturation per database
 ]
@@ -0,0 +1,27 @@
+from django.db import connections
+from rest_framework import status, viewsets
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+
+def pool_stats(connection):
+    pool = getattr(connection, 'pool', None)
+    stats = {
+        'vendor': connection.vendor,
+        'pooled': pool is not None,
+        'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+    }
+    if pool is not None:
+        stats.update(pool.get_stats())
+        # Share of the pool's ceiling checked out right now; requests_waiting
+        # above zero means requests are queueing for a connection.
+        in_use = stats.get('pool_size', 0) - stats.get('pool_available', 0)
+        stats['saturation'] = round(in_use / pool.max_size, 3)
+    return stats
+
+
+class DatabasePoolViewset(viewsets.ViewSet):
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        return Response({connection.alias: pool_stats(connection) for connection in connections.all()}, status=status.HTTP_200_OK)
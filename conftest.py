@@ -0,0 +1,18 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Cache backends outlive the per-test database rollback.
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+@pytest.fixture
+def query_budget():
+    # with query_budget(5): client.get(...) fails on more than 5 queries or
+    # on a statement repeated per row; see blog_post.queries.assert_max_queries.
+    from blog_post.queries import assert_max_queries
+    return assert_max_queries
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+
+    def ready(self):
+        # Tasks register themselves when the tasks module of an app is imported.
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tasks')
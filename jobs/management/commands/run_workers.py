@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.queue import work
+
+
+def worker_name(index):
+    return f'{socket.gethostname()}:{os.getpid()}:{index}'
+
+
+def run_thread(index, stop, options):
+    try:
+        work(worker_name(index), stop, options['poll_interval'], options['visibility_timeout'])
+    finally:
+        connections.close_all()
+
+
+def run_process(index, stop, options):
+    # Forked children stop on SIGTERM from the parent after the current job.
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    run_thread(index, stop, options)
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers in threads or processes until interrupted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=settings.JOBS_WORKERS)
+        parser.add_argument('--processes', action='store_true', help='Run each worker in its own process instead of a thread')
+        parser.add_argument('--poll-interval', type=float, default=settings.JOBS_POLL_INTERVAL, help='Seconds to sleep when no job is due')
+        parser.add_argument('--visibility-timeout', type=int, default=settings.JOBS_VISIBILITY_TIMEOUT,
+                            help='Seconds a claimed job stays invisible to other workers')
+        parser.add_argument('--once', action='store_true', help='Run the jobs due now in this thread and exit')
+
+    def handle(self, *args, **options):
+        if options['once']:
+            ran = work(worker_name(0), threading.Event(), options['poll_interval'], options['visibility_timeout'], once=True)
+            self.stdout.write(self.style.SUCCESS(f'Ran {ran} jobs'))
+            return
+
+        if options['processes']:
+            # Children must not share the parent's database sockets.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            stop = context.Event()
+            workers = [context.Process(target=run_process, args=(index, stop, options)) for index in range(options['workers'])]
+        else:
+            stop = threading.Event()
+            workers = [threading.Thread(target=run_thread, args=(index, stop, options)) for index in range(options['workers'])]
+
+        for handled in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(handled, lambda signum, frame: stop.set())
+        for worker in workers:
+            worker.start()
+        kind = 'processes' if options['processes'] else 'threads'
+        self.stdout.write(f"Started {len(workers)} worker {kind}; stopping after the current jobs on SIGINT or SIGTERM")
+        for worker in workers:
+            worker.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped'))
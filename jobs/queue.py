@@ -0,0 +1,127 @@
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+# A durable job queue kept in the default database; no broker. Views enqueue
+# work (in their own transaction, so a job exists only if the request's
+# writes committed) and workers started by `manage.py run_workers` claim due
+# jobs with a compare-and-set UPDATE, which works the same on SQLite and
+# PostgreSQL. Failed jobs are retried with exponential backoff until
+# max_attempts; a job whose worker died is retried once its lock expires.
+
+TASKS = {}
+
+
+def task(name, max_attempts=None):
+    # @task('posts.delete_posts') registers a function run with the job's
+    # payload as keyword arguments. It must be idempotent: a job can run again
+    # after a crash or an expired lock.
+    def decorator(function):
+        function.task_name = name
+        function.max_attempts = max_attempts or settings.JOBS_MAX_ATTEMPTS
+        TASKS[name] = function
+        return function
+    return decorator
+
+
+def enqueue(task_name, payload=None, dedupe_key=None, delay=0, owner=None):
+    function = TASKS[task_name]
+    job = Job(
+        task=task_name, payload=payload or {}, dedupe_key=dedupe_key, max_attempts=function.max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay), owner=owner if owner and owner.is_authenticated else None,
+    )
+    if dedupe_key is None:
+        job.save()
+        return job
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        existing = Job.objects.filter(dedupe_key=dedupe_key, status__in=Job.ACTIVE).first()
+        if existing is None:
+            raise
+        return existing
+    return job
+
+
+def backoff(attempts):
+    # Seconds before retry number attempts + 1: base, 2x base, 4x base, ...
+    # capped, with up to 10% jitter so failed jobs do not retry in lockstep.
+    delay = min(settings.JOBS_BACKOFF_BASE * 2 ** (attempts - 1), settings.JOBS_BACKOFF_MAX)
+    return delay * (1 + random.random() / 10)
+
+
+def due(now):
+    return Q(status=Job.QUEUED, run_after__lte=now) | Q(status=Job.RUNNING, locked_until__lt=now)
+
+
+def claim(worker, visibility_timeout, candidates=10):
+    now = timezone.now()
+    pks = Job.objects.filter(due(now)).order_by('run_after', 'id').values_list('pk', flat=True)[:candidates]
+    for pk in pks:
+        claimed = Job.objects.filter(due(now), pk=pk).update(
+            status=Job.RUNNING, locked_by=worker, locked_until=now + timedelta(seconds=visibility_timeout),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def finish(job, **changes):
+    # Only the worker holding the lock may record the outcome.
+    return Job.objects.filter(pk=job.pk, locked_by=job.locked_by, status=Job.RUNNING).update(locked_until=None, **changes)
+
+
+def run_job(job):
+    function = TASKS.get(job.task)
+    if function is None:
+        return finish(job, status=Job.FAILED, finished_at=timezone.now(), last_error=f'Unknown task {job.task}')
+    if job.attempts > job.max_attempts:
+        return finish(job, status=Job.FAILED, finished_at=timezone.now(), last_error=job.last_error or 'Lock expired on every attempt')
+    try:
+        function(**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            return finish(job, status=Job.FAILED, finished_at=timezone.now(), last_error=error)
+        return finish(job, status=Job.QUEUED, run_after=timezone.now() + timedelta(seconds=backoff(job.attempts)), last_error=error)
+    return finish(job, status=Job.DONE, finished_at=timezone.now(), last_error='')
+
+
+def release_connections():
+    # What the request cycle does between requests: drop broken connections
+    # and those past CONN_MAX_AGE. A caller's open transaction is left alone.
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close_if_unusable_or_obsolete()
+
+
+def work(worker, stop, poll_interval=None, visibility_timeout=None, once=False):
+    # Runs due jobs until stop (a threading or multiprocessing Event) is set;
+    # with once, returns as soon as nothing is due. Returns the jobs run.
+    poll_interval = settings.JOBS_POLL_INTERVAL if poll_interval is None else poll_interval
+    visibility_timeout = settings.JOBS_VISIBILITY_TIMEOUT if visibility_timeout is None else visibility_timeout
+    ran = 0
+    while not stop.is_set():
+        release_connections()
+        try:
+            job = claim(worker, visibility_timeout)
+        except OperationalError:
+            # e.g. SQLite's "database is locked" while another worker writes.
+            job = None
+        if job is not None:
+            run_job(job)
+            ran += 1
+        elif once:
+            break
+        else:
+            stop.wait(poll_interval)
+    return ran
@@ -0,0 +1,128 @@
+import threading
+from datetime import timedelta
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment, Like
+from jobs.models import Job
+from jobs.queue import TASKS, claim, enqueue, run_job, task, work
+
+calls = []
+
+
+@task('tests.flaky', max_attempts=3)
+def flaky(fail_times):
+    calls.append(fail_times)
+    if len(calls) <= fail_times:
+        raise RuntimeError('flaky failure')
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+
+def run_due():
+    return work('test-worker', threading.Event(), once=True)
+
+
+def make_due(job):
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+
+def test_dedupe_key_while_active(db):
+    first = enqueue('tests.flaky', {'fail_times': 0}, dedupe_key='flaky')
+    assert enqueue('tests.flaky', {'fail_times': 0}, dedupe_key='flaky').pk == first.pk
+    assert run_due() == 1
+
+    second = enqueue('tests.flaky', {'fail_times': 0}, dedupe_key='flaky')
+    assert second.pk != first.pk
+    assert Job.objects.get(pk=first.pk).status == Job.DONE
+
+
+def test_retries_with_backoff(db):
+    job = enqueue('tests.flaky', {'fail_times': 1})
+    assert run_due() == 1
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+    assert job.attempts == 1
+    assert job.run_after > timezone.now() + timedelta(seconds=9)
+    assert 'flaky failure' in job.last_error
+    assert run_due() == 0
+
+    make_due(job)
+    assert run_due() == 1
+    job.refresh_from_db()
+    assert job.status == Job.DONE
+    assert job.attempts == 2
+    assert job.last_error == ''
+
+
+def test_fails_after_max_attempts(db):
+    job = enqueue('tests.flaky', {'fail_times': 10})
+    for _ in range(3):
+        make_due(job)
+        run_due()
+    job.refresh_from_db()
+    assert job.status == Job.FAILED
+    assert job.attempts == 3
+    assert job.finished_at is not None
+    assert len(calls) == 3
+
+
+def test_visibility_timeout(db):
+    job = enqueue('tests.flaky', {'fail_times': 0})
+    assert claim('crashed-worker', visibility_timeout=60).pk == job.pk
+    assert claim('other-worker', visibility_timeout=60) is None
+
+    Job.objects.filter(pk=job.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+    reclaimed = claim('other-worker', visibility_timeout=60)
+    assert reclaimed.pk == job.pk
+    assert reclaimed.attempts == 2
+
+    run_job(reclaimed)
+    assert Job.objects.get(pk=job.pk).status == Job.DONE
+    assert 'tests.flaky' in TASKS
+
+
+def test_run_workers_once(db):
+    enqueue('tests.flaky', {'fail_times': 0})
+    enqueue('tests.flaky', {'fail_times': 0})
+    call_command('run_workers', '--once')
+    assert list(Job.objects.values_list('status', flat=True)) == [Job.DONE, Job.DONE]
+
+
+def test_heavy_post_delete_is_queued(db):
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup1'))
+    post = Post.objects.create(
+        title='post', content='content', is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+    )
+    Comment.objects.create(content='comment', author=reader, post=post)
+    Like.objects.create(author=reader, post=post)
+    client = APIClient()
+    client.force_authenticate(user=poster)
+
+    with override_settings(JOBS_ASYNC_DELETE_THRESHOLD=2):
+        response = client.delete(reverse('detailed_post', kwargs={'pk': post.pk}))
+        assert client.delete(reverse('detailed_post', kwargs={'pk': post.pk})).data['job'] == response.data['job']
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert Post.objects.filter(pk=post.pk).exists()
+
+    status_url = response.data['status_url']
+    assert client.get(status_url).data['status'] == Job.QUEUED
+    other = APIClient()
+    other.force_authenticate(user=reader)
+    assert other.get(status_url).status_code == status.HTTP_404_NOT_FOUND
+
+    assert run_due() == 1
+    assert client.get(status_url).data['status'] == Job.DONE
+    assert not Post.objects.exists()
+    assert not Comment.objects.exists()
+    assert not Like.objects.exists()
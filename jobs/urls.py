@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import JobViewset
+
+urlpatterns = [
+    path('jobs/<int:pk>/', JobViewset.as_view({'get': 'retrieve'}), name='job'), # get request to see the status of a background job
+]
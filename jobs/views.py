@@ -0,0 +1,17 @@
+from rest_framework import status, viewsets
+from rest_framework.response import Response
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobViewset(viewsets.ViewSet):
+    # Status of a job a request enqueued (the 202 responses link here); visible
+    # to the user who enqueued it and to staff.
+    def retrieve(self, request, pk):
+        job = Job.objects.filter(pk=pk).first()
+        if job is None or not (request.user.is_staff or (request.user.is_authenticated and job.owner_id == request.user.pk)):
+            return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+        data = JobSerializer(job).data
+        if not request.user.is_staff:
+            data.pop('last_error')
+        return Response(data, status=status.HTTP_200_OK)
@@ -0,0 +1,124 @@
+from functools import wraps
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+from users.authentication import aauthenticate
+from users.models import User
+
+from .models import Post, Comment, Like
+from .pagination import LikePagination, PostPagination, CommentPagination
+from .permissions import VisibleAndEditableBlogs
+from .serializers import PostSerializer, PostListSerializer, LikeSerializer, CommentSerializer
+
+# Async versions of the post/comment/like read endpoints for the ASGI
+# deployment. They return the same payloads as the viewsets but authenticate,
+# query and paginate without a sync bridge, so a worker is not tied up while a
+# request waits. The response cache and ETag handling of the viewsets are not
+# applied here.
+
+
+def async_read_view(view):
+    @require_GET
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            user = await aauthenticate(request)
+            drf_request = Request(request)
+            drf_request.user = user
+            data, status_code = await view(drf_request, *args, **kwargs)
+        except APIException as exc:
+            data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            status_code = exc.status_code
+        return JsonResponse(data, status=status_code, encoder=JSONEncoder, safe=False)
+    return wrapper
+
+
+async def paginated(paginator, queryset, serializer_class, request):
+    page = await paginator.apaginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True, context={'request': request})
+    return paginator.get_paginated_response(serializer.data).data, status.HTTP_200_OK
+
+
+async def for_visible_post(request, post_pk, model, serializer_class, paginator, forbidden_message):
+    try:
+        post = await Post.objects.select_related('author').aget(pk=post_pk)
+    except Exception as e:
+        return {'error': str(e)}, status.HTTP_404_NOT_FOUND
+
+    if not VisibleAndEditableBlogs().has_read_permission(request, post):
+        return {'error': forbidden_message}, status.HTTP_403_FORBIDDEN
+
+    queryset = model.objects.filter(post=post).select_related('author').order_by('-created_at', '-id')
+    return await paginated(paginator, queryset, serializer_class, request)
+
+
+async def for_user(request, user_pk, model, serializer_class, paginator):
+    try:
+        user = await User.objects.aget(pk=user_pk)
+    except Exception as e:
+        return {'error': str(e)}, status.HTTP_404_NOT_FOUND
+
+    queryset = model.objects.visible_to(request.user).filter(author=user).select_related('author')
+    return await paginated(paginator, queryset, serializer_class, request)
+
+
+@async_read_view
+async def post_list(request):
+    user = request.user
+    posts = Post.objects.visible_to(user).with_permissions(user).with_liked(user).select_related('author', 'team').defer('content')
+    return await paginated(PostPagination(), posts, PostListSerializer, request)
+
+
+@async_read_view
+async def post_detail(request, pk):
+    user = request.user
+    try:
+        post = await Post.objects.with_permissions(user).with_liked(user).select_related('author', 'team').aget(pk=pk)
+    except Exception as e:
+        return {'error': str(e)}, status.HTTP_404_NOT_FOUND
+
+    if not VisibleAndEditableBlogs().has_read_permission(request, post):
+        return {'error': 'You do not have permission to view this post'}, status.HTTP_404_NOT_FOUND
+    return PostSerializer(post, context={'request': request}).data, status.HTTP_200_OK
+
+
+@async_read_view
+async def post_comments(request, post_pk):
+    return await for_visible_post(
+        request, post_pk, Comment, CommentSerializer, CommentPagination(),
+        'You do not have permission to view comments on this post',
+    )
+
+
+@async_read_view
+async def user_comments(request, user_pk):
+    return await for_user(request, user_pk, Comment, CommentSerializer, CommentPagination())
+
+
+@async_read_view
+async def all_comments(request):
+    comments = Comment.objects.visible_to(request.user).select_related('author')
+    return await paginated(CommentPagination(), comments, CommentSerializer, request)
+
+
+@async_read_view
+async def post_likes(request, post_pk):
+    return await for_visible_post(
+        request, post_pk, Like, LikeSerializer, LikePagination(),
+        'You do not have permission to view likes on this post',
+    )
+
+
+@async_read_view
+async def user_likes(request, user_pk):
+    return await for_user(request, user_pk, Like, LikeSerializer, LikePagination())
+
+
+@async_read_view
+async def all_likes(request):
+    likes = Like.objects.visible_to(request.user).select_related('author')
+    return await paginated(LikePagination(), likes, LikeSerializer, request)
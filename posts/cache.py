@@ -0,0 +1,107 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from blog_post import routers
+
+# Each cached read depends on one or more of these scopes. Writes bump the
+# scope's version, which changes the key of every response built on it; old
+# entries are never looked up again and age out through TTL/LRU eviction.
+POST = 'post'
+COMMENT = 'comment'
+LIKE = 'like'
+
+
+def response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f'version:{scope}'
+
+
+def get_versions(scopes):
+    cache = response_cache()
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Seed from the clock rather than 0 so an evicted counter can never
+            # come back to a value that old entries were stored under.
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def _bump(scopes):
+    cache = response_cache()
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.set(_version_key(scope), time.time_ns(), timeout=None)
+
+
+def bump_versions(*scopes):
+    # Bump now so this request's own follow-up reads miss, and again after
+    # commit so nothing cached from pre-commit data outlives the write.
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+    routers.mark_write()
+
+
+def visibility_class(user, per_user=False):
+    if not user.is_authenticated:
+        return 'anonymous'
+    if user.is_superuser:
+        return f'superuser:{user.pk}' if per_user else 'superuser'
+    # The author rule makes every authenticated user's view potentially unique.
+    return f'team:{user.team_id}:author:{user.pk}'
+
+
+def versioned_key(prefix, parts, scopes):
+    parts = list(parts) + [str(version) for version in get_versions(scopes)]
+    return f'{prefix}:' + hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+def cached_value(prefix, parts, scopes, compute):
+    # Like cached_response, for any value derived from the scopes (None included).
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return compute()
+    cache = response_cache()
+    key = versioned_key(prefix, parts, scopes)
+    found = cache.get(key)
+    if found is None:
+        found = (compute(),)
+        if not routers.replica_may_lag():
+            cache.set(key, found)
+    return found[0]
+
+
+# per_user is for payloads that depend on the user beyond visibility (e.g.
+# is_liked), so even superusers cannot share entries.
+def cached_response(*scopes, per_user=False):
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if not settings.RESPONSE_CACHE_ENABLED:
+                return view_method(self, request, *args, **kwargs)
+
+            cache = response_cache()
+            key = versioned_key('response', [view_method.__qualname__, request.build_absolute_uri(), visibility_class(request.user, per_user)], scopes)
+            data = cache.get(key)
+            if data is not None:
+                return Response(data, status=status.HTTP_200_OK)
+            response = view_method(self, request, *args, **kwargs)
+            # A lagging replica could store pre-write data under the new version.
+            if response.status_code == status.HTTP_200_OK and not routers.replica_may_lag():
+                cache.set(key, response.data)
+            return response
+        return wrapper
+    return decorator
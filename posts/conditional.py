@@ -0,0 +1,68 @@
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from blog_post import routers
+
+from .cache import response_cache, versioned_key, visibility_class
+
+# Validators come from the response cache's version counters, not the tables:
+# any write in a scope bumps its version, which changes the ETag of every read
+# built on it, so revalidating costs no queries. Last-Modified is the time the
+# current versions were first served, which is never earlier than the write
+# that produced them. Every worker must see the same counters for that to
+# hold, hence CONDITIONAL_GET_ENABLED (see settings).
+
+
+def _first_served(key):
+    cache = response_cache()
+    cache.add(key, time.time())
+    return cache.get(key) or time.time()
+
+
+def patch_caching_headers(request, response):
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.HTTP_CACHE_MAX_AGE)
+    patch_vary_headers(response, ['Authorization', 'Cookie'])
+
+
+def conditional_response(*scopes):
+    # ETag/Last-Modified for a viewset read action. A matching If-None-Match
+    # returns 304 before the view, its cache or its serializer run: the ETag
+    # is only ever sent with a 200, so a client can only hold one for a
+    # response it was allowed to see. If-Modified-Since (and '*') could match
+    # a 403/404 the view has not decided yet, so they are checked against the
+    # view's response instead, which still saves sending the body.
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            # A lagging replica could serve pre-write data under the new versions.
+            if not settings.CONDITIONAL_GET_ENABLED or routers.replica_may_lag():
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code == 200:
+                    patch_caching_headers(request, response)
+                return response
+
+            key = versioned_key('validators', [view_method.__qualname__, request.get_full_path(), visibility_class(request.user, per_user=True)], scopes)
+            etag = quote_etag(key.split(':', 1)[1])
+            last_modified = int(_first_served(key))
+
+            response = None
+            if request.META.get('HTTP_IF_NONE_MATCH', '*').strip() != '*':
+                response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code == 200:
+                    response = get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+                patch_caching_headers(request, response)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,68 @@
+from django.db import connections, router, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from jobs.queue import enqueue
+
+from . import cache
+from .models import Post, Comment, Like, AuthorActivity, delete_sql, record_activity, record_post_activity
+
+# Set-based replacements for Model.delete() on posts and users. The ORM's
+# Collector loads every cascaded comment and like to send post_delete, which
+# for a popular post or a prolific user means thousands of rows in memory and
+# chunked DELETEs under a write lock. These issue a fixed number of
+# statements instead; the work the signal receivers in posts.signals would do
+# (counters, activity rollups, cache versions) is done here in bulk. The full-text index follows
+# through its database triggers or generated column.
+
+
+def _raw_delete(queryset):
+    sql, params = delete_sql(queryset, queryset.db)
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def _per_post(model, **filters):
+    totals = model.objects.filter(post=OuterRef('pk'), **filters).order_by().values('post').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(totals), 0)
+
+
+def delete_posts(posts):
+    # Deletes the posts of a queryset with their comments and likes; returns
+    # the number of posts deleted.
+    using = router.db_for_write(Post)
+    post_ids = posts.using(using).order_by().values('pk')
+    with transaction.atomic(using=using):
+        record_post_activity(Post.objects.using(using).filter(pk__in=post_ids), sign=-1)
+        _raw_delete(Like.objects.using(using).filter(post__in=post_ids))
+        _raw_delete(Comment.objects.using(using).filter(post__in=post_ids))
+        deleted = _raw_delete(Post.objects.using(using).filter(pk__in=post_ids))
+        if deleted:
+            cache.bump_versions(cache.POST, cache.COMMENT, cache.LIKE)
+    return deleted
+
+
+def delete_user_content(user_ids):
+    # Removes everything of these users' in the posts app: their posts (with
+    # all comments and likes on them) and their comments and likes on other
+    # people's posts, whose counters are lowered to match. Their trending
+    # scores are rebuilt by a background job.
+    using = router.db_for_write(Post)
+    others = Post.objects.using(using).exclude(author__in=user_ids)
+    with transaction.atomic(using=using):
+        engaged = list(others.filter(Q(like__author__in=user_ids) | Q(comment__author__in=user_ids)).order_by().values_list('pk', flat=True).distinct())
+        others.filter(like__author__in=user_ids).update(like_count=F('like_count') - _per_post(Like, author__in=user_ids))
+        others.filter(comment__author__in=user_ids).update(comment_count=F('comment_count') - _per_post(Comment, author__in=user_ids))
+        likes = Like.objects.using(using).filter(author__in=user_ids)
+        comments = Comment.objects.using(using).filter(author__in=user_ids)
+        record_activity(likes, 'likes', sign=-1, post='post__')
+        record_activity(comments, 'comments', sign=-1, post='post__')
+        _raw_delete(likes)
+        _raw_delete(comments)
+        delete_posts(Post.objects.using(using).filter(author__in=user_ids))
+        # Emptied by delete_posts; removed here rather than loaded by the Collector.
+        _raw_delete(AuthorActivity.objects.using(using).filter(author__in=user_ids))
+        cache.bump_versions(cache.POST, cache.COMMENT, cache.LIKE)
+        if engaged:
+            enqueue('posts.recompute_trending', {'post_ids': engaged})
@@ -0,0 +1,151 @@
+import datetime
+import gzip
+import json
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+
+# Parents before children so foreign keys always point at loaded rows.
+# Many-to-many tables (user groups/permissions) are not part of the dump.
+DUMP_MODELS = ['users.Team', 'users.User', 'posts.Post', 'posts.Comment', 'posts.Like']
+MANIFEST = 'manifest.json'
+
+
+class DumpEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder rounds datetimes to milliseconds; keep microseconds so
+    # (created_at, id) ordering survives a round trip.
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def dump_models():
+    return [apps.get_model(label) for label in DUMP_MODELS]
+
+
+def columns(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+@contextmanager
+def snapshot(using):
+    # Reads every model of an export from one point in time, so a comment
+    # never points at a post written after the posts were dumped. SQLite holds
+    # its read snapshot from the first SELECT of a transaction to its end;
+    # PostgreSQL's default READ COMMITTED takes one per statement, so the
+    # transaction is raised to REPEATABLE READ before anything is read (an
+    # enclosing transaction keeps its own level). Without WAL, SQLite writers
+    # wait for the export to finish.
+    connection = connections[using]
+    outermost = not connection.in_atomic_block
+    with transaction.atomic(using=using):
+        if outermost and connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+        yield
+
+
+def export_model(model, directory, chunk_rows, batch_size, compresslevel=6, using=None):
+    attnames = columns(model)
+    rows = model._default_manager.using(using).order_by('pk').values_list(*attnames).iterator(chunk_size=batch_size)
+    files = []
+    handle = None
+    written = 0
+    for row in rows:
+        if handle is None or written % chunk_rows == 0:
+            if handle:
+                handle.close()
+            name = f'{model._meta.label_lower}-{len(files) + 1:05d}.ndjson.gz'
+            files.append(name)
+            handle = gzip.open(Path(directory) / name, 'wt', encoding='utf-8', compresslevel=compresslevel)
+        handle.write(json.dumps(dict(zip(attnames, row)), cls=DumpEncoder) + '\n')
+        written += 1
+    if handle:
+        handle.close()
+    return {'model': model._meta.label, 'rows': written, 'files': files}
+
+
+def decode_value(field, raw):
+    # Columns added after the dump was taken fall back to their default.
+    if field.attname not in raw:
+        return field.get_default()
+    value = raw[field.attname]
+    return None if value is None else field.to_python(value)
+
+
+def read_rows(model, directory, files):
+    fields = model._meta.concrete_fields
+    for name in files:
+        with gzip.open(Path(directory) / name, 'rt', encoding='utf-8') as handle:
+            for line in handle:
+                raw = json.loads(line)
+                yield [decode_value(field, raw) for field in fields]
+
+
+@contextmanager
+def stored_timestamps(model):
+    # bulk_create runs pre_save, which would overwrite created_at/updated_at.
+    fields = [field for field in model._meta.concrete_fields if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def load_with_bulk_create(model, rows, batch_size, using):
+    attnames = columns(model)
+    manager = model._default_manager.using(using)
+    batch = []
+    loaded = 0
+    with stored_timestamps(model):
+        for row in rows:
+            batch.append(model(**dict(zip(attnames, row))))
+            if len(batch) >= batch_size:
+                manager.bulk_create(batch, batch_size=batch_size)
+                loaded += len(batch)
+                batch = []
+        if batch:
+            manager.bulk_create(batch, batch_size=batch_size)
+            loaded += len(batch)
+    return loaded
+
+
+def load_with_copy(model, rows, using):
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    fields = model._meta.concrete_fields
+    column_list = ', '.join(quote(field.column) for field in fields)
+    loaded = 0
+    connection.ensure_connection()
+    with connection.connection.cursor() as cursor:
+        with cursor.copy(f'COPY {quote(model._meta.db_table)} ({column_list}) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row([field.get_db_prep_save(value, connection) for field, value in zip(fields, row)])
+                loaded += 1
+    return loaded
+
+
+def can_copy(using):
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3
+
+
+def reset_sequences(models, using):
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,46 @@
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from posts.models import Post, Comment, Like, TeamActivity, AuthorActivity, record_activity
+
+
+def start_of(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the TeamActivity and AuthorActivity rollups from posts, comments and likes, a range of days at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, help='First day to rebuild (default: the first post)')
+        parser.add_argument('--until', type=date.fromisoformat, help='Last day to rebuild (default: today)')
+        parser.add_argument('--batch-days', type=int, default=30, help='Days rebuilt per transaction')
+
+    def handle(self, *args, **options):
+        until = options['until'] or timezone.localdate()
+        since = options['since']
+        if since is None:
+            first = Post.objects.aggregate(first=Min('created_at'))['first']
+            since = timezone.localdate(first) if first else until
+        if since > until:
+            raise CommandError('--since must not be after --until')
+
+        day = since
+        while day <= until:
+            last = min(day + timedelta(days=options['batch_days'] - 1), until)
+            created = {'created_at__gte': start_of(day), 'created_at__lt': start_of(last + timedelta(days=1))}
+            # Each range is replaced as a whole, so a rerun gives the same rows.
+            with transaction.atomic():
+                for model in (TeamActivity, AuthorActivity):
+                    model.objects.filter(day__range=(day, last)).delete()
+                record_activity(Post.objects.filter(**created), 'posts')
+                record_activity(Comment.objects.filter(**created), 'comments', post='post__')
+                record_activity(Like.objects.filter(**created), 'likes', post='post__')
+            self.stdout.write(f'{day} to {last}')
+            day = last + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt activity from {since} to {until}'))
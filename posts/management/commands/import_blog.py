@@ -0,0 +1,53 @@
+import json
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from posts import cache
+from posts.dumps import MANIFEST, can_copy, load_with_bulk_create, load_with_copy, read_rows, reset_sequences
+from posts.models import Post, TeamActivity, AuthorActivity, record_post_activity
+
+
+class Command(BaseCommand):
+    help = 'Load a dump written by export_blog, keeping primary keys (COPY on PostgreSQL, bulk_create elsewhere)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='Directory written by export_blog')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create batch')
+        parser.add_argument('--no-copy', action='store_true', help='Use bulk_create even on PostgreSQL')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        directory = Path(options['input'])
+        try:
+            manifest = json.loads((directory / MANIFEST).read_text())
+        except FileNotFoundError:
+            raise CommandError(f'{directory / MANIFEST} not found')
+
+        using = options['database']
+        use_copy = can_copy(using) and not options['no_copy']
+        models = []
+        # All or nothing: a failed restore leaves the database as it was.
+        with transaction.atomic(using=using):
+            for entry in manifest:
+                model = apps.get_model(entry['model'])
+                models.append(model)
+                started = time.monotonic()
+                rows = read_rows(model, directory, entry['files'])
+                if use_copy:
+                    loaded = load_with_copy(model, rows, using)
+                else:
+                    loaded = load_with_bulk_create(model, rows, options['batch_size'], using)
+                self.stdout.write(f"{entry['model']}: {loaded} rows in {time.monotonic() - started:.1f}s")
+            reset_sequences(models, using)
+            # The rollups are not part of the dump; rebuilt from what was loaded.
+            for model in (TeamActivity, AuthorActivity):
+                model.objects.using(using).all().delete()
+            record_post_activity(Post.objects.using(using).all(), using=using)
+
+        # bulk_create and COPY send no signals.
+        cache.bump_versions(cache.POST, cache.COMMENT, cache.LIKE)
+        self.stdout.write(self.style.SUCCESS(f"Imported {directory} using {'COPY' if use_copy else 'bulk_create'}"))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from posts import cache
+from posts.models import Post, Comment, Like, count_per_post
+
+
+class Command(BaseCommand):
+    help = 'Recompute Post.like_count and Post.comment_count where they drifted from the real totals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help='Only report the posts that drifted')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        checked = fixed = 0
+
+        while True:
+            batch = list(Post.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1]
+            checked += len(batch)
+
+            # Drift is found and fixed in one UPDATE per batch, so an increment
+            # committed meanwhile is not overwritten by a total read earlier.
+            likes, comments = count_per_post(Like), count_per_post(Comment)
+            drifted = Post.objects.filter(~Q(like_count=likes) | ~Q(comment_count=comments), pk__in=batch)
+            if options['dry_run']:
+                for pk, like_count, comment_count in drifted.with_actual_counts().values_list('pk', 'actual_like_count', 'actual_comment_count'):
+                    fixed += 1
+                    self.stdout.write(f'post {pk}: likes={like_count} comments={comment_count}')
+            else:
+                fixed += drifted.update(like_count=likes, comment_count=comments)
+
+        if fixed and not options['dry_run']:
+            cache.bump_versions(cache.POST)
+        action = 'would fix' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} posts, {action} {fixed}'))
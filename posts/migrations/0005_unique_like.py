@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 06:25
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_likes(apps, schema_editor):
+    Like = apps.get_model('posts', 'Like')
+    Post = apps.get_model('posts', 'Post')
+    duplicates = (
+        Like.objects.values('author', 'post').order_by()
+        .annotate(keep=Min('id'), total=Count('id')).filter(total__gt=1)
+    )
+    for duplicate in list(duplicates):
+        removed, _ = Like.objects.filter(author=duplicate['author'], post=duplicate['post']).exclude(id=duplicate['keep']).delete()
+        Post.objects.filter(pk=duplicate['post']).update(like_count=models.F('like_count') - removed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_likes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='like',
+            constraint=models.UniqueConstraint(fields=('author', 'post'), name='unique_like_per_author'),
+        ),
+    ]
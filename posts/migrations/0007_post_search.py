@@ -0,0 +1,79 @@
+# Generated by Django 5.1.6 on 2026-10-18 10:05
+
+from django.db import migrations
+
+# A copy of the index as first created; posts.search reads it and puts the
+# SQLite triggers back after table rebuilds, but is not imported here.
+
+SQLITE_TRIGGERS = {
+    'posts_post_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS posts_post_fts_insert AFTER INSERT ON posts_post BEGIN
+            INSERT INTO posts_post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    """,
+    'posts_post_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS posts_post_fts_delete AFTER DELETE ON posts_post BEGIN
+            INSERT INTO posts_post_fts(posts_post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        END
+    """,
+    'posts_post_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS posts_post_fts_update AFTER UPDATE OF title, content ON posts_post BEGIN
+            INSERT INTO posts_post_fts(posts_post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO posts_post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    """,
+}
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5(
+        title, content, content='posts_post', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    *SQLITE_TRIGGERS.values(),
+    "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    *(f'DROP TRIGGER IF EXISTS {name}' for name in SQLITE_TRIGGERS),
+    'DROP TABLE IF EXISTS posts_post_fts',
+]
+
+POSTGRESQL_FORWARD = [
+    """
+    ALTER TABLE posts_post ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX posts_post_search_idx ON posts_post USING GIN (search_vector)',
+]
+
+POSTGRESQL_REVERSE = [
+    'DROP INDEX IF EXISTS posts_post_search_idx',
+    'ALTER TABLE posts_post DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def run_statements(forward):
+    # RunPython operation running the statements for the current vendor.
+    statements = {
+        'sqlite': SQLITE_FORWARD if forward else SQLITE_REVERSE,
+        'postgresql': POSTGRESQL_FORWARD if forward else POSTGRESQL_REVERSE,
+    }
+
+    def operation(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_comment_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_statements(forward=True), run_statements(forward=False)),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.6 on 2026-10-18 07:16
+
+from django.db import migrations, models
+from django.db.models.functions import Concat, Length, Substr
+from django.db.models.lookups import LessThan
+
+EXCERPT_LENGTH = 200
+
+
+def fill_excerpts(apps, schema_editor):
+    # Same rule as posts.models.excerpt_of, in one UPDATE.
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.update(excerpt=models.Case(
+        models.When(LessThan(Length('content'), EXCERPT_LENGTH), then=models.F('content')),
+        default=Concat(Substr('content', 1, EXCERPT_LENGTH), models.Value('...')),
+        output_field=models.CharField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_post_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=203),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.1.6 on 2026-10-18 07:52
+
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import migrations, models
+
+# posts.trending as of this migration, copied so later changes to it cannot
+# change what this migration does. The half-life falls back to its default if
+# the setting is gone.
+BATCH_SIZE = 1000
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+
+
+def event_value(weight, at, half_life):
+    return math.log(weight) + (at - EPOCH).total_seconds() / half_life * math.log(2)
+
+
+def combine(values):
+    if not values:
+        return None
+    top = max(values)
+    return top + math.log(sum(math.exp(value - top) for value in values))
+
+
+def fill_trending_scores(apps, schema_editor):
+    # Same as PostQuerySet.recompute_trending, for the posts with any likes
+    # or comments, a batch of posts at a time.
+    Post = apps.get_model('posts', 'Post')
+    half_life = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 24.0) * 3600
+    weights = [(apps.get_model('posts', 'Like'), LIKE_WEIGHT), (apps.get_model('posts', 'Comment'), COMMENT_WEIGHT)]
+    post_ids = list(Post.objects.filter(models.Q(like_count__gt=0) | models.Q(comment_count__gt=0)).values_list('pk', flat=True))
+    for start in range(0, len(post_ids), BATCH_SIZE):
+        values = {pk: [] for pk in post_ids[start:start + BATCH_SIZE]}
+        for model, weight in weights:
+            for post_id, created_at in model.objects.filter(post_id__in=list(values)).values_list('post_id', 'created_at'):
+                values[post_id].append(event_value(weight, created_at, half_life))
+        Post.objects.bulk_update([Post(pk=pk, trending_score=combine(events)) for pk, events in values.items()], ['trending_score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_post_excerpt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='trending_score',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('trending_score__isnull', False)), fields=['-trending_score', '-id'], name='post_trending_idx'),
+        ),
+        migrations.RunPython(fill_trending_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+
+BATCH_SIZE = 1000
+
+
+def fill_activity(apps, schema_editor):
+    # Same rows as the backfill_activity command, from one grouped query per
+    # kind and rollup.
+    sources = [
+        ('posts', apps.get_model('posts', 'Post'), ''),
+        ('comments', apps.get_model('posts', 'Comment'), 'post__'),
+        ('likes', apps.get_model('posts', 'Like'), 'post__'),
+    ]
+    for name, key in (('TeamActivity', 'team'), ('AuthorActivity', 'author_id')):
+        model = apps.get_model('posts', name)
+        counts = {}
+        for kind, source, prefix in sources:
+            grouped = (
+                source.objects.order_by()
+                .values(activity_key=F(f'{prefix}{key}'), activity_day=TruncDate('created_at'))
+                .annotate(total=Count('pk'))
+            )
+            for row in grouped.iterator():
+                counts.setdefault((row['activity_key'], row['activity_day']), {})[kind] = row['total']
+        rows = [model(**{key: value, 'day': day, **totals}) for (value, day), totals in counts.items()]
+        model.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_trending_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('team', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('posts', models.IntegerField(default=0)),
+                ('comments', models.IntegerField(default=0)),
+                ('likes', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('team', 'day'), name='team_activity_per_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AuthorActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('posts', models.IntegerField(default=0)),
+                ('comments', models.IntegerField(default=0)),
+                ('likes', models.IntegerField(default=0)),
+                ('author', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('author', 'day'), name='author_activity_per_day')],
+            },
+        ),
+        migrations.RunPython(fill_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TEAM_MODELS = ['Post', 'TeamActivity']
+
+
+def teams_from_names(apps, schema_editor):
+    # Teams named only on posts are created too; then one UPDATE per team
+    # and table.
+    Team = apps.get_model('users', 'Team')
+    tables = [apps.get_model('posts', name) for name in TEAM_MODELS]
+    names = set()
+    for model in tables:
+        names.update(model.objects.values_list('team', flat=True).distinct())
+    Team.objects.bulk_create([Team(name=name) for name in names], ignore_conflicts=True)
+    for pk, name in Team.objects.filter(name__in=names).values_list('pk', 'name'):
+        for model in tables:
+            model.objects.filter(team=name).update(team_ref=pk)
+
+
+def names_from_teams(apps, schema_editor):
+    Team = apps.get_model('users', 'Team')
+    for pk, name in Team.objects.values_list('pk', 'name'):
+        for model_name in TEAM_MODELS:
+            apps.get_model('posts', model_name).objects.filter(team_ref=pk).update(team=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_activity_rollups'),
+        ('users', '0003_team'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_team_idx',
+        ),
+        migrations.RemoveConstraint(
+            model_name='teamactivity',
+            name='team_activity_per_day',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='team_ref',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, to='users.team'),
+        ),
+        migrations.AddField(
+            model_name='teamactivity',
+            name='team_ref',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='users.team'),
+        ),
+        migrations.RunPython(teams_from_names, names_from_teams),
+        # No-ops in the database; let the reverse re-add the columns as ''.
+        migrations.AlterField(
+            model_name='post',
+            name='team',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='teamactivity',
+            name='team',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RemoveField(
+            model_name='post',
+            name='team',
+        ),
+        migrations.RemoveField(
+            model_name='teamactivity',
+            name='team',
+        ),
+        migrations.RenameField(
+            model_name='post',
+            old_name='team_ref',
+            new_name='team',
+        ),
+        migrations.RenameField(
+            model_name='teamactivity',
+            old_name='team_ref',
+            new_name='team',
+        ),
+        migrations.AlterField(
+            model_name='teamactivity',
+            name='team',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='users.team'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['team', 'group_permission'], name='post_team_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='teamactivity',
+            constraint=models.UniqueConstraint(fields=('team', 'day'), name='team_activity_per_day'),
+        ),
+    ]
@@ -1,11 +1,233 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import NotSupportedError, connections, models, router, transaction
+from django.db.models import BooleanField, Case, Count, DateField, DateTimeField, Exists, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.utils import timezone
+from django.db.models.expressions import Col
+from django.db.models.functions import Coalesce, TruncDate
+from django.db.models.sql import DeleteQuery
 from users.models import User
 
+from . import cache, search, trending
+
+
+def visibility_predicate(user, prefix=''):
+    # SQL version of VisibleAndEditableBlogs.has_read_permission, optionally
+    # applied through a relation (e.g. prefix='post__' for comments and likes).
+    if not user.is_authenticated:
+        return Q(**{f'{prefix}is_public__gt': 0})
+    if user.is_superuser:
+        return Q()
+    return (
+        Q(**{f'{prefix}author': user.pk})
+        | Q(**{f'{prefix}team': user.team_id, f'{prefix}group_permission__gt': 0})
+        | Q(**{f'{prefix}authenticated_permission__gt': 0})
+        | Q(**{f'{prefix}is_public__gt': 0})
+    )
+
+
+EXCERPT_LENGTH = 200
+# Post fields only written by PostQuerySet.adjust_counters and recompute_trending.
+COUNTER_FIELDS = ('like_count', 'comment_count', 'trending_score')
+
+
+def excerpt_of(content):
+    return content if len(content) < EXCERPT_LENGTH else content[:EXCERPT_LENGTH] + '...'
+
+
+def count_per_post(model):
+    totals = model.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(totals), 0)
+
+
+class PostQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        return self.filter(visibility_predicate(user)).order_by('-created_at', '-id')
+
+    def with_permissions(self, user):
+        # SQL version of VisibleAndEditableBlogs.permission_level and has_edit_permission.
+        if not user.is_authenticated:
+            return self.annotate(permission_level=F('is_public'), can_edit=Value(False))
+        if user.is_superuser:
+            return self.annotate(permission_level=Value(3), can_edit=Value(True))
+        team = Q(team=user.team_id)
+        return self.annotate(
+            permission_level=Case(
+                When(author=user.pk, then=Value(3)),
+                When(team & Q(group_permission__gt=0), then=F('group_permission') + 1),
+                When(authenticated_permission__gt=0, then=F('authenticated_permission') + 1),
+                When(is_public__gt=0, then=F('is_public') + 1),
+                default=F('is_public'),
+                output_field=IntegerField(),
+            ),
+            can_edit=Case(
+                When(Q(author=user.pk) | (team & Q(group_permission=2)) | Q(authenticated_permission=2), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+        )
+
+    def with_liked(self, user):
+        if not user.is_authenticated:
+            return self.annotate(liked=Value(False))
+        return self.annotate(liked=Exists(Like.objects.filter(post=OuterRef('pk'), author=user.pk)))
+
+    def adjust_counters(self, likes=0, comments=0, at=None):
+        # at is when the added or removed likes/comments were created; with
+        # it the trending score is adjusted as well.
+        changes = {}
+        if likes:
+            changes['like_count'] = F('like_count') + likes
+        if comments:
+            changes['comment_count'] = F('comment_count') + comments
+        weight = likes * trending.LIKE_WEIGHT + comments * trending.COMMENT_WEIGHT
+        if weight and at is not None:
+            changes['trending_score'] = trending.adjusted(weight, at)
+        return self.update(**changes) if changes else 0
+
+    def recompute_trending(self, batch_size=1000):
+        # Rebuilds trending_score from the likes and comments themselves, for
+        # repairs after bulk changes that bypass adjust_counters.
+        post_ids = list(self.values_list('pk', flat=True))
+        for start in range(0, len(post_ids), batch_size):
+            batch = post_ids[start:start + batch_size]
+            values = {pk: [] for pk in batch}
+            for model, weight in ((Like, trending.LIKE_WEIGHT), (Comment, trending.COMMENT_WEIGHT)):
+                for post_id, created_at in model.objects.filter(post_id__in=batch).values_list('post_id', 'created_at').iterator():
+                    values[post_id].append(trending.event_value(weight, created_at))
+            posts = [Post(pk=pk, trending_score=trending.combine(events)) for pk, events in values.items()]
+            Post.objects.bulk_update(posts, ['trending_score'])
+        if post_ids:
+            cache.bump_versions(cache.POST)
+
+    def trending(self):
+        # Top posts by trending score, served from post_trending_idx; posts
+        # without likes or comments are left out.
+        return self.filter(trending_score__isnull=False).order_by('-trending_score', '-id')
+
+    def with_actual_counts(self):
+        return self.annotate(actual_like_count=count_per_post(Like), actual_comment_count=count_per_post(Comment))
+
+    def search(self, text):
+        # Matches every word of text in title or content, best match first as
+        # search_rank. Combine with visible_to() for permissions.
+        vendor = connections[self.db].vendor
+        if vendor == 'sqlite':
+            queryset = self.extra(
+                tables=[search.FTS_TABLE],
+                where=[f'{search.FTS_TABLE}.rowid = posts_post.id', f'{search.FTS_TABLE} MATCH %s'],
+                params=[search.fts5_query(text)],
+                select={'search_rank': f'-bm25({search.FTS_TABLE}, 10.0, 1.0)'},
+            )
+        elif vendor == 'postgresql':
+            queryset = self.extra(
+                where=["posts_post.search_vector @@ to_tsquery('simple', %s)"],
+                params=[search.tsquery(text)],
+                select={'search_rank': "ts_rank(posts_post.search_vector, to_tsquery('simple', %s))"},
+                select_params=[search.tsquery(text)],
+            )
+        else:
+            raise NotSupportedError(f'Full-text search is not available on {vendor}')
+        return queryset.order_by('-search_rank', '-created_at', '-id')
+
+
+class PostRelatedQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        return self.filter(visibility_predicate(user, prefix='post__')).order_by('-created_at', '-id')
+
+
+class LikeQuerySet(PostRelatedQuerySet):
+    def liked_post_ids(self, user, post_ids):
+        if not user.is_authenticated:
+            return set()
+        return set(self.filter(author=user.pk, post_id__in=post_ids).values_list('post_id', flat=True))
+
+    def like(self, user, post_id):
+        # One INSERT ... SELECT guarded by the visibility predicate and the
+        # unique (author, post) constraint. Returns False when the post does
+        # not exist, is not visible to the user, or is already liked.
+        using = self._db or router.db_for_write(self.model)
+        connection = connections[using]
+        now = timezone.now()
+        source = (
+            Post.objects.using(using).visible_to(user).filter(pk=post_id).order_by()
+            .values_list('pk', Value(user.pk), Value(now, output_field=DateTimeField()))
+        )
+        select_sql, params = source.query.get_compiler(using=using).as_sql()
+        columns = ', '.join(connection.ops.quote_name(column) for column in ['post_id', 'author_id', 'created_at'])
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.execute(f'INSERT INTO {table} ({columns}) {select_sql} ON CONFLICT DO NOTHING', params)
+                created = cursor.rowcount == 1
+            if created:
+                record_engagement('likes', post_id, now, using=using)
+                cache.bump_versions(cache.LIKE)
+        return created
+
+    def unlike(self, user, post_id):
+        # Conditional DELETE that skips the collector, which would otherwise
+        # SELECT the row first to send post_delete. The like's created_at comes
+        # back from the DELETE to take it out of the trending score.
+        using = self._db or router.db_for_write(self.model)
+        likes = self.using(using).filter(visibility_predicate(user, prefix='post__'), author=user.pk, post_id=post_id)
+        with transaction.atomic(using=using):
+            deleted = likes.delete_returning('created_at')
+            for created_at in deleted:
+                record_engagement('likes', post_id, created_at, sign=-1, using=using)
+            if deleted:
+                cache.bump_versions(cache.LIKE)
+        return len(deleted) > 0
+
+    def delete_returning(self, field_name):
+        # DELETE ... RETURNING on SQLite 3.35+ and PostgreSQL; elsewhere the
+        # values are read first and the rows deleted by primary key.
+        using = self._db or router.db_for_write(self.model)
+        connection = connections[using]
+        field = self.model._meta.get_field(field_name)
+        if not connection.features.can_return_rows_from_bulk_insert:
+            rows = list(self.using(using).values_list('pk', field_name))
+            if rows:
+                sql, params = delete_sql(self.model.objects.filter(pk__in=[pk for pk, _ in rows]), using)
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+            return [value for _, value in rows]
+
+        sql, params = delete_sql(self, using)
+        column = Col(self.model._meta.db_table, field)
+        converters = connection.ops.get_db_converters(column) + field.get_db_converters(connection)
+        with connection.cursor() as cursor:
+            cursor.execute(f'{sql} RETURNING {connection.ops.quote_name(field.column)}', params)
+            values = [row[0] for row in cursor.fetchall()]
+        for converter in converters:
+            values = [converter(value, column, connection) for value in values]
+        return values
+
+
+def delete_sql(queryset, using):
+    # The DELETE for a queryset's filter, for callers that run it themselves
+    # rather than through QuerySet.delete() and its Collector (no pre/post
+    # signals, no cascades: the caller handles both).
+    query = DeleteQuery(queryset.model)
+    if sum(count > 0 for count in queryset.query.alias_refcount.values()) > 1:
+        # A filter across a join becomes a pk subquery, as in Django's own
+        # DELETE compiler.
+        query.add_filter('pk__in', queryset.values('pk'))
+    else:
+        query.get_initial_alias()
+        query.where = queryset.query.where.clone()
+    return query.get_compiler(using).as_sql()
+
+
 class Post(models.Model):
     title = models.CharField(max_length=100)
     content = models.TextField()
-    author = models.ForeignKey(User, on_delete=models.CASCADE)
-    team = models.CharField(max_length=100)
+    # Stored so list pages can defer content; derived from content in save().
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH + 3, blank=True, default='', editable=False)
+    # The composite indexes in Meta lead with every foreign key, so none of
+    # them needs its own single-column index.
+    author = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    team = models.ForeignKey('users.Team', on_delete=models.PROTECT, null=True, blank=True, db_index=False)
     permission_options = (
         (0, 'none'),
         (1, 'read_only'),
@@ -18,14 +240,206 @@ class Post(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    # Time-decayed engagement, kept up to date by adjust_counters; see posts.trending.
+    trending_score = models.FloatField(null=True, blank=True, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='post_recent_idx'),
+            models.Index(fields=['-created_at', '-id'], condition=Q(is_public__gt=0), name='post_public_recent_idx'),
+            models.Index(fields=['team', 'group_permission'], name='post_team_idx'),
+            models.Index(fields=['author', '-created_at', '-id'], name='post_author_recent_idx'),
+            models.Index(fields=['-trending_score', '-id'], condition=Q(trending_score__isnull=False), name='post_trending_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        if 'team_id' in post.__dict__:
+            post._stored_team = post.team_id
+        return post
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            # The counters move through adjust_counters' F() updates; writing
+            # back the values loaded with this instance would undo concurrent ones.
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTER_FIELDS and field.attname not in deferred
+            ]
+        if 'content' not in self.get_deferred_fields():
+            self.excerpt = excerpt_of(self.content)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'content' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        stored_team = getattr(self, '_stored_team', models.DEFERRED)
+        if stored_team is models.DEFERRED or self.__dict__.get('team_id', stored_team) == stored_team:
+            super().save(*args, **kwargs)
+        else:
+            # Moving to another team moves the post's history in TeamActivity.
+            using = kwargs.get('using') or router.db_for_write(Post, instance=self)
+            with transaction.atomic(using=using):
+                record_post_activity(Post.objects.using(using).filter(pk=self.pk), sign=-1, rollups=[TeamActivity])
+                super().save(*args, **kwargs)
+                record_post_activity(Post.objects.using(using).filter(pk=self.pk), rollups=[TeamActivity])
+        self._stored_team = self.__dict__.get('team_id', models.DEFERRED)
     
 class Comment(models.Model):
     content = models.TextField()
-    post = models.ForeignKey(Post, on_delete=models.CASCADE)
-    author = models.ForeignKey(User, on_delete=models.CASCADE)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, db_index=False)
+    author = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = PostRelatedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['post', '-created_at', '-id'], name='comment_post_recent_idx'),
+            models.Index(fields=['author', '-created_at', '-id'], name='comment_author_recent_idx'),
+            models.Index(fields=['-created_at', '-id'], name='comment_recent_idx'),
+        ]
     
 class Like(models.Model):
-    post = models.ForeignKey(Post, on_delete=models.CASCADE)
-    author = models.ForeignKey(User, on_delete=models.CASCADE)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, db_index=False)
+    author = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = LikeQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['author', 'post'], name='unique_like_per_author'),
+        ]
+        indexes = [
+            models.Index(fields=['post', '-created_at', '-id'], include=['author'], name='like_post_recent_idx'),
+            models.Index(fields=['author', '-created_at', '-id'], name='like_author_recent_idx'),
+            models.Index(fields=['-created_at', '-id'], name='like_recent_idx'),
+        ]
+
+
+
+ACTIVITY_KINDS = ('posts', 'comments', 'likes')
+
+
+class ActivityQuerySet(models.QuerySet):
+    def record(self, rows, kind, sign=1, day=None, post=''):
+        # Adds (sign=1) or takes away (sign=-1) the rows of a Post, Comment or
+        # Like queryset, counted as kind, with one INSERT ... SELECT grouped by
+        # key and day that adds onto existing rows ON CONFLICT. post is the
+        # lookup from rows to their post ('' for posts); day replaces the date
+        # of each row's created_at.
+        using = self._db or router.db_for_write(self.model)
+        connection = connections[using]
+        quote = connection.ops.quote_name
+        key = self.model._meta.get_field(self.model.KEY)
+        source = (
+            # Posts without a team (e.g. by a superuser without one) have no
+            # TeamActivity row to count towards.
+            rows.filter(**{f'{post}{key.name}__isnull': False})
+            .order_by()
+            .annotate(
+                activity_key=F(f'{post}{key.attname}'),
+                activity_day=TruncDate('created_at') if day is None else Value(day, output_field=DateField()),
+            )
+            .values('activity_key', 'activity_day')
+            .annotate(**{name: Count('pk') * sign if name == kind else Value(0) for name in ACTIVITY_KINDS})
+        )
+        select_sql, params = source.query.get_compiler(using=using).as_sql()
+        table = quote(self.model._meta.db_table)
+        columns = ', '.join(quote(column) for column in [key.column, 'day', *ACTIVITY_KINDS])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) {select_sql} '
+                f'ON CONFLICT ({quote(key.column)}, {quote("day")}) DO UPDATE SET {quote(kind)} = {table}.{quote(kind)} + excluded.{quote(kind)}',
+                params,
+            )
+
+    def daily(self, first_day, last_day):
+        # One entry per day from first_day to last_day, zeros for days without
+        # a row.
+        found = {row['day']: row for row in self.filter(day__range=(first_day, last_day)).values('day', *ACTIVITY_KINDS)}
+        days = []
+        for offset in range((last_day - first_day).days + 1):
+            day = first_day + timedelta(days=offset)
+            days.append(found.get(day) or {'day': day, **{name: 0 for name in ACTIVITY_KINDS}})
+        return days
+
+    def summary(self, since):
+        # All-time totals and totals from since on, in one aggregate.
+        totals = self.aggregate(
+            **{f'total_{name}': Coalesce(Sum(name), 0) for name in ACTIVITY_KINDS},
+            **{f'recent_{name}': Coalesce(Sum(name, filter=Q(day__gte=since)), 0) for name in ACTIVITY_KINDS},
+        )
+        return {
+            'total': {name: totals[f'total_{name}'] for name in ACTIVITY_KINDS},
+            'recent': {name: totals[f'recent_{name}'] for name in ACTIVITY_KINDS},
+        }
+
+
+class TeamActivity(models.Model):
+    # Per team and day: posts the team published and comments and likes its
+    # posts received, each counted on the day it was created (in TIME_ZONE).
+    # Kept up to date on every write by record_activity; backfill_activity
+    # rebuilds it from the rows.
+    team = models.ForeignKey('users.Team', on_delete=models.CASCADE, db_index=False)
+    day = models.DateField()
+    posts = models.IntegerField(default=0)
+    comments = models.IntegerField(default=0)
+    likes = models.IntegerField(default=0)
+
+    KEY = 'team'
+
+    objects = ActivityQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['team', 'day'], name='team_activity_per_day'),
+        ]
+
+
+class AuthorActivity(models.Model):
+    # Same as TeamActivity, per author of the posts.
+    author = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    day = models.DateField()
+    posts = models.IntegerField(default=0)
+    comments = models.IntegerField(default=0)
+    likes = models.IntegerField(default=0)
+
+    KEY = 'author'
+
+    objects = ActivityQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['author', 'day'], name='author_activity_per_day'),
+        ]
+
+
+def record_activity(rows, kind, sign=1, day=None, post='', rollups=None, using=None):
+    for model in rollups or [TeamActivity, AuthorActivity]:
+        model.objects.db_manager(using).record(rows, kind, sign, day, post)
+
+
+def record_engagement(kind, post_id, created_at, sign=1, using=None):
+    # Everything that follows one like or comment (kind 'likes' or
+    # 'comments') being added (sign=1) or removed (sign=-1): the post's
+    # counter and trending score and the activity rollups of its day. Used by
+    # the signal receivers and by the paths that write without signals.
+    post = Post.objects.db_manager(using).filter(pk=post_id)
+    post.adjust_counters(**{kind: sign}, at=created_at)
+    record_activity(post, kind, sign=sign, day=timezone.localdate(created_at), using=using)
+
+
+def record_post_activity(posts, sign=1, rollups=None, using=None):
+    # The posts of a queryset with every comment and like they received.
+    post_ids = posts.order_by().values('pk')
+    record_activity(posts, 'posts', sign, rollups=rollups, using=using)
+    record_activity(Comment.objects.filter(post__in=post_ids), 'comments', sign, post='post__', rollups=rollups, using=using)
+    record_activity(Like.objects.filter(post__in=post_ids), 'likes', sign, post='post__', rollups=rollups, using=using)
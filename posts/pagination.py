@@ -1,11 +1,103 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from blog_post.timing import timed
+
+def encode_cursor(created_at, pk, reverse=False):
+    raw = f"{'p' if reverse else 'n'}|{created_at.isoformat()}|{pk}"
+    return urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        raw = urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        direction, created_at, pk = raw.split('|')
+        return datetime.fromisoformat(created_at), int(pk), direction == 'p'
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise NotFound('Invalid cursor')
 
 class Pagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 100
+    # Sending ?cursor= (empty for the first page) switches to keyset pagination
+    # over (created_at, id): no COUNT and no OFFSET scan. The queryset must be
+    # ordered by ('-created_at', '-id').
+    cursor_query_param = 'cursor'
+    cursor_mode = False
+
+    @timed('paginate')
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        queryset = self.get_cursor_queryset(queryset, request)
+        return self.get_cursor_page(list(queryset[:self.cursor_page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request):
+        # paginate_queryset for the async views: same pages and links, fetched
+        # with acount and async iteration.
+        if self.cursor_query_param in request.query_params:
+            queryset = self.get_cursor_queryset(queryset, request)
+            return self.get_cursor_page([obj async for obj in queryset[:self.cursor_page_size + 1]])
+
+        paginator = self.django_paginator_class(queryset, self.get_page_size(request))
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        self.request = request
+        return self.page.object_list
+
+    def get_cursor_queryset(self, queryset, request):
+        self.cursor_mode = True
+        self.request = request
+        self.cursor_page_size = self.get_page_size(request)
+
+        cursor = request.query_params[self.cursor_query_param]
+        position = decode_cursor(cursor) if cursor else None
+        self.cursor_reverse = bool(position and position[2])
+        self.cursor_position = position
+        if position:
+            created_at, pk = position[0], position[1]
+            if self.cursor_reverse:
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+            else:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        if self.cursor_reverse:
+            queryset = queryset.order_by('created_at', 'id')
+        return queryset
+
+    def get_cursor_page(self, results):
+        reverse = self.cursor_reverse
+        has_more = len(results) > self.cursor_page_size
+        results = results[:self.cursor_page_size]
+        if reverse:
+            results.reverse()
+
+        self.has_next = bool(results) and (reverse or has_more)
+        self.has_previous = bool(results) and (has_more if reverse else self.cursor_position is not None)
+        self.cursor_results = results
+        return results
+
+    def get_cursor_link(self, obj, reverse):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encode_cursor(obj.created_at, obj.id, reverse))
 
     def get_paginated_response(self, data):
+        if self.cursor_mode:
+            return Response({
+                'next': self.get_cursor_link(self.cursor_results[-1], False) if self.has_next else None,
+                'previous': self.get_cursor_link(self.cursor_results[0], True) if self.has_previous else None,
+                'results': data
+            })
         return Response({
             'start_page': (self.page.number-1) * self.page_size,
             'count': self.page.paginator.count,
@@ -17,8 +109,12 @@ class Pagination(PageNumberPagination):
 class PostPagination(Pagination):
     page_size = 10
 
+class SearchPagination(PostPagination):
+    # Results are ordered by rank, so only page numbers apply.
+    cursor_query_param = None
+
 class CommentPagination(Pagination):
     page_size = 5
 
 class LikePagination(Pagination):
-    page_size = 15
\ No newline at end of file
+    page_size = 15
@@ -11,7 +11,7 @@ class VisibleAndEditableBlogs(permissions.BasePermission):
 
             if request.user.is_superuser or request.user == obj.author:
                 return True
-            elif request.user.team == obj.team and obj.group_permission > 0:
+            elif request.user.team_id == obj.team_id and obj.group_permission > 0:
                 return True
             elif request.user.is_authenticated and obj.authenticated_permission > 0:
                     return True
@@ -25,7 +25,7 @@ class VisibleAndEditableBlogs(permissions.BasePermission):
                 return False
             if request.user.is_superuser or request.user == obj.author:
                 return True
-            elif request.user.team == obj.team and obj.group_permission == 2:
+            elif request.user.team_id == obj.team_id and obj.group_permission == 2:
                 return True
             elif request.user.is_authenticated and obj.authenticated_permission == 2:
                     return True
@@ -38,7 +38,7 @@ class VisibleAndEditableBlogs(permissions.BasePermission):
 
             if request.user.is_superuser or request.user == obj.author:
                 return 3
-            elif request.user.team == obj.team and obj.group_permission > 0:
+            elif request.user.team_id == obj.team_id and obj.group_permission > 0:
                 return obj.group_permission + 1
             elif obj.authenticated_permission > 0:
                 return obj.authenticated_permission + 1
@@ -0,0 +1,66 @@
+import re
+
+# Full-text index over Post.title/content, kept by the database itself so it
+# also follows bulk_create, QuerySet.update/delete and raw SQL. SQLite uses an
+# external-content FTS5 table plus triggers, PostgreSQL a generated tsvector
+# column with a GIN index, both created by migration 0007_post_search. Title
+# matches rank above content matches.
+
+FTS_TABLE = 'posts_post_fts'
+
+SQLITE_TRIGGERS = {
+    'posts_post_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS posts_post_fts_insert AFTER INSERT ON posts_post BEGIN
+            INSERT INTO posts_post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    """,
+    'posts_post_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS posts_post_fts_delete AFTER DELETE ON posts_post BEGIN
+            INSERT INTO posts_post_fts(posts_post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        END
+    """,
+    'posts_post_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS posts_post_fts_update AFTER UPDATE OF title, content ON posts_post BEGIN
+            INSERT INTO posts_post_fts(posts_post_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            INSERT INTO posts_post_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+        END
+    """,
+}
+
+
+def restore_sqlite_triggers(using, **kwargs):
+    # post_migrate: SQLite rebuilds posts_post (and drops its triggers) for
+    # many schema changes. Put them back and re-index rows written meanwhile.
+    from django.db import connections
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        if cursor.fetchone() is None:
+            return
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN ({', '.join(['%s'] * len(SQLITE_TRIGGERS))})",
+            list(SQLITE_TRIGGERS),
+        )
+        if len(cursor.fetchall()) == len(SQLITE_TRIGGERS):
+            return
+        for sql in SQLITE_TRIGGERS.values():
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def terms(text):
+    return re.findall(r'\w+', text or '')
+
+
+# Each word becomes a quoted term, so user input can never be query syntax;
+# terms are ANDed. Whole words only: a short prefix can expand to most of the
+# vocabulary and rank hundreds of thousands of rows.
+
+def fts5_query(text):
+    return ' '.join(f'"{term}"' for term in terms(text))
+
+
+def tsquery(text):
+    return ' & '.join(f"'{term}'" for term in terms(text))
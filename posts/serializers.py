@@ -1,60 +1,92 @@
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 from .models import Post, Comment, Like
-from users.models import User
 from posts.permissions import VisibleAndEditableBlogs
+from blog_post.timing import stage
 
-class PostSerializer(serializers.ModelSerializer):
+def requested_fields(request):
+    # GET ?fields=id,title limits a representation to the listed fields;
+    # unknown names are ignored. None means every field.
+    if request is None or request.method not in SAFE_METHODS or not request.query_params.get('fields'):
+        return None
+    return {name.strip() for name in request.query_params['fields'].split(',')}
+
+class SparseFieldsMixin:
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = requested_fields(self.context.get('request'))
+        if requested is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in requested}
+
+class TimedDataMixin:
+    # Building .data is the serialize stage of Server-Timing.
+    @property
+    def data(self):
+        with stage('serialize'):
+            return super().data
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
+
+class PostSerializer(TimedDataMixin, SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.CharField()
-    likes = serializers.SerializerMethodField()
-    comments = serializers.SerializerMethodField()
-    excerpt = serializers.SerializerMethodField()
+    team = serializers.SlugRelatedField(slug_field='name', read_only=True)
+    likes = serializers.IntegerField(source='like_count', read_only=True)
+    comments = serializers.IntegerField(source='comment_count', read_only=True)
     permission_level = serializers.SerializerMethodField()
+    can_edit = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
+        list_serializer_class = TimedListSerializer
         fields = ['id', 'author', 'title', 'excerpt' , 'content', 'likes', 'comments', 'team', 'created_at', 'updated_at',
-                  'is_public', 'authenticated_permission', 'group_permission', 'author_permission', 'permission_level', 'is_liked']
-        read_only_fields = ['id', 'author', 'created_at', 'updated_at', 'likes', 'comments', 'team', 'excerpt','is_liked' ,'permission_level']
+                  'is_public', 'authenticated_permission', 'group_permission', 'author_permission', 'permission_level', 'can_edit', 'is_liked']
+        read_only_fields = ['id', 'author', 'created_at', 'updated_at', 'likes', 'comments', 'team', 'excerpt','is_liked' ,'permission_level', 'can_edit']
         write_only_fields = ['is_public', 'authenticated_permission', 'group_permission', 'author_permission']
 
-    def get_author(self, obj):
-        return User.objects.get(id=obj.author.id).username
-        
-    def get_likes(self, obj):
-        return Like.objects.filter(post=obj).count()
-
-    def get_comments(self, obj):
-        return Comment.objects.filter(post=obj).count()
-    
-    def get_excerpt(self, obj):
-        return obj.content if len(obj.content) < 200 else obj.content[:200] + '...'
-
+    # permission_level, can_edit and is_liked come precomputed for a whole page
+    # (Post.objects.with_permissions, with_liked or the liked_post_ids context); the
+    # per-object fallbacks are kept for instances loaded some other way.
     def get_permission_level(self, obj):
+        if hasattr(obj, 'permission_level'):
+            return obj.permission_level
         return VisibleAndEditableBlogs().permission_level(self.context['request'], obj)
+
+    def get_can_edit(self, obj):
+        if hasattr(obj, 'can_edit'):
+            return obj.can_edit
+        return VisibleAndEditableBlogs().has_edit_permission(self.context['request'], obj)
     
     def get_is_liked(self, obj):
+        if hasattr(obj, 'liked'):
+            return obj.liked
+        if 'liked_post_ids' in self.context:
+            return obj.id in self.context['liked_post_ids']
         if self.context['request'].user.is_authenticated:
             return Like.objects.filter(post=obj, author=self.context['request'].user).exists()
         return False
 
-class LikeSerializer(serializers.ModelSerializer):
+class PostListSerializer(PostSerializer):
+    # Lists ship the stored excerpt; the full content comes from retrieve.
+    class Meta(PostSerializer.Meta):
+        fields = [field for field in PostSerializer.Meta.fields if field != 'content']
+
+class LikeSerializer(TimedDataMixin, SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.CharField()
 
     class Meta:
         model = Like
+        list_serializer_class = TimedListSerializer
         fields = ['post', 'author' , 'created_at']
         read_only_fields = ['post', 'author', 'created_at']
 
-    def get_author(self, obj):
-        return User.objects.get(id=obj.author.id).username
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedDataMixin, SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.CharField()
     class Meta:
         model = Comment
+        list_serializer_class = TimedListSerializer
         fields = ['post', 'author', 'content', 'created_at']
         read_only_fields = ['post', 'author', 'created_at']
-
-    def get_author(self, obj):
-        return User.objects.get(id=obj.author.id).username
\ No newline at end of file
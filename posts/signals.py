@@ -0,0 +1,78 @@
+from weakref import WeakKeyDictionary
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import cache
+from .models import Post, Comment, Like, record_activity, record_engagement, record_post_activity
+
+
+# Posts a Collector is deleting, keyed by the delete's origin (a post, a user,
+# a queryset) and dropped with it. The Collector sends every pre_delete
+# before its first DELETE, so by the time a cascaded comment or like is
+# deleted its post is listed here if it goes too.
+_posts_being_deleted = WeakKeyDictionary()
+
+
+def _deleted_with_post(instance, origin):
+    # The post's pre_delete already took its comments and likes out of the
+    # rollups and its counters are going away, so skip one UPDATE per
+    # cascaded comment/like.
+    return origin is not None and instance.post_id in _posts_being_deleted.get(origin, ())
+
+
+@receiver(post_save, sender=Like)
+def like_created(sender, instance, created, **kwargs):
+    if created:
+        record_engagement('likes', instance.post_id, instance.created_at)
+
+
+@receiver(post_delete, sender=Like)
+def like_deleted(sender, instance, origin=None, **kwargs):
+    if not _deleted_with_post(instance, origin):
+        record_engagement('likes', instance.post_id, instance.created_at, sign=-1)
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        record_engagement('comments', instance.post_id, instance.created_at)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, origin=None, **kwargs):
+    if not _deleted_with_post(instance, origin):
+        record_engagement('comments', instance.post_id, instance.created_at, sign=-1)
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, **kwargs):
+    if created:
+        record_activity(Post.objects.filter(pk=instance.pk), 'posts')
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, origin=None, **kwargs):
+    # While its comments and likes still exist; their own receivers skip the
+    # rollups when deleted with the post.
+    if origin is not None:
+        _posts_being_deleted.setdefault(origin, set()).add(instance.pk)
+    record_post_activity(Post.objects.filter(pk=instance.pk), sign=-1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, **kwargs):
+    cache.bump_versions(cache.POST)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, **kwargs):
+    cache.bump_versions(cache.COMMENT)
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def like_changed(sender, **kwargs):
+    cache.bump_versions(cache.LIKE)
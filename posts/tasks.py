@@ -0,0 +1,14 @@
+from jobs.queue import task
+
+from .deletion import delete_posts as delete_post_rows
+from .models import Post
+
+
+@task('posts.delete_posts')
+def delete_posts(post_ids):
+    delete_post_rows(Post.objects.filter(pk__in=post_ids))
+
+
+@task('posts.recompute_trending')
+def recompute_trending(post_ids):
+    Post.objects.filter(pk__in=post_ids).recompute_trending()
@@ -0,0 +1,154 @@
+from datetime import timedelta
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment, Like, TeamActivity, AuthorActivity
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup1'))
+    outsider = User.objects.create_user(username='outsider', password='testpassword', team=Team.objects.named('testgroup2'))
+    posts = [
+        Post.objects.create(
+            title=f'post {index}', content='content', is_public=1, team=Team.objects.named('testgroup1'),
+            authenticated_permission=1, group_permission=2, author_permission=2, author=poster
+        )
+        for index in range(3)
+    ]
+    return {
+        'poster': poster,
+        'reader': reader,
+        'outsider': outsider,
+        'posts': posts,
+    }
+
+
+def rollups():
+    # Non-zero rows only: removals leave zeroed rows that a rebuild drops.
+    columns = ('day', 'posts', 'comments', 'likes')
+    return (
+        sorted(TeamActivity.objects.exclude(posts=0, comments=0, likes=0).values_list('team__name', *columns)),
+        sorted(AuthorActivity.objects.exclude(posts=0, comments=0, likes=0).values_list('author', *columns)),
+    )
+
+
+def rebuilt():
+    call_command('backfill_activity', since=timezone.localdate() - timedelta(days=3), batch_days=2, stdout=None)
+    return rollups()
+
+
+def test_writes_keep_rollups_in_step_with_rows(db, create_posts):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['reader'])
+    first, second, third = create_posts['posts']
+
+    client.post(reverse('likes', kwargs={'post_pk': first.pk}))
+    client.post(reverse('likes', kwargs={'post_pk': second.pk}))
+    client.delete(reverse('unlike', kwargs={'post_pk': second.pk}))
+    client.post(reverse('comments', kwargs={'post_pk': first.pk}), {'content': 'comment'})
+    comment = Comment.objects.create(content='comment', author=create_posts['outsider'], post=third)
+    Like.objects.create(author=create_posts['outsider'], post=third)
+    Like.objects.create(author=create_posts['poster'], post=second).delete()
+    comment.delete()
+
+    team, authors = rollups()
+    today = timezone.localdate()
+    assert team == [('testgroup1', today, 3, 1, 2)]
+    assert authors == [(create_posts['poster'].pk, today, 3, 1, 2)]
+    assert rebuilt() == (team, authors)
+
+    client.force_authenticate(user=create_posts['poster'])
+    assert client.delete(reverse('detailed_post', kwargs={'pk': first.pk})).status_code == status.HTTP_204_NO_CONTENT
+    third.delete()
+    assert rollups() == ([('testgroup1', today, 1, 0, 0)], [(create_posts['poster'].pk, today, 1, 0, 0)])
+    assert rebuilt() == rollups()
+
+
+def test_moving_a_post_moves_its_team_activity(db, create_posts):
+    post = create_posts['posts'][0]
+    Like.objects.like(create_posts['reader'], post.pk)
+    post = Post.objects.get(pk=post.pk)
+    post.team = Team.objects.named('testgroup2')
+    post.save()
+
+    today = timezone.localdate()
+    team, _ = rollups()
+    assert team == [('testgroup1', today, 2, 0, 0), ('testgroup2', today, 1, 0, 1)]
+    assert rebuilt()[0] == team
+
+    # To no team and back
+    post.team = None
+    post.save()
+    assert rollups()[0] == [('testgroup1', today, 2, 0, 0)]
+    post.team = Team.objects.named('testgroup2')
+    post.save()
+    assert rollups()[0] == team
+
+
+def test_deleting_a_user_removes_their_activity(db, create_posts):
+    other_post = Post.objects.create(
+        title='other', content='content', is_public=1, team=Team.objects.named('testgroup2'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=create_posts['outsider']
+    )
+    Like.objects.like(create_posts['poster'], other_post.pk)
+    Comment.objects.create(content='comment', author=create_posts['poster'], post=other_post)
+    create_posts['poster'].delete()
+
+    today = timezone.localdate()
+    assert rollups() == ([('testgroup2', today, 1, 0, 0)], [(create_posts['outsider'].pk, today, 1, 0, 0)])
+    assert not AuthorActivity.objects.filter(author=create_posts['poster'].pk).exists()
+
+
+def test_deleting_users_through_a_queryset(db, create_posts):
+    for post in create_posts['posts'][:2]:
+        Like.objects.like(create_posts['reader'], post.pk)
+        Comment.objects.create(content='comment', author=create_posts['reader'], post=post)
+    User.objects.filter(pk=create_posts['poster'].pk).delete()
+
+    assert rollups() == rebuilt()
+    assert not TeamActivity.objects.filter(comments__lt=0).exists()
+    assert not TeamActivity.objects.filter(likes__lt=0).exists()
+
+
+def test_stats_endpoints(db, create_posts):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['reader'])
+    Like.objects.like(create_posts['reader'], create_posts['posts'][0].pk)
+
+    response = client.get(reverse('team_stats', kwargs={'team': 'testgroup1'}), {'days': 7})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['totals'] == {'posts': 3, 'comments': 0, 'likes': 1}
+    assert len(response.data['days']) == 7
+    assert response.data['days'][-1]['day'] == timezone.localdate()
+    assert response.data['days'][0] == {'day': timezone.localdate() - timedelta(days=6), 'posts': 0, 'comments': 0, 'likes': 0}
+
+    response = client.get(reverse('author_stats', kwargs={'user_pk': create_posts['poster'].pk}))
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data['days']) == 30
+    assert response.data['totals'] == {'posts': 3, 'comments': 0, 'likes': 1}
+
+    assert client.get(reverse('team_stats', kwargs={'team': 'testgroup1'}), {'days': 'week'}).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get(reverse('team_stats', kwargs={'team': 'testgroup2'})).status_code == status.HTTP_404_NOT_FOUND
+    client.force_authenticate(user=create_posts['outsider'])
+    assert client.get(reverse('author_stats', kwargs={'user_pk': create_posts['poster'].pk})).status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(reverse('author_stats', kwargs={'user_pk': create_posts['outsider'].pk})).status_code == status.HTTP_200_OK
+    assert APIClient().get(reverse('team_stats', kwargs={'team': 'testgroup1'})).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_profile_summarizes_author_activity(db, create_posts):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['poster'])
+    Like.objects.like(create_posts['reader'], create_posts['posts'][0].pk)
+    AuthorActivity.objects.create(author=create_posts['poster'], day=timezone.localdate() - timedelta(days=60), posts=2, comments=5)
+
+    response = client.get(reverse('user'))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['activity'] == {
+        'total': {'posts': 5, 'comments': 5, 'likes': 1},
+        'last_30_days': {'posts': 3, 'comments': 0, 'likes': 1},
+    }
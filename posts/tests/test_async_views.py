@@ -0,0 +1,96 @@
+import json
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from users.models import Team, User
+from posts.models import Post, Comment, Like
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup1'))
+    outsider = User.objects.create_user(username='outsider', password='testpassword', team=Team.objects.named('testgroup2'))
+    for is_public, group_permission in [(1, 1), (0, 1), (0, 0)] * 4:
+        post = Post.objects.create(
+            title='post', content='content', is_public=is_public, team=Team.objects.named('testgroup1'),
+            authenticated_permission=0, group_permission=group_permission, author_permission=2, author=poster
+        )
+        Comment.objects.create(content='comment', author=reader, post=post)
+        Like.objects.create(author=reader, post=post)
+    return {
+        'poster': poster,
+        'reader': reader,
+        'outsider': outsider,
+    }
+
+
+def bearer_client(user):
+    client = APIClient()
+    if user is not None:
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+def body(response):
+    # Pagination links point back at the endpoint that was called.
+    return json.loads(response.content.replace(b'/api/async/', b'/api/'))
+
+
+@pytest.mark.parametrize('username', [None, 'poster', 'reader', 'outsider'])
+def test_async_reads_match_viewsets(db, create_posts, username):
+    client = bearer_client(create_posts[username] if username else None)
+    post = Post.objects.filter(is_public=1).first()
+    reader = create_posts['reader']
+    pairs = [
+        ('posts', {}, {'page_size': 3, 'page': 2}),
+        ('posts', {}, {'cursor': '', 'page_size': 4}),
+        ('detailed_post', {'pk': post.pk}, {}),
+        ('comments', {'post_pk': post.pk}, {}),
+        ('all_comments', {}, {}),
+        ('specific_user_comments', {'user_pk': reader.pk}, {}),
+        ('likes', {'post_pk': post.pk}, {}),
+        ('all_likes', {}, {'cursor': ''}),
+        ('specific_user_likes', {'user_pk': reader.pk}, {}),
+    ]
+    for name, kwargs, params in pairs:
+        expected = client.get(reverse(name, kwargs=kwargs), params)
+        response = client.get(reverse(f'async_{name}', kwargs=kwargs), params)
+        assert response.status_code == expected.status_code == status.HTTP_200_OK
+        assert body(response) == body(expected), name
+
+
+def test_async_errors_match_viewsets(db, create_posts):
+    client = bearer_client(create_posts['outsider'])
+    private_post = Post.objects.filter(is_public=0, group_permission=0).first()
+    for name, kwargs in [
+        ('detailed_post', {'pk': private_post.pk}),
+        ('detailed_post', {'pk': 0}),
+        ('comments', {'post_pk': private_post.pk}),
+        ('likes', {'post_pk': 0}),
+        ('specific_user_likes', {'user_pk': 0}),
+    ]:
+        expected = client.get(reverse(name, kwargs=kwargs))
+        response = client.get(reverse(f'async_{name}', kwargs=kwargs))
+        assert response.status_code == expected.status_code
+        assert body(response) == body(expected)
+
+    response = client.get(reverse('async_posts'), {'page': 99})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_async_authentication(db, create_posts):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION='Bearer garbage')
+    response = client.get(reverse('async_posts'))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.status_code == client.get(reverse('posts')).status_code
+
+    client = APIClient()
+    client.login(username='reader', password='testpassword')
+    response = client.get(reverse('async_posts'), {'page_size': 100})
+    assert len(body(response)['results']) == 8
+
+    response = client.post(reverse('async_posts'))
+    assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
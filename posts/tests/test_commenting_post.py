@@ -1,30 +1,30 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from users.models import User
+from users.models import Team, User
 from posts.models import Post 
 from rest_framework.test import APIClient
 
 @pytest.fixture
 def setup_posts():
     user = User.objects.create_user(
-        username='poster', password='testpassword', team='testgroup1'
+        username='poster', password='testpassword', team=Team.objects.named('testgroup1')
     )
     # Crear posts
     public_post = Post.objects.create(
-        title='publicpost', content='publiccontent', is_public=1, team='testgroup1',
+        title='publicpost', content='publiccontent', is_public=1, team=Team.objects.named('testgroup1'),
         authenticated_permission=2, group_permission=2, author_permission=2, author=user
     )
     authenticated_post = Post.objects.create(
-        title='authenticatedpost', content='authenticatedcontent', is_public=0, team='testgroup1',
+        title='authenticatedpost', content='authenticatedcontent', is_public=0, team=Team.objects.named('testgroup1'),
         authenticated_permission=2, group_permission=2, author_permission=2, author=user
     )
     group_post = Post.objects.create(
-        title='grouppost', content='groupcontent', is_public=0, team='testgroup1',
+        title='grouppost', content='groupcontent', is_public=0, team=Team.objects.named('testgroup1'),
         authenticated_permission=0, group_permission=2, author_permission=2, author=user
     )
     private_post = Post.objects.create(
-        title='privatepost', content='privatecontent', is_public=0, team='testgroup1',
+        title='privatepost', content='privatecontent', is_public=0, team=Team.objects.named('testgroup1'),
         authenticated_permission=0, group_permission=0, author_permission=2, author=user
     )
     
@@ -95,7 +95,7 @@ def test_update_and_delete_everything_as_author_or_superuser(db, setup_posts):
 def test_update_and_delete_public_authenticated_and_group_posts(db, setup_posts):
     client = APIClient()
     user = User.objects.create_user(
-        username='reader', password='testpassword', team='testgroup1'
+        username='reader', password='testpassword', team=Team.objects.named('testgroup1')
     )
     client.force_authenticate(user=user)
     
@@ -153,7 +153,7 @@ def test_update_and_delete_public_authenticated_and_group_posts(db, setup_posts)
 def test_update_and_delete_public_and_authenticated_posts(db, setup_posts):
     client = APIClient()
     user = User.objects.create_user(
-        username='reader', password='testpassword', team='testgroup2'
+        username='reader', password='testpassword', team=Team.objects.named('testgroup2')
     )
     client.force_authenticate(user=user)
     
@@ -0,0 +1,116 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment
+
+@pytest.fixture
+def create_post():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup2'))
+    public_post = Post.objects.create(
+        title='publicpost', content='publiccontent', is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+    )
+    comment = Comment.objects.create(content='comment', author=reader, post=public_post)
+    return {
+        'poster': poster,
+        'reader': reader,
+        'public_post': public_post,
+        'comment': comment,
+    }
+
+
+def test_if_none_match_returns_not_modified(client, db, create_post):
+    public_post = create_post['public_post']
+    url = reverse('detailed_post', kwargs={'pk': public_post.id})
+
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response['ETag']
+    assert 'public' in response['Cache-Control']
+    assert 'Authorization' in response['Vary']
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response['ETag'] == etag
+
+    Post.objects.filter(pk=public_post.pk).update(comment_count=5)
+    public_post.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+
+
+def test_if_modified_since(client, db, create_post):
+    response = client.get(reverse('posts'))
+    last_modified = response['Last-Modified']
+
+    response = client.get(reverse('posts'), HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_comment_edit_changes_etag(db, create_post):
+    client = APIClient()
+    client.force_authenticate(user=create_post['reader'])
+    url = reverse('comments', kwargs={'post_pk': create_post['public_post'].id})
+
+    response = client.get(url)
+    etag = response['ETag']
+    assert 'private' in response['Cache-Control']
+
+    client.put(reverse('comment', kwargs={'pk': create_post['comment'].id}), {'content': 'edited'}, format='json')
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['results'][0]['content'] == 'edited'
+
+
+def test_invisible_post_is_not_revalidated(client, db, create_post):
+    private_post = Post.objects.create(
+        title='privatepost', content='privatecontent', is_public=0, team=Team.objects.named('testgroup1'),
+        authenticated_permission=0, group_permission=0, author_permission=2, author=create_post['poster']
+    )
+    for pk in (private_post.id, 999):
+        url = reverse('detailed_post', kwargs={'pk': pk})
+        for headers in ({'HTTP_IF_NONE_MATCH': '*'}, {'HTTP_IF_MODIFIED_SINCE': 'Fri, 01 Jan 2100 00:00:00 GMT'}):
+            response = client.get(url, **headers)
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+            assert 'ETag' not in response
+
+
+def test_revalidation_runs_no_queries(client, db, create_post, django_assert_num_queries):
+    response = client.get(reverse('posts'))
+    etag = response['ETag']
+
+    with django_assert_num_queries(0):
+        response = client.get(reverse('posts'), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # The ETag covers the page served, not just the endpoint
+    response = client.get(reverse('posts'), {'page_size': 1}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+
+
+def test_repairs_change_the_etag(client, db, create_post):
+    etag = client.get(reverse('posts'))['ETag']
+    Post.objects.all().recompute_trending()
+    response = client.get(reverse('posts'), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+
+    etag = response['ETag']
+    Post.objects.update(like_count=5)
+    call_command('reconcile_counters')
+    response = client.get(reverse('posts'), HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['results'][0]['likes'] == 0
+
+
+def test_etags_can_be_disabled(client, db, create_post, settings):
+    settings.CONDITIONAL_GET_ENABLED = False
+    response = client.get(reverse('posts'), HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+    assert response.status_code == status.HTTP_200_OK
+    assert 'ETag' not in response
+    assert 'public' in response['Cache-Control']
@@ -0,0 +1,80 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment, Like
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    posts = [
+        Post.objects.create(
+            title=f'post{i}', content='content', is_public=1, team=Team.objects.named('testgroup1'),
+            authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+        )
+        for i in range(7)
+    ]
+    for post in posts[:3]:
+        Comment.objects.create(content='comment', author=poster, post=post)
+        Like.objects.create(author=poster, post=post)
+    return {
+        'poster': poster,
+        'posts': posts,
+    }
+
+
+def walk(client, url, params):
+    seen = []
+    response = client.get(url, params)
+    while True:
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        seen.extend(response.data['results'])
+        if not response.data['next']:
+            return seen, response
+        response = client.get(response.data['next'])
+
+
+def test_cursor_walk_matches_page_numbers(db, create_posts):
+    client = APIClient()
+    expected = client.get(reverse('posts'), {'page_size': 100}).data['results']
+
+    seen, _ = walk(client, reverse('posts'), {'cursor': '', 'page_size': 3})
+    assert [post['id'] for post in seen] == [post['id'] for post in expected]
+
+    for name in ['all_comments', 'all_likes']:
+        seen, _ = walk(client, reverse(name), {'cursor': '', 'page_size': 2})
+        assert len(seen) == 3
+
+
+def test_cursor_is_stable_under_inserts(db, create_posts):
+    client = APIClient()
+    response = client.get(reverse('posts'), {'cursor': '', 'page_size': 3})
+    first_page = [post['id'] for post in response.data['results']]
+
+    Post.objects.create(
+        title='newpost', content='content', is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=create_posts['poster']
+    )
+    seen, last = walk(client, response.data['next'], {})
+    ids = first_page + [post['id'] for post in seen]
+    assert len(ids) == len(set(ids)) == 7
+
+    response = client.get(last.data['previous'])
+    assert [post['id'] for post in response.data['results']] == ids[3:6]
+
+
+def test_cursor_mode_skips_count(db, create_posts):
+    client = APIClient()
+    with CaptureQueriesContext(connection) as queries:
+        client.get(reverse('posts'), {'cursor': ''})
+    assert not any('COUNT(' in query['sql'] for query in queries.captured_queries)
+
+
+def test_invalid_cursor(db, create_posts):
+    client = APIClient()
+    response = client.get(reverse('posts'), {'cursor': 'garbage'})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
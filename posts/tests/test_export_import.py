@@ -0,0 +1,54 @@
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from users.models import Team, User
+from posts.models import Post, Comment, Like
+
+@pytest.fixture
+def create_blog():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup2'))
+    for i in range(5):
+        post = Post.objects.create(
+            title=f'post{i}', content='content', is_public=i % 2, team=Team.objects.named('testgroup1'),
+            authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+        )
+        Comment.objects.create(content=f'comment{i}', author=reader, post=post)
+        Like.objects.create(author=reader, post=post)
+
+
+def snapshot():
+    return {
+        model: list(model.objects.order_by('pk').values())
+        for model in [Team, User, Post, Comment, Like]
+    }
+
+
+def test_export_and_import_round_trip(db, create_blog, tmp_path):
+    before = snapshot()
+    call_command('export_blog', str(tmp_path), '--chunk-rows', '2')
+    assert len(list(tmp_path.glob('posts.post-*.ndjson.gz'))) == 3
+
+    User.objects.all().delete()
+    Team.objects.all().delete()
+    assert Post.objects.count() == 0
+
+    call_command('import_blog', str(tmp_path), '--batch-size', '2')
+    assert snapshot() == before
+
+    post = Post.objects.create(
+        title='newpost', content='content', is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=User.objects.first()
+    )
+    assert post.pk > max(row['id'] for row in before[Post])
+
+
+def test_export_reads_from_one_transaction(db, create_blog, tmp_path):
+    with CaptureQueriesContext(connection) as queries:
+        call_command('export_blog', str(tmp_path), stdout=StringIO())
+    statements = [query['sql'] for query in queries.captured_queries]
+    assert statements[0].startswith('SAVEPOINT')
+    assert statements[-1].startswith('RELEASE SAVEPOINT')
+    assert sum(sql.startswith('SELECT') for sql in statements) == len(statements) - 2
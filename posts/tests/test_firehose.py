@@ -0,0 +1,65 @@
+import json
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment, Like
+from posts.viewsets import FirehoseViewset
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup2'))
+    for i in range(5):
+        post = Post.objects.create(
+            title=f'publicpost{i}', content='publiccontent', is_public=1, team=Team.objects.named('testgroup1'),
+            authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+        )
+        Comment.objects.create(content='comment', author=reader, post=post)
+        Like.objects.create(author=reader, post=post)
+    private_post = Post.objects.create(
+        title='privatepost', content='privatecontent', is_public=0, team=Team.objects.named('testgroup1'),
+        authenticated_permission=0, group_permission=0, author_permission=2, author=poster
+    )
+    Like.objects.create(author=poster, post=private_post)
+    return {
+        'poster': poster,
+        'reader': reader,
+    }
+
+
+def read_lines(response):
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == 'application/x-ndjson'
+    body = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def test_stream_visible_rows_in_chunks(db, create_posts, monkeypatch):
+    monkeypatch.setattr(FirehoseViewset, 'chunk_size', 2)
+    client = APIClient()
+    client.force_authenticate(user=create_posts['reader'])
+
+    posts = read_lines(client.get(reverse('stream_posts')))
+    assert [post['title'] for post in posts] == [f'publicpost{i}' for i in range(5)]
+    assert all(post['is_liked'] for post in posts)
+
+    assert len(read_lines(client.get(reverse('stream_comments')))) == 5
+    assert len(read_lines(client.get(reverse('stream_likes')))) == 5
+
+    client.force_authenticate(user=create_posts['poster'])
+    assert len(read_lines(client.get(reverse('stream_likes')))) == 6
+
+
+def test_stream_resumes_from_position(client, db, create_posts):
+    posts = read_lines(client.get(reverse('stream_posts')))
+    resumed = read_lines(client.get(reverse('stream_posts'), {'after': posts[2]['position']}))
+    assert [post['id'] for post in resumed] == [post['id'] for post in posts[3:]]
+
+    since = read_lines(client.get(reverse('stream_posts'), {'since': posts[3]['created_at']}))
+    assert [post['id'] for post in since] == [post['id'] for post in posts[3:]]
+
+    for params in ({'since': 'yesterday'}, {'since': '2024-13-01T00:00:00'}, {'after': 'not-a-position'}):
+        response = client.get(reverse('stream_posts'), params)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
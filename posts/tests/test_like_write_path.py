@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Like
+from blog_post import routers
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup2'))
+    public_post = Post.objects.create(
+        title='publicpost', content='publiccontent', is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+    )
+    group_post = Post.objects.create(
+        title='grouppost', content='groupcontent', is_public=0, team=Team.objects.named('testgroup1'),
+        authenticated_permission=0, group_permission=1, author_permission=2, author=poster
+    )
+    return {
+        'reader': reader,
+        'public_post': public_post,
+        'group_post': group_post,
+    }
+
+
+def reads(queries):
+    return [query['sql'] for query in queries.captured_queries if query['sql'].lstrip().upper().startswith('SELECT')]
+
+
+def test_like_and_unlike_do_not_read_first(db, create_posts):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['reader'])
+    public_post = create_posts['public_post']
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(reverse('likes', kwargs={'post_pk': public_post.id}))
+    assert response.status_code == status.HTTP_201_CREATED
+    assert reads(queries) == []
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.delete(reverse('unlike', kwargs={'post_pk': public_post.id}))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert reads(queries) == []
+
+    public_post.refresh_from_db()
+    assert public_post.like_count == 0
+    assert Like.objects.count() == 0
+
+
+def test_like_failures_keep_status_codes(db, create_posts):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['reader'])
+    public_post = create_posts['public_post']
+    group_post = create_posts['group_post']
+
+    assert Like.objects.like(create_posts['reader'], public_post.id)
+    assert not Like.objects.like(create_posts['reader'], public_post.id)
+
+    response = client.post(reverse('likes', kwargs={'post_pk': public_post.id}))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    response = client.post(reverse('likes', kwargs={'post_pk': group_post.id}))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    response = client.post(reverse('likes', kwargs={'post_pk': 0}))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.delete(reverse('unlike', kwargs={'post_pk': group_post.id}))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    response = client.delete(reverse('unlike', kwargs={'post_pk': 0}))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    client.delete(reverse('unlike', kwargs={'post_pk': public_post.id}))
+    response = client.delete(reverse('unlike', kwargs={'post_pk': public_post.id}))
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    public_post.refresh_from_db()
+    assert public_post.like_count == 0
+    assert Like.objects.count() == 0
+
+
+def test_like_and_unlike_write_to_the_primary(db, create_posts, settings):
+    # 'replica1' is not a configured database, so any statement routed to it fails.
+    settings.DATABASE_REPLICAS = ['replica1']
+    reader = create_posts['reader']
+    public_post = create_posts['public_post']
+    with routers.read_from(None):
+        routers.use_replica()
+        assert Like.objects.db == 'replica1'
+        assert Like.objects.like(reader, public_post.id)
+        assert Like.objects.unlike(reader, public_post.id)
+
+
+def test_unlike_without_delete_returning(db, create_posts, monkeypatch):
+    monkeypatch.setattr(type(connection.features), 'can_return_rows_from_bulk_insert', False)
+    reader = create_posts['reader']
+    public_post = create_posts['public_post']
+    assert Like.objects.like(reader, public_post.id)
+    assert Like.objects.unlike(reader, public_post.id)
+    assert not Like.objects.unlike(reader, public_post.id)
+
+    public_post.refresh_from_db()
+    assert public_post.like_count == 0
+    assert Like.objects.count() == 0
@@ -1,29 +1,29 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from users.models import User
+from users.models import Team, User
 from posts.models import Post, Comment
 from rest_framework.test import APIClient
 
 @pytest.fixture
 def create_users_and_comments():
-    poster = User.objects.create_user(username='poster', password='testpassword', team='testgroup1')
-    commenter1 = User.objects.create_user(username='commenter1', password='testpassword', team='testgroup1')
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    commenter1 = User.objects.create_user(username='commenter1', password='testpassword', team=Team.objects.named('testgroup1'))
     
     public_post = Post.objects.create(
-        title='publicpost', content='publiccontent', is_public=1, team='testgroup1',
+        title='publicpost', content='publiccontent', is_public=1, team=Team.objects.named('testgroup1'),
         authenticated_permission=2, group_permission=2, author_permission=2, author=poster
     )
     authenticated_post = Post.objects.create(
-        title='authenticatedpost', content='authenticatedcontent', is_public=0, team='testgroup1',
+        title='authenticatedpost', content='authenticatedcontent', is_public=0, team=Team.objects.named('testgroup1'),
         authenticated_permission=2, group_permission=2, author_permission=2, author=poster
     )
     group_post = Post.objects.create(
-        title='grouppost', content='groupcontent', is_public=0, team='testgroup1',
+        title='grouppost', content='groupcontent', is_public=0, team=Team.objects.named('testgroup1'),
         authenticated_permission=0, group_permission=2, author_permission=2, author=poster
     )
     private_post = Post.objects.create(
-        title='privatepost', content='privatecontent', is_public=0, team='testgroup1',
+        title='privatepost', content='privatecontent', is_public=0, team=Team.objects.named('testgroup1'),
         authenticated_permission=0, group_permission=0, author_permission=2, author=poster
     )
     
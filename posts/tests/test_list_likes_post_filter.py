@@ -1,18 +1,18 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from users.models import User
+from users.models import Team, User
 from posts.models import Post, Like
 from rest_framework.test import APIClient
 
 @pytest.fixture
 def create_users_and_likes():
-    poster = User.objects.create_user(username='poster', password='testpassword', team='testgroup1')
-    liker1 = User.objects.create_user(username='liker1', password='testpassword', team='testgroup1')
-    liker2 = User.objects.create_user(username='liker2', password='testpassword', team='testgroup1')
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    liker1 = User.objects.create_user(username='liker1', password='testpassword', team=Team.objects.named('testgroup1'))
+    liker2 = User.objects.create_user(username='liker2', password='testpassword', team=Team.objects.named('testgroup1'))
     
     public_post = Post.objects.create(
-        title='publicpost', content='publiccontent', is_public=1, team='testgroup1',
+        title='publicpost', content='publiccontent', is_public=1, team=Team.objects.named('testgroup1'),
         authenticated_permission=2, group_permission=2, author_permission=2, author=poster
     )
     
@@ -1,27 +1,27 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from users.models import User
+from users.models import Team, User
 from posts.models import Post
 from rest_framework.test import APIClient
 
 @pytest.fixture
 def setup_posts():
-    poster = User.objects.create_user(username='poster', password='testpassword', team='testgroup1')
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
     Post.objects.create(
-        title='publicpost', content='publiccontent', is_public=1, team='testgroup1',
+        title='publicpost', content='publiccontent', is_public=1, team=Team.objects.named('testgroup1'),
         authenticated_permission=1, group_permission=1, author_permission=2, author=poster
     )
     Post.objects.create(
-        title='authenticatedpost', content='authenticatedcontent', is_public=0, team='testgroup1',
+        title='authenticatedpost', content='authenticatedcontent', is_public=0, team=Team.objects.named('testgroup1'),
         authenticated_permission=1, group_permission=1, author_permission=2, author=poster
     )
     Post.objects.create(
-        title='grouppost', content='groupcontent', is_public=0, team='testgroup1',
+        title='grouppost', content='groupcontent', is_public=0, team=Team.objects.named('testgroup1'),
         authenticated_permission=0, group_permission=1, author_permission=2, author=poster
     )
     Post.objects.create(
-        title='privatepost', content='privatecontent', is_public=0, team='testgroup1',
+        title='privatepost', content='privatecontent', is_public=0, team=Team.objects.named('testgroup1'),
         authenticated_permission=0, group_permission=0, author_permission=2, author=poster
     )
     return poster
@@ -43,7 +43,7 @@ def test_read_everything_as_author_or_superuser(db, setup_posts):
 
 def test_read_public_authenticated_and_group_posts(db, setup_posts):
     client = APIClient()
-    reader = User.objects.create_user(username='reader', password='testpassword', team='testgroup1')
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup1'))
     client.force_authenticate(user=reader)
     
     response = client.get(reverse('posts'))
@@ -58,7 +58,7 @@ def test_read_public_authenticated_and_group_posts(db, setup_posts):
 
 def test_read_public_and_authenticated_posts(db, setup_posts):
     client = APIClient()
-    reader = User.objects.create_user(username='reader', password='testpassword', team='testgroup2')
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup2'))
     client.force_authenticate(user=reader)
     
     response = client.get(reverse('posts'))
@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    long_post = Post.objects.create(
+        title='longpost', content='x' * 500, is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+    )
+    short_post = Post.objects.create(
+        title='shortpost', content='short', is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+    )
+    Comment.objects.create(content='comment', author=poster, post=short_post)
+    return {
+        'poster': poster,
+        'long_post': long_post,
+        'short_post': short_post,
+    }
+
+
+def test_excerpt_is_stored_on_save(db, create_posts):
+    post = create_posts['long_post']
+    assert post.excerpt == 'x' * 200 + '...'
+
+    post.content = 'edited'
+    post.save(update_fields=['content'])
+    assert Post.objects.get(pk=post.pk).excerpt == 'edited'
+
+    post = Post.objects.defer('content').get(pk=post.pk)
+    post.title = 'renamed'
+    post.save()
+    assert Post.objects.get(pk=post.pk).excerpt == 'edited'
+
+
+def test_list_ships_excerpt_without_content(db, create_posts):
+    client = APIClient()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('posts'))
+    assert response.status_code == status.HTTP_200_OK
+    assert all('content' not in post for post in response.data['results'])
+    assert response.data['results'][1]['excerpt'] == 'x' * 200 + '...'
+    assert not any('"posts_post"."content"' in query['sql'] for query in queries.captured_queries)
+
+    response = client.get(reverse('detailed_post', kwargs={'pk': create_posts['long_post'].pk}))
+    assert response.data['content'] == 'x' * 500
+
+
+def test_sparse_fieldsets(db, create_posts):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['poster'])
+
+    response = client.get(reverse('posts'), {'fields': 'id, title,unknown'})
+    assert [set(post) for post in response.data['results']] == [{'id', 'title'}] * 2
+    assert response.data['count'] == 2
+
+    response = client.get(reverse('detailed_post', kwargs={'pk': create_posts['short_post'].pk}), {'fields': 'content,is_liked'})
+    assert response.data == {'content': 'short', 'is_liked': False}
+
+    response = client.get(reverse('all_comments'), {'fields': 'content'})
+    assert response.data['results'] == [{'content': 'comment'}]
+
+
+def test_sparse_fieldsets_skip_liked_lookup(db, create_posts, django_assert_num_queries):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['poster'])
+
+    # count, page; no liked post ids
+    with django_assert_num_queries(2):
+        client.get(reverse('posts'), {'fields': 'id', 'page_size': 2})
@@ -0,0 +1,94 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment, Like
+
+@pytest.fixture
+def create_post():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup2'))
+    public_post = Post.objects.create(
+        title='publicpost', content='publiccontent', is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+    )
+    return {
+        'poster': poster,
+        'reader': reader,
+        'public_post': public_post,
+    }
+
+
+def test_counters_follow_likes_and_comments(db, create_post):
+    client = APIClient()
+    client.force_authenticate(user=create_post['reader'])
+    public_post = create_post['public_post']
+
+    client.post(reverse('likes', kwargs={'post_pk': public_post.id}))
+    client.post(reverse('comments', kwargs={'post_pk': public_post.id}), {'content': 'first'})
+    client.post(reverse('comments', kwargs={'post_pk': public_post.id}), {'content': 'second'})
+
+    response = client.get(reverse('detailed_post', kwargs={'pk': public_post.id}))
+    assert response.data['likes'] == 1
+    assert response.data['comments'] == 2
+
+    client.delete(reverse('unlike', kwargs={'post_pk': public_post.id}))
+    comment = Comment.objects.first()
+    client.delete(reverse('comment', kwargs={'pk': comment.id}))
+
+    public_post.refresh_from_db()
+    assert public_post.like_count == 0
+    assert public_post.comment_count == 1
+
+
+def test_counters_follow_cascade_deletes(db, create_post):
+    public_post = create_post['public_post']
+    reader = create_post['reader']
+    Like.objects.create(author=create_post['poster'], post=public_post)
+    Like.objects.create(author=reader, post=public_post)
+    Comment.objects.create(content='comment', author=reader, post=public_post)
+
+    reader.delete()
+
+    public_post.refresh_from_db()
+    assert public_post.like_count == 1
+    assert public_post.comment_count == 0
+
+
+def test_reconcile_counters_fixes_drift(db, create_post):
+    public_post = create_post['public_post']
+    Like.objects.create(author=create_post['reader'], post=public_post)
+    Post.objects.filter(pk=public_post.pk).update(like_count=7, comment_count=3)
+
+    with CaptureQueriesContext(connection) as queries:
+        call_command('reconcile_counters', '--batch-size', '1')
+    # The totals are computed inside the UPDATE, never read back first.
+    assert [query['sql'].split()[0] for query in queries.captured_queries] == ['SELECT', 'UPDATE', 'SELECT']
+
+    public_post.refresh_from_db()
+    assert public_post.like_count == 1
+    assert public_post.comment_count == 0
+
+    call_command('reconcile_counters', '--dry-run')
+    public_post.refresh_from_db()
+    assert public_post.like_count == 1
+
+
+def test_stale_save_keeps_counters(db, create_post):
+    client = APIClient()
+    client.force_authenticate(user=create_post['reader'])
+    stale_post = Post.objects.get(pk=create_post['public_post'].pk)
+
+    client.post(reverse('likes', kwargs={'post_pk': stale_post.id}))
+    client.post(reverse('comments', kwargs={'post_pk': stale_post.id}), {'content': 'first'})
+    stale_post.title = 'edited'
+    stale_post.save()
+
+    stale_post.refresh_from_db()
+    assert stale_post.title == 'edited'
+    assert stale_post.like_count == 1
+    assert stale_post.comment_count == 1
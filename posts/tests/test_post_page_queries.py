@@ -0,0 +1,64 @@
+import pytest
+from itertools import product
+from types import SimpleNamespace
+from django.contrib.auth.models import AnonymousUser
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Like
+from posts.permissions import VisibleAndEditableBlogs
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup1'))
+    for is_public, authenticated_permission, group_permission in product([0, 1], [0, 1, 2], [0, 1, 2]):
+        post = Post.objects.create(
+            title='post', content='content', is_public=is_public, team=Team.objects.named('testgroup1'),
+            authenticated_permission=authenticated_permission, group_permission=group_permission,
+            author_permission=2, author=poster
+        )
+        if group_permission == 1:
+            Like.objects.create(author=reader, post=post)
+    return {
+        'poster': poster,
+        'reader': reader,
+    }
+
+
+def test_annotations_match_permission_class(db, create_posts):
+    outsider = User.objects.create_user(username='outsider', password='testpassword', team=Team.objects.named('testgroup2'))
+    superuser = User.objects.create_superuser(username='admin', password='testpassword', team=Team.objects.named('testgroup3'))
+    for user in [AnonymousUser(), create_posts['poster'], create_posts['reader'], outsider, superuser]:
+        request = SimpleNamespace(user=user)
+        for post in Post.objects.with_permissions(user):
+            assert post.permission_level == VisibleAndEditableBlogs().permission_level(request, post)
+            assert post.can_edit == VisibleAndEditableBlogs().has_edit_permission(request, post)
+
+
+def test_is_liked_for_page(db, create_posts):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['reader'])
+
+    response = client.get(reverse('posts'), {'page_size': 100})
+    assert response.status_code == status.HTTP_200_OK
+    liked = [post['is_liked'] for post in response.data['results']]
+    assert liked.count(True) == Like.objects.count()
+
+
+@pytest.mark.parametrize('page_size', [2, 15])
+def test_post_page_query_count_is_constant(db, create_posts, page_size, django_assert_num_queries):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['reader'])
+
+    # count, page, liked post ids
+    with django_assert_num_queries(3):
+        response = client.get(reverse('posts'), {'page_size': page_size})
+    assert len(response.data['results']) == page_size
+
+    post_id = response.data['results'][0]['id']
+    # post with annotations, liked post ids
+    with django_assert_num_queries(2):
+        response = client.get(reverse('detailed_post', kwargs={'pk': post_id}))
+    assert response.status_code == status.HTTP_200_OK
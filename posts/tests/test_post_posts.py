@@ -1,14 +1,14 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from users.models import User
+from users.models import Team, User
 from posts.models import Post  
 from rest_framework.test import APIClient
 
 @pytest.fixture
 def authenticated_client():
     client = APIClient()
-    user = User.objects.create_user(username='testuser', password='testpassword', team='testgroup1')
+    user = User.objects.create_user(username='testuser', password='testpassword', team=Team.objects.named('testgroup1'))
     client.force_authenticate(user=user)
     return client
 
@@ -31,7 +31,7 @@ def test_success_create_post(db, authenticated_client):
     assert post.is_public == 1
     assert post.authenticated_permission == 1
     assert post.group_permission == 1
-    assert post.team == 'testgroup1'
+    assert post.team.name == 'testgroup1'
     assert post.author.username == 'testuser'
 
 def test_failed_create_post_unauthenticated(client, db):
@@ -0,0 +1,65 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment, Like
+from blog_post.queries import assert_max_queries
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    readers = [User.objects.create_user(username=f'reader{index}', password='testpassword', team=Team.objects.named('testgroup1')) for index in range(4)]
+    for index in range(12):
+        post = Post.objects.create(
+            title=f'post {index}', content='content', is_public=index % 2, team=Team.objects.named('testgroup1'),
+            authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+        )
+        for reader in readers:
+            Comment.objects.create(content='comment', author=reader, post=post)
+            Like.objects.create(author=reader, post=post)
+    return {
+        'poster': poster,
+        'reader': readers[0],
+        'post': post,
+    }
+
+
+# Ceilings per endpoint for an authenticated reader with the response cache
+# empty; none of them may depend on the number of rows on the page.
+@pytest.mark.parametrize('name, kwargs, limit', [
+    ('posts', {}, 6),
+    ('detailed_post', {'pk': 'post'}, 5),
+    ('search_posts', {}, 3),
+    ('comments', {'post_pk': 'post'}, 5),
+    ('all_comments', {}, 3),
+    ('specific_user_comments', {'user_pk': 'reader'}, 5),
+    ('likes', {'post_pk': 'post'}, 5),
+    ('all_likes', {}, 3),
+    ('specific_user_likes', {'user_pk': 'reader'}, 5),
+    ('user', {}, 2),
+])
+def test_read_endpoint_query_ceilings(db, create_posts, query_budget, name, kwargs, limit):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['reader'])
+    kwargs = {key: create_posts[value].pk for key, value in kwargs.items()}
+    params = {'q': 'post'} if name == 'search_posts' else {}
+
+    with query_budget(limit):
+        response = client.get(reverse(name, kwargs=kwargs), params)
+    assert response.status_code == status.HTTP_200_OK
+
+
+# Each request: savepoint, conditional write, counter update, one upsert per
+# activity rollup, release.
+@assert_max_queries(12)
+def like_and_unlike(client, post):
+    client.post(reverse('likes', kwargs={'post_pk': post.pk}))
+    client.delete(reverse('unlike', kwargs={'post_pk': post.pk}))
+
+
+def test_like_write_path_ceiling(db, create_posts):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['poster'])
+    like_and_unlike(client, create_posts['post'])
+    assert not Like.objects.filter(author=create_posts['poster']).exists()
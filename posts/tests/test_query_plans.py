@@ -0,0 +1,43 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from users.models import Team, User
+from posts.models import Post, Comment, Like, TeamActivity, AuthorActivity
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason='asserts on SQLite EXPLAIN QUERY PLAN output')
+
+@pytest.fixture
+def reader():
+    return User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup1'))
+
+
+def endpoint_queries(reader):
+    anonymous = AnonymousUser()
+    return {
+        # url name: (query, index the plan has to use)
+        'posts (anonymous)': (Post.objects.visible_to(anonymous)[:10], 'post_public_recent_idx'),
+        'posts': (Post.objects.visible_to(reader)[:10], 'post_recent_idx'),
+        'trending_posts': (Post.objects.visible_to(reader).trending()[:10], 'post_trending_idx'),
+        'comments': (Comment.objects.filter(post=1).order_by('-created_at', '-id')[:5], 'comment_post_recent_idx'),
+        'all_comments': (Comment.objects.visible_to(reader)[:5], 'comment_recent_idx'),
+        'specific_user_comments': (Comment.objects.visible_to(reader).filter(author=1)[:5], 'comment_author_recent_idx'),
+        'likes': (Like.objects.filter(post=1).order_by('-created_at', '-id')[:15], 'like_post_recent_idx'),
+        'all_likes': (Like.objects.visible_to(reader)[:15], 'like_recent_idx'),
+        'specific_user_likes': (Like.objects.visible_to(reader).filter(author=1)[:15], 'like_author_recent_idx'),
+        # SQLite names the index backing a table-level UNIQUE constraint itself.
+        'unlike': (Like.objects.filter(author=reader, post=1), 'sqlite_autoindex_posts_like'),
+        'team_stats': (TeamActivity.objects.filter(team=reader.team_id, day__range=('2026-01-01', '2026-01-30')), 'sqlite_autoindex_posts_teamactivity'),
+        'author_stats': (AuthorActivity.objects.filter(author=reader, day__range=('2026-01-01', '2026-01-30')), 'sqlite_autoindex_posts_authoractivity'),
+    }
+
+
+def test_endpoint_queries_use_indexes(db, reader):
+    for name, (queryset, index) in endpoint_queries(reader).items():
+        plan = queryset.explain()
+        assert f'INDEX {index}' in plan, f'{name}: {plan}'
+        assert 'TEMP B-TREE' not in plan, f'{name} sorts in memory: {plan}'
+
+
+def test_post_author_index(db, reader):
+    plan = Post.objects.filter(author=reader).order_by('-created_at', '-id').explain()
+    assert 'INDEX post_author_recent_idx' in plan
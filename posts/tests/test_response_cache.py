@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment
+
+@pytest.fixture
+def create_post():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup2'))
+    public_post = Post.objects.create(
+        title='publicpost', content='publiccontent', is_public=1, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=poster
+    )
+    return {
+        'poster': poster,
+        'reader': reader,
+        'public_post': public_post,
+    }
+
+
+def test_anonymous_reads_are_served_from_cache(client, db, create_post):
+    first = client.get(reverse('posts'))
+    with CaptureQueriesContext(connection) as queries:
+        second = client.get(reverse('posts'))
+    assert second.status_code == status.HTTP_200_OK
+    assert second.data == first.data
+    assert len(queries) == 0
+
+
+def test_writes_invalidate_cached_reads(db, create_post):
+    client = APIClient()
+    client.force_authenticate(user=create_post['reader'])
+    public_post = create_post['public_post']
+
+    response = client.get(reverse('detailed_post', kwargs={'pk': public_post.id}))
+    assert response.data['likes'] == 0
+    assert response.data['is_liked'] is False
+
+    client.post(reverse('likes', kwargs={'post_pk': public_post.id}))
+    response = client.get(reverse('detailed_post', kwargs={'pk': public_post.id}))
+    assert response.data['likes'] == 1
+    assert response.data['is_liked'] is True
+
+    response = client.get(reverse('all_comments'))
+    assert response.data['count'] == 0
+    Comment.objects.create(content='comment', author=create_post['poster'], post=public_post)
+    response = client.get(reverse('all_comments'))
+    assert response.data['count'] == 1
+
+    Post.objects.filter(pk=public_post.pk).delete()
+    response = client.get(reverse('all_comments'))
+    assert response.data['count'] == 0
+
+
+def test_cache_is_keyed_by_visibility(client, db, create_post):
+    Post.objects.create(
+        title='authenticatedpost', content='authenticatedcontent', is_public=0, team=Team.objects.named('testgroup1'),
+        authenticated_permission=1, group_permission=1, author_permission=2, author=create_post['poster']
+    )
+    assert client.get(reverse('posts')).data['count'] == 1
+
+    api_client = APIClient()
+    api_client.force_authenticate(user=create_post['reader'])
+    assert api_client.get(reverse('posts')).data['count'] == 2
+    assert client.get(reverse('posts')).data['count'] == 1
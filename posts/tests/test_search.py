@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post
+from posts.search import restore_sqlite_triggers
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    reader = User.objects.create_user(username='reader', password='testpassword', team=Team.objects.named('testgroup1'))
+    outsider = User.objects.create_user(username='outsider', password='testpassword', team=Team.objects.named('testgroup2'))
+
+    def create(title, content, is_public=1, group_permission=1):
+        return Post.objects.create(
+            title=title, content=content, is_public=is_public, team=Team.objects.named('testgroup1'),
+            authenticated_permission=0, group_permission=group_permission, author_permission=2, author=poster
+        )
+
+    return {
+        'poster': poster,
+        'reader': reader,
+        'outsider': outsider,
+        'in_title': create('Django performance', 'notes about caching'),
+        'in_content': create('Weekly notes', 'a long post that mentions django once'),
+        'group': create('Team django plans', 'internal', is_public=0),
+        'private': create('Private django diary', 'secret', is_public=0, group_permission=0),
+        'other': create('Gardening', 'tomatoes'),
+    }
+
+
+def search(client, text, **params):
+    return client.get(reverse('search_posts'), {'q': text, **params})
+
+
+def titles(response):
+    assert response.status_code == status.HTTP_200_OK
+    return [post['title'] for post in response.data['results']]
+
+
+def test_search_ranks_title_matches_first(db, create_posts):
+    assert titles(search(APIClient(), 'django')) == ['Django performance', 'Weekly notes']
+
+
+def test_search_applies_visibility(db, create_posts):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['reader'])
+    assert set(titles(search(client, 'django'))) == {'Django performance', 'Weekly notes', 'Team django plans'}
+
+    client.force_authenticate(user=create_posts['outsider'])
+    assert set(titles(search(client, 'django'))) == {'Django performance', 'Weekly notes'}
+
+    client.force_authenticate(user=create_posts['poster'])
+    response = search(client, 'django')
+    assert len(titles(response)) == response.data['count'] == 4
+
+
+def test_search_words_and_syntax(db, create_posts):
+    client = APIClient()
+    assert titles(search(client, 'perf')) == []
+    assert titles(search(client, 'Performance')) == ['Django performance']
+    assert titles(search(client, 'django caching')) == ['Django performance']
+    assert titles(search(client, 'DJANGO" OR tomatoes*')) == []
+    assert search(client, '"*').status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get(reverse('search_posts')).status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_index_follows_writes(db, create_posts):
+    client = APIClient()
+    post = create_posts['other']
+    post.content = 'tomatoes and django'
+    post.save()
+    assert 'Gardening' in titles(search(client, 'django'))
+
+    Post.objects.filter(pk=post.pk).update(title='Vegetables', content='tomatoes')
+    assert titles(search(client, 'vegetables')) == ['Vegetables']
+    assert 'Vegetables' not in titles(search(client, 'django'))
+
+    Post.objects.filter(pk=create_posts['in_title'].pk).delete()
+    assert titles(search(client, 'django')) == ['Weekly notes']
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason='SQLite triggers')
+def test_triggers_are_restored_after_table_rebuild(db, create_posts):
+    with connection.cursor() as cursor:
+        cursor.execute('DROP TRIGGER posts_post_fts_update')
+    Post.objects.filter(pk=create_posts['other'].pk).update(content='django')
+
+    restore_sqlite_triggers(using='default')
+    assert 'Gardening' in titles(search(APIClient(), 'django'))
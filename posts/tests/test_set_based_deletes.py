@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment, Like, delete_sql
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    other = User.objects.create_user(username='other', password='testpassword', team=Team.objects.named('testgroup1'))
+    readers = [User.objects.create_user(username=f'reader{index}', password='testpassword', team=Team.objects.named('testgroup1')) for index in range(8)]
+
+    def create_post(author, title, engaged):
+        post = Post.objects.create(
+            title=title, content=f'{title} content', is_public=1, team=Team.objects.named('testgroup1'),
+            authenticated_permission=1, group_permission=1, author_permission=2, author=author
+        )
+        for reader in engaged:
+            Comment.objects.create(content='comment', author=reader, post=post)
+            Like.objects.create(author=reader, post=post)
+        return post
+
+    return {
+        'poster': poster,
+        'other': other,
+        'quiet_post': create_post(poster, 'quiet', readers[:2]),
+        'popular_post': create_post(poster, 'popular', readers),
+        'other_post': create_post(other, 'other', [poster, *readers[:3]]),
+    }
+
+
+def delete_queries(client, post):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.delete(reverse('detailed_post', kwargs={'pk': post.pk}))
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    return len(queries)
+
+
+def test_post_delete_is_set_based(db, create_posts):
+    client = APIClient()
+    client.force_authenticate(user=create_posts['poster'])
+
+    assert delete_queries(client, create_posts['quiet_post']) == delete_queries(client, create_posts['popular_post'])
+    assert list(Post.objects.values_list('title', flat=True)) == ['other']
+    assert Comment.objects.count() == Like.objects.count() == 4
+    assert not Post.objects.search('popular').exists()
+
+
+@pytest.mark.parametrize('through_queryset', [False, True])
+def test_user_delete_keeps_counters(db, create_posts, through_queryset):
+    if through_queryset:
+        # As the admin's "delete selected" action does; the Collector would
+        # load and send post_delete for each comment and like.
+        collected = []
+        receiver = lambda sender, instance, **kwargs: collected.append(instance)
+        post_delete.connect(receiver, dispatch_uid='collected')
+        try:
+            User.objects.filter(username='poster').delete()
+        finally:
+            post_delete.disconnect(dispatch_uid='collected')
+        assert [type(instance) for instance in collected] == [User]
+    else:
+        create_posts['poster'].delete()
+
+    assert list(Post.objects.values_list('title', flat=True)) == ['other']
+    assert not Comment.objects.filter(author__username='poster').exists()
+    assert not Like.objects.filter(author__username='poster').exists()
+    post = Post.objects.with_actual_counts().get()
+    assert post.like_count == post.actual_like_count == 3
+    assert post.comment_count == post.actual_comment_count == 3
+    assert User.objects.filter(username='other').exists()
+
+
+def test_delete_sql_keeps_plain_filters_and_subqueries_joins(db):
+    sql, params = delete_sql(Like.objects.filter(author=1, post_id=2), 'default')
+    assert sql == 'DELETE FROM "posts_like" WHERE ("posts_like"."author_id" = %s AND "posts_like"."post_id" = %s)'
+    assert params == (1, 2)
+
+    sql, params = delete_sql(Like.objects.filter(post__is_public__gt=0, author=1), 'default')
+    assert sql.startswith('DELETE FROM "posts_like" WHERE "posts_like"."id" IN (SELECT ')
+    assert 'JOIN "posts_post"' in sql
@@ -0,0 +1,107 @@
+from datetime import timedelta
+from importlib import import_module
+import pytest
+from django.apps import apps as django_apps
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment, Like
+
+@pytest.fixture
+def create_posts():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    readers = [User.objects.create_user(username=f'reader{index}', password='testpassword', team=Team.objects.named('testgroup1')) for index in range(3)]
+    outsider = User.objects.create_user(username='outsider', password='testpassword', team=Team.objects.named('testgroup2'))
+
+    def create_post(title, is_public=1, authenticated_permission=1):
+        return Post.objects.create(
+            title=title, content='content', is_public=is_public, team=Team.objects.named('testgroup1'),
+            authenticated_permission=authenticated_permission, group_permission=1, author_permission=2, author=poster
+        )
+
+    return {
+        'poster': poster,
+        'readers': readers,
+        'outsider': outsider,
+        'old_post': create_post('old'),
+        'new_post': create_post('new'),
+        'team_post': create_post('team', is_public=0, authenticated_permission=0),
+        'quiet_post': create_post('quiet'),
+    }
+
+
+def scores():
+    return dict(Post.objects.values_list('title', 'trending_score'))
+
+
+def trending_titles(client, **params):
+    response = client.get(reverse('trending_posts'), params)
+    assert response.status_code == status.HTTP_200_OK
+    return [post['title'] for post in response.data['results']]
+
+
+def test_recent_engagement_ranks_first(db, create_posts):
+    readers = create_posts['readers']
+    for reader in readers:
+        Like.objects.create(author=reader, post=create_posts['old_post'])
+    Like.objects.filter(post=create_posts['old_post']).update(created_at=timezone.now() - timedelta(days=3))
+    Post.objects.filter(pk=create_posts['old_post'].pk).recompute_trending()
+    Like.objects.create(author=readers[0], post=create_posts['new_post'])
+    Comment.objects.create(content='comment', author=readers[1], post=create_posts['team_post'])
+
+    client = APIClient()
+    assert trending_titles(client) == ['new', 'old']
+    client.force_authenticate(user=readers[2])
+    # A comment counts twice a like: 2 now > 1 now > 3 * 2 ** -3.
+    assert trending_titles(client) == ['team', 'new', 'old']
+    assert trending_titles(client, limit=1) == ['team']
+    client.force_authenticate(user=create_posts['outsider'])
+    assert trending_titles(client) == ['new', 'old']
+
+
+def test_score_is_maintained_incrementally(db, create_posts):
+    post = create_posts['new_post']
+    readers = create_posts['readers']
+    client = APIClient()
+    for reader in readers:
+        client.force_authenticate(user=reader)
+        assert client.post(reverse('likes', kwargs={'post_pk': post.pk})).status_code == status.HTTP_201_CREATED
+        client.post(reverse('comments', kwargs={'post_pk': post.pk}), {'content': 'comment'})
+    client.delete(reverse('unlike', kwargs={'post_pk': post.pk}))
+    Comment.objects.filter(author=readers[0]).delete()
+
+    incremental = scores()
+    Post.objects.all().recompute_trending()
+    assert scores() == pytest.approx(incremental)
+    assert incremental['quiet'] is None
+
+    Like.objects.filter(post=post).delete()
+    Comment.objects.filter(post=post).delete()
+    assert scores()['new'] is None
+
+
+def test_stale_save_keeps_score(db, create_posts):
+    stale_post = Post.objects.get(pk=create_posts['new_post'].pk)
+    Like.objects.create(author=create_posts['readers'][0], post=stale_post)
+    score = scores()['new']
+    assert score is not None
+
+    stale_post.title = 'edited'
+    stale_post.save()
+    assert scores()['edited'] == score
+
+
+def test_migration_copy_of_the_score_matches(db, create_posts):
+    # 0009 fills scores with its own copy of posts.trending.
+    migration = import_module('posts.migrations.0009_post_trending_score')
+    post = create_posts['old_post']
+    Like.objects.like(create_posts['readers'][0], post.pk)
+    Comment.objects.create(content='comment', author=create_posts['readers'][1], post=post)
+    Post.objects.update(trending_score=None)
+
+    migration.fill_trending_scores(django_apps, None)
+    filled = Post.objects.get(pk=post.pk).trending_score
+    Post.objects.filter(pk=post.pk).recompute_trending()
+    assert filled == pytest.approx(Post.objects.get(pk=post.pk).trending_score)
@@ -1,15 +1,15 @@
 import pytest
 from django.urls import reverse
 from rest_framework import status
-from users.models import User
+from users.models import Team, User
 from posts.models import Post, Like
 from rest_framework.test import APIClient
 
 @pytest.fixture
 def create_user_and_like():
-    user = User.objects.create_user(username='poster', password='testpassword', team='testgroup1')
+    user = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
     public_post = Post.objects.create(
-        title='publicpost', content='publiccontent', is_public=1, team='testgroup1',
+        title='publicpost', content='publiccontent', is_public=1, team=Team.objects.named('testgroup1'),
         authenticated_permission=2, group_permission=2, author_permission=2, author=user
     )
     like = Like.objects.create(author=user, post=public_post)
@@ -0,0 +1,89 @@
+import pytest
+from itertools import product
+from types import SimpleNamespace
+from django.contrib.auth.models import AnonymousUser
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from users.models import Team, User
+from posts.models import Post, Comment, Like
+from posts.permissions import VisibleAndEditableBlogs
+
+@pytest.fixture
+def create_permission_matrix():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup1'))
+    teammate = User.objects.create_user(username='teammate', password='testpassword', team=Team.objects.named('testgroup1'))
+    outsider = User.objects.create_user(username='outsider', password='testpassword', team=Team.objects.named('testgroup2'))
+    superuser = User.objects.create_superuser(username='admin', password='testpassword', team=Team.objects.named('testgroup3'))
+
+    for is_public, authenticated_permission, group_permission in product([0, 1], [0, 1, 2], [0, 1, 2]):
+        post = Post.objects.create(
+            title=f'post-{is_public}{authenticated_permission}{group_permission}', content='content',
+            is_public=is_public, team=Team.objects.named('testgroup1'), authenticated_permission=authenticated_permission,
+            group_permission=group_permission, author_permission=2, author=poster
+        )
+        Comment.objects.create(content='comment', author=teammate, post=post)
+        Comment.objects.create(content='comment', author=outsider, post=post)
+        Like.objects.create(author=teammate, post=post)
+        Like.objects.create(author=outsider, post=post)
+
+    return {
+        'readers': [AnonymousUser(), poster, teammate, outsider, superuser],
+        'teammate': teammate,
+        'outsider': outsider,
+    }
+
+
+def python_visible(user, objects, get_post):
+    request = SimpleNamespace(user=user)
+    visible = [obj for obj in objects if VisibleAndEditableBlogs().has_read_permission(request, get_post(obj))]
+    return [obj.id for obj in sorted(visible, key=lambda obj: (obj.created_at, obj.id), reverse=True)]
+
+
+def test_visible_posts_match_permission_class(db, create_permission_matrix):
+    for reader in create_permission_matrix['readers']:
+        expected = python_visible(reader, Post.objects.all(), lambda post: post)
+        assert list(Post.objects.visible_to(reader).values_list('id', flat=True)) == expected
+
+
+def test_visible_comments_and_likes_match_permission_class(db, create_permission_matrix):
+    for reader in create_permission_matrix['readers']:
+        for model in [Comment, Like]:
+            expected = python_visible(reader, model.objects.select_related('post'), lambda obj: obj.post)
+            assert list(model.objects.visible_to(reader).values_list('id', flat=True)) == expected
+
+
+def test_list_all_and_user_filters(db, create_permission_matrix):
+    client = APIClient()
+    outsider = create_permission_matrix['outsider']
+    teammate = create_permission_matrix['teammate']
+    client.force_authenticate(user=outsider)
+
+    visible = Post.objects.visible_to(outsider).count()
+    assert visible == 15
+
+    response = client.get(reverse('all_comments'), {'page_size': 100})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == visible * 2
+
+    response = client.get(reverse('all_likes'), {'page_size': 100})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == visible * 2
+
+    response = client.get(reverse('specific_user_comments', kwargs={'user_pk': teammate.id}))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == visible
+
+    response = client.get(reverse('specific_user_likes', kwargs={'user_pk': teammate.id}))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == visible
+
+    response = client.get(reverse('specific_user_likes', kwargs={'user_pk': 0}))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_list_posts_anonymous(client, db, create_permission_matrix):
+    response = client.get(reverse('posts'), {'page_size': 100})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == 9
+    assert all(post['title'].startswith('post-1') for post in response.data['results'])
@@ -0,0 +1,59 @@
+import math
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+
+# Post.trending_score is the sum over a post's likes and comments of
+#     weight * 2 ** ((created_at - EPOCH) / half_life)
+# stored as its natural log. Every score decays by the same factor as time
+# passes, so ordering by the stored value is ordering by the decayed score
+# and no row needs rewriting as time passes; only a new or removed event
+# changes it, with a log-add or log-subtract done in the UPDATE. NULL means
+# no likes or comments.
+
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+# Removing an event that makes up (almost) all of a score clears it instead
+# of taking the log of a rounding error.
+EPSILON = 1e-9
+
+
+def event_value(weight, at):
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    return math.log(weight) + (at - EPOCH).total_seconds() / half_life * math.log(2)
+
+
+def combine(values):
+    # log(sum(exp(v))) without overflow; None for no events.
+    if not values:
+        return None
+    top = max(values)
+    return top + math.log(sum(math.exp(value - top) for value in values))
+
+
+def added(value):
+    score, value = F('trending_score'), Value(value)
+    return Case(
+        When(trending_score__isnull=True, then=value),
+        default=Greatest(score, value) + Ln(Value(1.0) + Exp(-Abs(score - value))),
+        output_field=FloatField(),
+    )
+
+
+def removed(value):
+    score = F('trending_score')
+    return Case(
+        When(Q(trending_score__gt=value + EPSILON), then=score + Ln(Value(1.0) - Exp(Value(value) - score))),
+        default=Value(None),
+        output_field=FloatField(),
+    )
+
+
+def adjusted(weight, at):
+    # Update expression for trending_score after adding (weight > 0) or
+    # removing (weight < 0) likes/comments created at `at`.
+    value = event_value(abs(weight), at)
+    return added(value) if weight > 0 else removed(value)
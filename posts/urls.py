@@ -1,9 +1,12 @@
 from django.urls import path
 
-from .viewsets import PostViewset , CommentViewset, LikeViewset
+from . import async_views
+from .viewsets import PostViewset , CommentViewset, LikeViewset, FirehoseViewset, ActivityStatsViewset
 
 urlpatterns = [
     path('post/', PostViewset.as_view({'post': 'create', 'get': 'list'}), name='posts'), # post request to create a post and get request to list all posts
+    path('post/search/', PostViewset.as_view({'get': 'search'}), name='search_posts'), # get request to search visible posts by title and content (?q=)
+    path('post/trending/', PostViewset.as_view({'get': 'trending'}), name='trending_posts'), # get request to list the visible posts with the most recent likes and comments
     path('post/<int:pk>/', PostViewset.as_view({'get': 'retrieve', 'put': 'update' , 'delete': 'destroy'}), name='detailed_post'), # get request to retrieve a post, put request to update a post and delete request to delete a post
 
     path('post/<int:post_pk>/comments/', CommentViewset.as_view({'post': 'create', 'get': 'list_posts'}), name='comments'), # post request to create a comment and get request to list all post's comments
@@ -15,4 +18,20 @@ urlpatterns = [
     path('post/<int:post_pk>/unlikes/', LikeViewset.as_view({'delete': 'destroy'}), name='unlike'), # delete request to unlike a post and get request to retrieve a like
     path('likes/', LikeViewset.as_view({'get': 'list_all'}), name='all_likes'), # get request to list all likes
     path('likes/user/<int:user_pk>/', LikeViewset.as_view({'get': 'retrieve_users'}), name='specific_user_likes'), # get request to list all likes of a specific user
+
+    path('stats/teams/<str:team>/', ActivityStatsViewset.as_view({'get': 'team'}), name='team_stats'), # get request to list a team's posts, comments and likes received per day
+    path('stats/authors/<int:user_pk>/', ActivityStatsViewset.as_view({'get': 'author'}), name='author_stats'), # get request to list an author's posts, comments and likes received per day
+
+    path('stream/posts/', FirehoseViewset.as_view({'get': 'posts'}), name='stream_posts'), # get request to stream all visible posts as NDJSON
+    path('stream/comments/', FirehoseViewset.as_view({'get': 'comments'}), name='stream_comments'), # get request to stream all visible comments as NDJSON
+    path('stream/likes/', FirehoseViewset.as_view({'get': 'likes'}), name='stream_likes'), # get request to stream all visible likes as NDJSON
+
+    path('async/post/', async_views.post_list, name='async_posts'), # async get request to list all visible posts
+    path('async/post/<int:pk>/', async_views.post_detail, name='async_detailed_post'), # async get request to retrieve a post
+    path('async/post/<int:post_pk>/comments/', async_views.post_comments, name='async_comments'), # async get request to list all post's comments
+    path('async/comments/', async_views.all_comments, name='async_all_comments'), # async get request to list all visible comments
+    path('async/comment/user/<int:user_pk>/', async_views.user_comments, name='async_specific_user_comments'), # async get request to list all visible comments of a specific user
+    path('async/post/<int:post_pk>/likes/', async_views.post_likes, name='async_likes'), # async get request to list all post's likes
+    path('async/likes/', async_views.all_likes, name='async_all_likes'), # async get request to list all likes
+    path('async/likes/user/<int:user_pk>/', async_views.user_likes, name='async_specific_user_likes'), # async get request to list all likes of a specific user
 ]
@@ -1,14 +1,76 @@
+import json
+from datetime import timedelta, timezone as dt_timezone
+from itertools import islice
+
 from rest_framework import viewsets
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.contrib.auth.models import User
+from rest_framework.utils.encoders import JSONEncoder
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from users.models import Team, User
+from blog_post import routers
+from blog_post.timing import sampled, stage
+from jobs.queue import enqueue
 
-from .pagination import LikePagination, PostPagination, CommentPagination
-from .models import Post, Comment, Like
-from .serializers import PostSerializer , LikeSerializer, CommentSerializer
+from .cache import cached_response, POST, COMMENT, LIKE
+from .conditional import conditional_response
+from .pagination import LikePagination, PostPagination, CommentPagination, SearchPagination, decode_cursor, encode_cursor
+from .models import ACTIVITY_KINDS, Post, Comment, Like, TeamActivity, AuthorActivity
+from .serializers import PostSerializer, PostListSerializer, LikeSerializer, CommentSerializer, requested_fields
 from .permissions import VisibleAndEditableBlogs
+from .search import terms
+from .deletion import delete_posts
+
+TRENDING_LIMIT = 10
+TRENDING_MAX_LIMIT = 100
+STATS_DAYS = 30
+STATS_MAX_DAYS = 366
+
+class ReplicaReadMixin:
+    # Read-only actions read from a replica unless the user wrote within the
+    # last REPLICA_PIN_SECONDS; a successful write starts that window.
+    replica_actions = {'list', 'retrieve', 'list_posts', 'list_all', 'retrieve_users', 'search', 'trending'}
+
+    def dispatch(self, request, *args, **kwargs):
+        with routers.read_from(None):
+            response = super().dispatch(request, *args, **kwargs)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            routers.pin_to_primary(self.request.user)
+        return response
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions and not routers.is_pinned(request.user):
+            routers.use_replica()
+
+class TimedStagesMixin:
+    # Server-Timing stages of the DRF pipeline for sampled requests; paginate,
+    # serialize and jwt are recorded by the pagination, serializer and
+    # authentication classes.
+    def perform_authentication(self, request):
+        with stage('auth'):
+            super().perform_authentication(request)
 
-class PostViewset(viewsets.ModelViewSet):
+    def check_permissions(self, request):
+        with stage('permissions'):
+            super().check_permissions(request)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if sampled() and not getattr(response, 'is_rendered', True):
+            with stage('render'):
+                response.render()
+        return response
+
+class PostViewset(TimedStagesMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     pagination_class = PostPagination
@@ -18,33 +80,65 @@ class PostViewset(viewsets.ModelViewSet):
             return Response({'error': 'You are not authenticated'}, status=status.HTTP_403_FORBIDDEN)
         try:
             author = request.user
-            team = request.user.team
+            team = request.user.team_id
             title = request.data.get('title')
             content = request.data.get('content')
             is_public = request.data.get('is_public')
             authenticated_permission = request.data.get('authenticated_permission')
             group_permission = request.data.get('group_permission')
             author_permission = request.data.get('author_permission')
-            Post.objects.create(author=author, team=team, title=title, content=content, is_public=is_public, authenticated_permission=authenticated_permission, group_permission=group_permission, author_permission=author_permission)
+            Post.objects.create(author=author, team_id=team, title=title, content=content, is_public=is_public, authenticated_permission=authenticated_permission, group_permission=group_permission, author_permission=author_permission)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response({'success': 'Post created successfully', }, status=status.HTTP_201_CREATED)
     
+    def get_post_serializer(self, posts, many=False, serializer_class=None):
+        context = self.get_serializer_context()
+        requested = requested_fields(self.request)
+        if requested is None or 'is_liked' in requested:
+            post_ids = [post.id for post in posts] if many else [posts.id]
+            context['liked_post_ids'] = Like.objects.liked_post_ids(self.request.user, post_ids)
+        serializer_class = serializer_class or self.get_serializer_class()
+        return serializer_class(posts, many=many, context=context)
+
+    @conditional_response(POST, COMMENT, LIKE)
+    @cached_response(POST, COMMENT, LIKE, per_user=True)
     def list(self, request):
-        posts = Post.objects.all()
-        visible_posts = []
-        for post in posts:
-            if VisibleAndEditableBlogs().has_read_permission(request, post):
-                visible_posts.append(post)
-        visible_posts = sorted(visible_posts, key=lambda post: post.created_at, reverse=True)
+        visible_posts = Post.objects.visible_to(request.user).with_permissions(request.user).select_related('author', 'team').defer('content')
         paginator = self.pagination_class()
         result_page = paginator.paginate_queryset(visible_posts, request)
-        serializer = self.get_serializer(result_page, many=True)
+        serializer = self.get_post_serializer(result_page, many=True, serializer_class=PostListSerializer)
         return paginator.get_paginated_response(serializer.data)
     
+    @cached_response(POST, COMMENT, LIKE, per_user=True)
+    def search(self, request):
+        text = request.query_params.get('q', '')
+        if not terms(text):
+            return Response({'error': 'q must contain at least one word'}, status=status.HTTP_400_BAD_REQUEST)
+        results = Post.objects.visible_to(request.user).with_permissions(request.user).select_related('author', 'team').defer('content').search(text)
+        paginator = SearchPagination()
+        result_page = paginator.paginate_queryset(results, request)
+        serializer = self.get_post_serializer(result_page, many=True, serializer_class=PostListSerializer)
+        return paginator.get_paginated_response(serializer.data)
+
+    @cached_response(POST, COMMENT, LIKE, per_user=True)
+    def trending(self, request):
+        # Top ?limit= (default 10, at most 100) visible posts by trending
+        # score; a top-K read of post_trending_idx without a COUNT.
+        try:
+            limit = min(max(int(request.query_params.get('limit', TRENDING_LIMIT)), 1), TRENDING_MAX_LIMIT)
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        posts = list(
+            Post.objects.visible_to(request.user).with_permissions(request.user).select_related('author', 'team').defer('content')
+            .trending()[:limit]
+        )
+        serializer = self.get_post_serializer(posts, many=True, serializer_class=PostListSerializer)
+        return Response({'results': serializer.data}, status=status.HTTP_200_OK)
+
     def update(self, request, pk):
         try:
-            post = Post.objects.get(pk=pk)
+            post = Post.objects.select_related('team').get(pk=pk)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
         
@@ -53,7 +147,7 @@ class PostViewset(viewsets.ModelViewSet):
         
         permitted_data = {
             'user': request.user,
-            'team': request.user.team,
+            'team': request.user.team_id,
             'title': request.data.get('title', post.title),
             'content': request.data.get('content', post.content),
             'is_public': request.data.get('is_public', post.is_public),
@@ -75,21 +169,29 @@ class PostViewset(viewsets.ModelViewSet):
         
         if not VisibleAndEditableBlogs().has_edit_permission(request, post):
             return Response({'error': 'You do not have permission to delete this post'}, status=status.HTTP_403_FORBIDDEN)
-        post.delete()
+        if post.like_count + post.comment_count >= settings.JOBS_ASYNC_DELETE_THRESHOLD:
+            job = enqueue('posts.delete_posts', {'post_ids': [post.pk]}, dedupe_key=f'delete-post-{post.pk}', owner=request.user)
+            return Response(
+                {'success': 'Post deletion queued', 'job': job.pk, 'status_url': reverse('job', kwargs={'pk': job.pk})},
+                status=status.HTTP_202_ACCEPTED,
+            )
+        delete_posts(Post.objects.filter(pk=post.pk))
         return Response({'success': 'Post deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
     
+    @conditional_response(POST, COMMENT, LIKE)
+    @cached_response(POST, COMMENT, LIKE, per_user=True)
     def retrieve(self, request, pk): 
         try:
-            post = Post.objects.get(pk=pk)
+            post = Post.objects.with_permissions(request.user).select_related('author', 'team').get(pk=pk)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
         
         if not VisibleAndEditableBlogs().has_read_permission(request, post):
             return Response({'error': 'You do not have permission to view this post'}, status=status.HTTP_404_NOT_FOUND)
-        serializer = self.get_serializer(post)
+        serializer = self.get_post_serializer(post)
         return Response(serializer.data, status=status.HTTP_200_OK) 
     
-class CommentViewset(viewsets.ModelViewSet):
+class CommentViewset(TimedStagesMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     pagination_class = CommentPagination
@@ -104,55 +206,48 @@ class CommentViewset(viewsets.ModelViewSet):
         
         if not VisibleAndEditableBlogs().has_read_permission(request, post):
             return Response({'error': 'You do not have permission to comment on this post'}, status=status.HTTP_403_FORBIDDEN)
-        Comment.objects.create(author=request.user, post=post, content=request.data.get('content'))
+        with transaction.atomic():
+            Comment.objects.create(author=request.user, post=post, content=request.data.get('content'))
         return Response({'success': 'Comment created successfully'}, status=status.HTTP_201_CREATED)
     
+    @conditional_response(POST, COMMENT)
+    @cached_response(POST, COMMENT)
     def list_posts(self, request, post_pk):
         try:
-            post = Post.objects.get(pk=post_pk)
+            post = Post.objects.select_related('author').get(pk=post_pk)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
 
         if not VisibleAndEditableBlogs().has_read_permission(request, post):
             return Response({'error': 'You do not have permission to view comments on this post'}, status=status.HTTP_403_FORBIDDEN)
 
-        comments = Comment.objects.filter(post=post)
-        visible_comments = sorted(comments, key=lambda comment: comment.created_at, reverse=True)
+        visible_comments = Comment.objects.filter(post=post).select_related('author').order_by('-created_at', '-id')
         paginator = self.pagination_class()
         result_page = paginator.paginate_queryset(visible_comments, request)
-        serializer = CommentSerializer(result_page, many=True)
+        serializer = CommentSerializer(result_page, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
     
+    @conditional_response(POST, COMMENT)
+    @cached_response(POST, COMMENT)
     def retrieve_users(self, request, user_pk):
         try:
             user = User.objects.get(pk=user_pk)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
         
-        comments = Comment.objects.filter(author=user)
-        visible_comments = []
-
-        for comment in comments:
-            if VisibleAndEditableBlogs().has_read_permission(request, comment.post):
-                visible_comments.append(comment)
-        
-        visible_comments = sorted(visible_comments, key=lambda comment: comment.created_at, reverse=True)
+        visible_comments = Comment.objects.visible_to(request.user).filter(author=user).select_related('author')
         paginator = self.pagination_class()
         result_page = paginator.paginate_queryset(visible_comments, request)
-        serializer = CommentSerializer(result_page, many=True)
+        serializer = CommentSerializer(result_page, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
     
+    @conditional_response(POST, COMMENT)
+    @cached_response(POST, COMMENT)
     def list_all(self, request):
-        comments = Comment.objects.all()
-        visible_comments = []
-        for comment in comments:
-            if VisibleAndEditableBlogs().has_read_permission(request, comment.post):
-                visible_comments.append(comment)
-        
-        visible_comments = sorted(visible_comments, key=lambda comment: comment.created_at, reverse=True)
+        visible_comments = Comment.objects.visible_to(request.user).select_related('author')
         paginator = self.pagination_class()
         result_page = paginator.paginate_queryset(visible_comments, request)
-        serializer = CommentSerializer(result_page, many=True)
+        serializer = CommentSerializer(result_page, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
     
     def destroy(self, request, pk):
@@ -192,63 +287,59 @@ class CommentViewset(viewsets.ModelViewSet):
         serializer = CommentSerializer(comment)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
-class LikeViewset(viewsets.ModelViewSet):
+class LikeViewset(TimedStagesMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Like.objects.all()
     serializer_class = LikeSerializer
     pagination_class = LikePagination
 
+    @conditional_response(POST, LIKE)
+    @cached_response(POST, LIKE)
     def list_posts(self, request, post_pk):
         try:
-            post = Post.objects.get(pk=post_pk)
+            post = Post.objects.select_related('author').get(pk=post_pk)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
         
         if not VisibleAndEditableBlogs().has_read_permission(request, post):
             return Response({'error': 'You do not have permission to view likes on this post'}, status=status.HTTP_403_FORBIDDEN)
         
-        likes = Like.objects.filter(post=post)
-        visible_likes = sorted(likes, key=lambda like: like.created_at, reverse=True)
+        visible_likes = Like.objects.filter(post=post).select_related('author').order_by('-created_at', '-id')
         paginator = self.pagination_class()
         result_page = paginator.paginate_queryset(visible_likes, request)
-        serializer = LikeSerializer(result_page, many=True)
+        serializer = LikeSerializer(result_page, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
     
+    @conditional_response(POST, LIKE)
+    @cached_response(POST, LIKE)
     def retrieve_users(self, request, user_pk):
         try:
             user = User.objects.get(pk=user_pk)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
         
-        likes = Like.objects.filter(author=user)
-        visible_likes = []
-
-        for like in likes:
-            if VisibleAndEditableBlogs().has_read_permission(request, like.post):
-                visible_likes.append(like)
-
+        visible_likes = Like.objects.visible_to(request.user).filter(author=user).select_related('author')
         paginator = self.pagination_class()
         result_page = paginator.paginate_queryset(visible_likes, request)
-        serializer = LikeSerializer(result_page, many=True)
+        serializer = LikeSerializer(result_page, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
     
+    @conditional_response(POST, LIKE)
+    @cached_response(POST, LIKE)
     def list_all(self, request):
-        likes = Like.objects.all()
-        visible_likes = []
-
-        for like in likes:
-            if VisibleAndEditableBlogs().has_read_permission(request, like.post):
-                visible_likes.append(like)
-        
-        visible_likes = sorted(visible_likes, key=lambda like: like.created_at, reverse=True)
+        visible_likes = Like.objects.visible_to(request.user).select_related('author')
         paginator = self.pagination_class()
         result_page = paginator.paginate_queryset(visible_likes, request)
-        serializer = LikeSerializer(result_page, many=True)
+        serializer = LikeSerializer(result_page, many=True, context={'request': request})
         return paginator.get_paginated_response(serializer.data)
 
     def create(self, request, post_pk):
         if not request.user.is_authenticated:
             return Response({'error': 'You are not authenticated'}, status=status.HTTP_403_FORBIDDEN)
-        
+
+        if Like.objects.like(request.user, post_pk):
+            return Response({'success': 'Like created successfully'}, status=status.HTTP_201_CREATED)
+
+        # Nothing was inserted; only now look up why.
         try:
             post = Post.objects.get(pk=post_pk)
         except Exception as e:
@@ -256,17 +347,15 @@ class LikeViewset(viewsets.ModelViewSet):
         
         if not VisibleAndEditableBlogs().has_read_permission(request, post):
             return Response({'error': 'You do not have permission to like this post'}, status=status.HTTP_403_FORBIDDEN)
-        
-        if Like.objects.filter(author=request.user, post=post).exists():
-            return Response({'error': 'You have already liked this post'}, status=status.HTTP_403_FORBIDDEN)
-        
-        Like.objects.create(author=request.user, post=post)
-        return Response({'success': 'Like created successfully'}, status=status.HTTP_201_CREATED)
+        return Response({'error': 'You have already liked this post'}, status=status.HTTP_403_FORBIDDEN)
     
     def destroy(self, request, post_pk):
         if not request.user.is_authenticated:
             return Response({'error': 'You are not authenticated'}, status=status.HTTP_403_FORBIDDEN)
-        
+
+        if Like.objects.unlike(request.user, post_pk):
+            return Response({'success': 'Like deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
+
         try:
             post = Post.objects.get(pk=post_pk)
         except Exception as e:
@@ -274,10 +363,88 @@ class LikeViewset(viewsets.ModelViewSet):
 
         if not VisibleAndEditableBlogs().has_read_permission(request, post):
             return Response({'error': 'You do not have permission to unlike this post'}, status=status.HTTP_403_FORBIDDEN)        
-        
+        return Response({'error': 'Like matching query does not exist.'}, status=status.HTTP_400_BAD_REQUEST)
+
+class ActivityStatsViewset(TimedStagesMixin, ReplicaReadMixin, viewsets.ViewSet):
+    # Posts, comments and likes per day over the last ?days= (default 30, at
+    # most 366) days from the TeamActivity/AuthorActivity rollups: one row
+    # read per day however many posts there are. A team's stats are visible
+    # to its members, an author's to the author and their team; superusers
+    # see all.
+    permission_classes = [IsAuthenticated]
+    replica_actions = {'team', 'author'}
+
+    def series(self, request, activity):
         try:
-            like = Like.objects.get(author=request.user, post=post)
-        except Exception as e:
-            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
-        like.delete()
-        return Response({'success': 'Like deleted successfully'}, status=status.HTTP_204_NO_CONTENT)
+            days = min(max(int(request.query_params.get('days', STATS_DAYS)), 1), STATS_MAX_DAYS)
+        except ValueError:
+            return Response({'error': 'days must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        last_day = timezone.localdate()
+        daily = activity.daily(last_day - timedelta(days=days - 1), last_day)
+        totals = {name: sum(day[name] for day in daily) for name in ACTIVITY_KINDS}
+        return Response({'totals': totals, 'days': daily}, status=status.HTTP_200_OK)
+
+    def team(self, request, team):
+        team_id = Team.objects.filter(name=team).values_list('pk', flat=True).first()
+        if team_id is None or (not request.user.is_superuser and request.user.team_id != team_id):
+            return Response({'error': 'Team not found'}, status=status.HTTP_404_NOT_FOUND)
+        return self.series(request, TeamActivity.objects.filter(team=team_id))
+
+    def author(self, request, user_pk):
+        if not request.user.is_superuser and request.user.pk != user_pk:
+            if not User.objects.filter(pk=user_pk, team=request.user.team_id).exists():
+                return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+        return self.series(request, AuthorActivity.objects.filter(author=user_pk))
+
+class FirehoseViewset(viewsets.ViewSet):
+    # Streams every visible row as newline-delimited JSON, oldest first. Each
+    # line carries a "position" token; pass the last one back as ?after= to
+    # resume. ?since= limits the stream to rows created at or after a time.
+    chunk_size = 1000
+
+    def stream(self, request, queryset, serializer_class):
+        since = request.query_params.get('since')
+        if since:
+            try:
+                since = parse_datetime(since)
+            except ValueError:
+                since = None
+            if since is None:
+                return Response({'error': 'since must be an ISO 8601 datetime'}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since, dt_timezone.utc)
+            queryset = queryset.filter(created_at__gte=since)
+
+        after = request.query_params.get('after')
+        if after:
+            try:
+                created_at, pk, _ = decode_cursor(after)
+            except NotFound:
+                return Response({'error': 'after must be a position from this stream'}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+
+        queryset = queryset.order_by('created_at', 'id')
+        lines = self.generate_lines(queryset, serializer_class, {'request': request})
+        return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+
+    def generate_lines(self, queryset, serializer_class, context):
+        rows = queryset.iterator(chunk_size=self.chunk_size)
+        while True:
+            batch = list(islice(rows, self.chunk_size))
+            if not batch:
+                return
+            lines = []
+            for obj, item in zip(batch, serializer_class(batch, many=True, context=context).data):
+                item['position'] = encode_cursor(obj.created_at, obj.id)
+                lines.append(json.dumps(item, cls=JSONEncoder))
+            yield '\n'.join(lines) + '\n'
+
+    def posts(self, request):
+        queryset = Post.objects.visible_to(request.user).with_permissions(request.user).with_liked(request.user).select_related('author', 'team')
+        return self.stream(request, queryset, PostSerializer)
+
+    def comments(self, request):
+        return self.stream(request, Comment.objects.visible_to(request.user).select_related('author'), CommentSerializer)
+
+    def likes(self, request):
+        return self.stream(request, Like.objects.visible_to(request.user).select_related('author'), LikeSerializer)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from users.models import User
+from users.models import Team, User
 # Register your models here.
 
+admin.site.register(Team)
 admin.site.register(User)
@@ -0,0 +1,152 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from blog_post.timing import timed
+
+from .models import User
+
+# Access tokens carry everything posts.permissions needs, so authenticating a
+# request does not load the user row. token_version is compared with the
+# user's current one (cached for TOKEN_VERSION_CACHE_TTL seconds); a token
+# minted before a team, superuser or active change falls back to the row, as
+# does one from before teams were a table (a team name, no team_id claim).
+TOKEN_CLAIMS = ('team_id', 'is_superuser', 'token_version')
+
+
+def add_claims(token, user):
+    for claim in TOKEN_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class ClaimsRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        return add_claims(super().for_user(user), user)
+
+    @property
+    def access_token(self):
+        # Claims are read again so a refreshed access token follows changes
+        # made since the refresh token was issued.
+        access = super().access_token
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: self[api_settings.USER_ID_CLAIM]}).first()
+        if user is not None:
+            add_claims(access, user)
+        return access
+
+
+def version_cache():
+    return caches[settings.TOKEN_VERSION_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f'users:token-version:{user_id}'
+
+
+def _version_query(user_id):
+    return User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}, is_active=True).values_list('token_version', flat=True)
+
+
+def current_token_version(user_id):
+    version = version_cache().get(_version_key(user_id))
+    if version is None:
+        version = _version_query(user_id).first()
+        if version is not None:
+            version_cache().set(_version_key(user_id), version, timeout=settings.TOKEN_VERSION_CACHE_TTL)
+    return version
+
+
+async def acurrent_token_version(user_id):
+    version = await version_cache().aget(_version_key(user_id))
+    if version is None:
+        version = await _version_query(user_id).afirst()
+        if version is not None:
+            await version_cache().aset(_version_key(user_id), version, timeout=settings.TOKEN_VERSION_CACHE_TTL)
+    return version
+
+
+def forget_token_version(user_id):
+    version_cache().delete(_version_key(user_id))
+
+
+def has_claims(validated_token):
+    return not api_settings.CHECK_REVOKE_TOKEN and all(
+        claim in validated_token for claim in (api_settings.USER_ID_CLAIM, *TOKEN_CLAIMS)
+    )
+
+
+def user_from_claims(validated_token):
+    # Every other field is deferred and loaded on first access.
+    values = {
+        api_settings.USER_ID_FIELD: validated_token[api_settings.USER_ID_CLAIM],
+        **{claim: validated_token[claim] for claim in TOKEN_CLAIMS},
+    }
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(DEFAULT_DB_ALIAS, field_names, [values[name] for name in field_names])
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    @timed('jwt')
+    def get_validated_token(self, raw_token):
+        return super().get_validated_token(raw_token)
+
+    def get_user(self, validated_token):
+        if has_claims(validated_token):
+            if current_token_version(validated_token[api_settings.USER_ID_CLAIM]) == validated_token['token_version']:
+                return user_from_claims(validated_token)
+        return super().get_user(validated_token)
+
+
+class AsyncJWTAuthentication(ClaimsJWTAuthentication):
+    # JWTAuthentication for plain async views: header parsing and token
+    # validation are CPU only, the user is loaded with aget.
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        if has_claims(validated_token) and await acurrent_token_version(user_id) == validated_token['token_version']:
+            return user_from_claims(validated_token)
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        return user
+
+
+async def aauthenticate(request):
+    # Same order as REST_FRAMEWORK's DEFAULT_AUTHENTICATION_CLASSES: a bearer
+    # token first, then the session.
+    authenticated = await AsyncJWTAuthentication().aauthenticate(request)
+    if authenticated is not None:
+        return authenticated[0]
+    return await request.auser()
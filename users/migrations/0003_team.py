@@ -0,0 +1,59 @@
+# Generated by Django 5.1.6 on 2026-10-18 08:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def teams_from_names(apps, schema_editor):
+    # One Team per distinct name, then one UPDATE per team.
+    Team = apps.get_model('users', 'Team')
+    User = apps.get_model('users', 'User')
+    names = set(User.objects.values_list('team', flat=True).distinct())
+    Team.objects.bulk_create([Team(name=name) for name in names], ignore_conflicts=True)
+    for pk, name in Team.objects.filter(name__in=names).values_list('pk', 'name'):
+        User.objects.filter(team=name).update(team_ref=pk)
+
+
+def names_from_teams(apps, schema_editor):
+    Team = apps.get_model('users', 'Team')
+    User = apps.get_model('users', 'User')
+    for pk, name in Team.objects.values_list('pk', 'name'):
+        User.objects.filter(team_ref=pk).update(team=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_token_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='team_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='users.team'),
+        ),
+        migrations.RunPython(teams_from_names, names_from_teams),
+        # No-op in the database; lets the reverse re-add the column as ''.
+        migrations.AlterField(
+            model_name='user',
+            name='team',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='team',
+        ),
+        migrations.RenameField(
+            model_name='user',
+            old_name='team_ref',
+            new_name='team',
+        ),
+    ]
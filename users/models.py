@@ -1,6 +1,68 @@
-from django.db import models
-from django.contrib.auth.models import AbstractUser
+from django.db import models, transaction
+from django.contrib.auth.models import AbstractUser, UserManager as AuthUserManager
 
 # Create your models here.
+class TeamQuerySet(models.QuerySet):
+    def named(self, name):
+        # The team of that name, created on first use.
+        return self.get_or_create(name=name)[0]
+
+
+class Team(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    objects = TeamQuerySet.as_manager()
+
+    def __str__(self):
+        return self.name
+
+
+class UserQuerySet(models.QuerySet):
+    def delete(self):
+        # Posts, comments and likes go in a few set-based statements instead
+        # of through the Collector, which would load each of them first.
+        from posts.deletion import delete_user_content
+        with transaction.atomic(using=self.db):
+            delete_user_content(list(self.values_list('pk', flat=True)))
+            return super().delete()
+
+
+class UserManager(AuthUserManager.from_queryset(UserQuerySet)):
+    pass
+
+
 class User(AbstractUser):
-    team = models.CharField(max_length=100)
\ No newline at end of file
+    team = models.ForeignKey(Team, on_delete=models.PROTECT, null=True, blank=True)
+    # Access tokens carry team_id and is_superuser (see users.authentication);
+    # a token issued before one of these fields changed no longer matches.
+    token_version = models.PositiveIntegerField(default=0)
+
+    TOKEN_FIELDS = ('team_id', 'is_superuser', 'is_active')
+
+    objects = UserManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._stored_token_fields = user.loaded_token_fields()
+        return user
+
+    def loaded_token_fields(self):
+        # Deferred fields are left out instead of being loaded.
+        return {name: self.__dict__[name] for name in self.TOKEN_FIELDS if name in self.__dict__}
+
+    def save(self, *args, **kwargs):
+        stored = getattr(self, '_stored_token_fields', None)
+        if stored is not None and any(stored.get(name, value) != value for name, value in self.loaded_token_fields().items()):
+            self.token_version += 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'token_version'}
+        super().save(*args, **kwargs)
+        self._stored_token_fields = self.loaded_token_fields()
+
+    def delete(self, *args, **kwargs):
+        # See UserQuerySet.delete.
+        from posts.deletion import delete_user_content
+        with transaction.atomic():
+            delete_user_content([self.pk])
+            return super().delete(*args, **kwargs)
@@ -1,15 +1,49 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from posts.models import AuthorActivity
+from .authentication import ClaimsRefreshToken
 from .models import User
 
+PROFILE_ACTIVITY_DAYS = 30
+
 class UserSerializer(serializers.ModelSerializer):
+    team = serializers.SlugRelatedField(slug_field='name', read_only=True)
+
     class Meta:
         model = User
         fields = ['id', 'username', 'password', 'team']
         write_only_fields = ['password']
     
 class UserRetrieveSerializer(serializers.ModelSerializer):
+    team = serializers.SlugRelatedField(slug_field='name', read_only=True)
+
     class Meta:
         model = User
         fields = ['username']
         read_only_fields = ['id', 'username', 'team']
-    
\ No newline at end of file
+
+
+class ProfileSerializer(UserRetrieveSerializer):
+    # Totals of the user's posts and the comments and likes they received,
+    # all-time and over the last PROFILE_ACTIVITY_DAYS days, from one
+    # aggregate over the user's AuthorActivity rows.
+    activity = serializers.SerializerMethodField()
+
+    class Meta(UserRetrieveSerializer.Meta):
+        fields = ['username', 'team', 'activity']
+
+    def get_activity(self, user):
+        since = timezone.localdate() - timedelta(days=PROFILE_ACTIVITY_DAYS - 1)
+        summary = AuthorActivity.objects.filter(author=user.pk).summary(since)
+        return {'total': summary['total'], f'last_{PROFILE_ACTIVITY_DAYS}_days': summary['recent']}
+    
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_token_version
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Drop the cached token_version now and again after commit, so it is
+    # read back from the committed row.
+    forget_token_version(instance.pk)
+    transaction.on_commit(lambda: forget_token_version(instance.pk))
@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from users.authentication import user_from_claims
+from users.models import Team, User
+from posts.models import Post
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def test_user(db):
+    user = User.objects.create_user(username='testuser', password='testpassword', team=Team.objects.named('testgroup'))
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('othergroup'))
+    Post.objects.create(
+        title='grouppost', content='groupcontent', is_public=0, team=Team.objects.named('othergroup'),
+        authenticated_permission=0, group_permission=1, author_permission=2, author=poster
+    )
+    return user
+
+
+def login(api_client):
+    tokens = api_client.post(reverse('token_obtain_pair'), {'username': 'testuser', 'password': 'testpassword'}).data
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    return tokens
+
+
+def user_queries(queries):
+    return [query['sql'] for query in queries.captured_queries if 'FROM "users_user"' in query['sql']]
+
+
+def test_access_token_carries_claims(api_client, test_user):
+    access = AccessToken(login(api_client)['access'])
+    assert access['team_id'] == test_user.team_id
+    assert access['is_superuser'] is False
+    assert access['token_version'] == 0
+
+
+def test_authentication_skips_user_row(api_client, test_user):
+    login(api_client)
+    api_client.get(reverse('posts'))
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse('posts'))
+    assert response.status_code == status.HTTP_200_OK
+    assert user_queries(queries) == []
+
+    user = response.wsgi_request.user
+    assert (user.pk, user.team_id, user.is_superuser) == (test_user.pk, test_user.team_id, False)
+    with CaptureQueriesContext(connection) as queries:
+        assert user.username == 'testuser'
+    assert len(user_queries(queries)) == 1
+
+
+def test_team_change_invalidates_claims(api_client, test_user):
+    tokens = login(api_client)
+    assert api_client.get(reverse('posts')).data['count'] == 0
+
+    test_user.team = Team.objects.named('othergroup')
+    test_user.save()
+    assert test_user.token_version == 1
+
+    # The old token still works, but its team claim is ignored.
+    response = api_client.get(reverse('posts'))
+    assert response.data['count'] == 1
+    assert response.wsgi_request.user.team.name == 'othergroup'
+
+    access = AccessToken(api_client.post(reverse('token_refresh'), {'refresh': tokens['refresh']}).data['access'])
+    assert (access['team_id'], access['token_version']) == (test_user.team_id, 1)
+
+
+def test_unrelated_changes_keep_claims(test_user):
+    test_user.first_name = 'Test'
+    test_user.save()
+    user = User.objects.get(pk=test_user.pk)
+    user.set_password('otherpassword')
+    user.save()
+    assert User.objects.get(pk=test_user.pk).token_version == 0
+
+
+def test_inactive_user_is_rejected(api_client, test_user):
+    login(api_client)
+    api_client.get(reverse('posts'))
+
+    test_user.is_active = False
+    test_user.save()
+    response = api_client.get(reverse('posts'))
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_lazy_user_saves_only_loaded_fields(test_user):
+    access = AccessToken.for_user(test_user)
+    for claim in ['team_id', 'is_superuser', 'token_version']:
+        access[claim] = getattr(test_user, claim)
+    user = user_from_claims(access)
+    user.team = Team.objects.named('othergroup')
+    user.save()
+
+    test_user.refresh_from_db()
+    assert (test_user.team.name, test_user.token_version, test_user.username) == ('othergroup', 1, 'testuser')
@@ -0,0 +1,82 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from users.models import Team, User
+from posts.models import Post, TeamActivity
+
+@pytest.fixture
+def create_team():
+    poster = User.objects.create_user(username='poster', password='testpassword', team=Team.objects.named('testgroup'))
+    teammate = User.objects.create_user(username='teammate', password='testpassword', team=Team.objects.named('testgroup'))
+    post = Post.objects.create(
+        title='grouppost', content='groupcontent', is_public=0, team=poster.team,
+        authenticated_permission=0, group_permission=1, author_permission=2, author=poster
+    )
+    return {
+        'poster': poster,
+        'teammate': teammate,
+        'post': post,
+    }
+
+
+def test_teams_are_looked_up_by_name(db, create_team, django_assert_num_queries):
+    assert Team.objects.count() == 1
+    assert create_team['teammate'].team_id == create_team['poster'].team_id == create_team['post'].team_id
+
+    # Assigning a team never touches the database; a name is not a team.
+    with django_assert_num_queries(0):
+        User(username='unsaved', team=create_team['poster'].team)
+        with pytest.raises(ValueError):
+            User(username='unsaved', team='othergroup')
+    assert Team.objects.count() == 1
+
+
+def test_api_returns_team_names(db, create_team):
+    client = APIClient()
+    client.force_authenticate(user=create_team['teammate'])
+
+    response = client.get(reverse('detailed_post', kwargs={'pk': create_team['post'].pk}))
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['team'] == 'testgroup'
+    assert client.get(reverse('posts')).data['results'][0]['team'] == 'testgroup'
+    assert client.get(reverse('user')).data['team'] == 'testgroup'
+
+
+def test_token_with_team_name_claim_loads_user(db, create_team):
+    # Issued before teams were a table: no team_id claim, so the row is read.
+    teammate = create_team['teammate']
+    access = AccessToken.for_user(teammate)
+    access['team'] = 'testgroup'
+    access['is_superuser'] = False
+    access['token_version'] = teammate.token_version
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('posts'))
+    assert response.data['count'] == 1
+    assert any('FROM "users_user"' in query['sql'] for query in queries.captured_queries)
+
+
+def test_users_without_a_team_can_post(db, create_team):
+    admin = User.objects.create_superuser(username='admin', password='testpassword')
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    response = client.post(reverse('posts'), {
+        'title': 'teamless', 'content': 'teamless content', 'is_public': 1,
+        'authenticated_permission': 1, 'group_permission': 1, 'author_permission': 2,
+    })
+    assert response.status_code == status.HTTP_201_CREATED
+    post = Post.objects.get(title='teamless')
+    assert post.team is None
+
+    assert client.post(reverse('likes', kwargs={'post_pk': post.pk})).status_code == status.HTTP_201_CREATED
+    assert client.post(reverse('comments', kwargs={'post_pk': post.pk}), {'content': 'comment'}).status_code == status.HTTP_201_CREATED
+    assert client.delete(reverse('unlike', kwargs={'post_pk': post.pk})).status_code == status.HTTP_204_NO_CONTENT
+    assert client.delete(reverse('detailed_post', kwargs={'pk': post.pk})).status_code == status.HTTP_204_NO_CONTENT
+    assert not TeamActivity.objects.exclude(team=create_team['poster'].team).exists()
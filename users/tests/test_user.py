@@ -2,7 +2,7 @@ import pytest
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
-from users.models import User
+from users.models import Team, User
 
 # Fixtures
 @pytest.fixture
@@ -12,7 +12,7 @@ def api_client():
 @pytest.fixture
 def test_user(db):
     return User.objects.create_user(
-        username='testuser', password='testpassword', team='testgroup'
+        username='testuser', password='testpassword', team=Team.objects.named('testgroup')
     )
 
 # === Autenticación: Login ===
@@ -88,14 +88,14 @@ def test_success_register_default_team(api_client):
     resp = api_client.post(reverse('register'), {'username': 'new', 'password': 'pass'})
     assert resp.status_code == status.HTTP_201_CREATED
     u = User.objects.get(username='new')
-    assert u.team == 'default_team'
+    assert u.team.name == 'default_team'
 
 @pytest.mark.django_db
 def test_success_register_empty_team(api_client):
     resp = api_client.post(reverse('register'), {'username': 'new2', 'password': 'pass', 'team': ''})
     assert resp.status_code == status.HTTP_201_CREATED
     u = User.objects.get(username='new2')
-    assert u.team == 'default_team'
+    assert u.team.name == 'default_team'
 
 @pytest.mark.django_db
 def test_failed_register_missing_username(api_client):
@@ -125,4 +125,8 @@ def test_profile_retrieval(api_client, test_user):
     api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
     resp = api_client.get(reverse('user'))
     assert resp.status_code == status.HTTP_200_OK
-    assert resp.data == {'username': 'testuser'}
+    no_activity = {'posts': 0, 'comments': 0, 'likes': 0}
+    assert resp.data == {
+        'username': 'testuser', 'team': 'testgroup',
+        'activity': {'total': no_activity, 'last_30_days': no_activity},
+    }
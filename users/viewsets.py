@@ -4,8 +4,8 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import User
-from .serializers import UserSerializer, UserRetrieveSerializer
+from .models import Team, User
+from .serializers import UserSerializer, ProfileSerializer
 
 # Create your views here.
 
@@ -20,7 +20,7 @@ class UserRegisterView(viewsets.ModelViewSet):
             return Response({'message': 'username and password are required'}, status=status.HTTP_400_BAD_REQUEST)
         if User.objects.filter(username=username).exists():
             return Response({'message': 'an account with that email already exists'}, status=status.HTTP_400_BAD_REQUEST)
-        User.objects.create_user(username=username, password=password, team='default_team')
+        User.objects.create_user(username=username, password=password, team=Team.objects.named('default_team'))
         return Response({'message': 'User created succesfully'}, status=status.HTTP_201_CREATED)
 
 class UserLogoutView(viewsets.ModelViewSet):
@@ -41,11 +41,11 @@ class UserLogoutView(viewsets.ModelViewSet):
     
 class UserViewset(viewsets.ModelViewSet):
     queryset = User.objects.all()
-    serializer_class = UserRetrieveSerializer
+    serializer_class = ProfileSerializer
     permission_classes = [IsAuthenticated]
     http_method_names = ['get']
 
     def list(self, request):
-        user = User.objects.filter(id=request.user.id)
+        user = User.objects.filter(id=request.user.id).select_related('team')
         serializer = self.get_serializer(user.first())
         return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file